@@ -0,0 +1,66 @@
+# resource_engine.py
+"""
+A simulated day of orders through the NumPy ResourceEngine against
+making them one by one from the data.py dicts.
+
+    python benchmarks/resource_engine.py --orders 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data  # noqa: E402
+from resource_engine import ResourceEngine  # noqa: E402
+
+
+def one_by_one(resources, order_sizes):
+    stock = dict(resources)
+    accepted = []
+    for size in order_sizes:
+        ingredients = data.recipes[size]["ingredients"]
+        ok = all(stock[item] >= amount for item, amount in ingredients.items())
+        if ok:
+            for item, amount in ingredients.items():
+                stock[item] -= amount
+        accepted.append(ok)
+    return accepted
+
+
+def best_of(runs, function):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    order_sizes = rng.choices(list(data.recipes), k=args.orders)
+    # Stock for about 70% of the day, so the run-out path is exercised
+    resources = {item: int(amount * args.orders * 0.7) for item, amount in data.recipes["medium"]["ingredients"].items()}
+    codes = ResourceEngine(resources).encode(order_sizes)
+
+    loop_seconds, expected = best_of(args.runs, lambda: one_by_one(resources, order_sizes))
+    engine_seconds, accepted = best_of(args.runs, lambda: ResourceEngine(dict(resources)).process(codes))
+    names_seconds, _ = best_of(args.runs, lambda: ResourceEngine(dict(resources)).process(order_sizes))
+    assert accepted.tolist() == expected
+
+    print(f"{args.orders} orders, {sum(expected)} made")
+    print(f"        dict loop: {loop_seconds * 1000:8.2f} ms")
+    print(f"   engine (codes): {engine_seconds * 1000:8.2f} ms  {loop_seconds / engine_seconds:5.1f}x")
+    print(f"   engine (names): {names_seconds * 1000:8.2f} ms  {loop_seconds / names_seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
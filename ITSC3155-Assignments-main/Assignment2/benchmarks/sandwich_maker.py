@@ -0,0 +1,51 @@
+# sandwich_maker.py
+"""
+Sandwiches per second through SandwichMaker.try_make with several kiosk
+threads sharing one machine.
+
+    python benchmarks/sandwich_maker.py --kiosks 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data  # noqa: E402
+from sandwich_maker import SandwichMaker  # noqa: E402
+
+
+def run(kiosks, attempts):
+    maker = SandwichMaker({item: 10 ** 12 for item in data.resources})
+    sizes = list(data.recipes)
+    start = threading.Barrier(kiosks + 1)
+
+    def kiosk(offset):
+        start.wait()
+        for attempt in range(attempts):
+            maker.try_make(sizes[(attempt + offset) % len(sizes)])
+
+    threads = [threading.Thread(target=kiosk, args=(offset,)) for offset in range(kiosks)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return kiosks * attempts / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kiosks", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--attempts", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for kiosks in args.kiosks:
+        print(f"{kiosks:>2} kiosk(s): {run(kiosks, args.attempts):,.0f} sandwiches/s")
+
+
+if __name__ == "__main__":
+    main()
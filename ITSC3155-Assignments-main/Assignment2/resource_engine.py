@@ -0,0 +1,57 @@
+import numpy as np
+
+import data
+
+
+class ResourceEngine:
+    """Stock accounting for simulating many orders at once.
+       Recipes become a sizes x ingredients matrix, and a batch of orders is
+       accepted or rejected exactly as if they were made one by one."""
+
+    def __init__(self, resources=None, recipes=None):
+        resources = resources if resources is not None else data.resources
+        recipes = recipes if recipes is not None else data.recipes
+        self.sizes = list(recipes)
+        self.ingredients = list(resources)
+        self._codes = {size: code for code, size in enumerate(self.sizes)}
+        # Ingredients missing from `resources` get a column with no stock, so recipes needing them never fit
+        for size in self.sizes:
+            for item in recipes[size]["ingredients"]:
+                if item not in self.ingredients:
+                    self.ingredients.append(item)
+        self.matrix = np.array([[recipes[size]["ingredients"].get(item, 0) for item in self.ingredients]
+                                for size in self.sizes], dtype=np.int64)
+        self.stock = np.array([resources.get(item, 0) for item in self.ingredients], dtype=np.int64)
+
+    @property
+    def machine_resources(self):
+        return {item: int(amount) for item, amount in zip(self.ingredients, self.stock)}
+
+    def encode(self, order_sizes):
+        """Size names to row numbers of the recipe matrix."""
+        return np.fromiter((self._codes[size] for size in order_sizes), dtype=np.intp, count=len(order_sizes))
+
+    def process(self, orders):
+        """Makes a batch of orders in sequence (size names, or codes from encode()), deducting stock.
+           Returns one bool per order: True when it was made, False when stock was short."""
+        codes = np.asarray(orders if isinstance(orders, np.ndarray) else self.encode(orders), dtype=np.intp)
+        accepted = np.zeros(len(codes), dtype=bool)
+        # Stock only goes down, so a size that does not fit now never fits again in this batch
+        fits = np.all(self.matrix <= self.stock, axis=1)
+        position = 0
+        while position < len(codes):
+            pending = position + np.flatnonzero(fits[codes[position:]])
+            if not pending.size:
+                break
+            used = np.cumsum(self.matrix[codes[pending]], axis=0)
+            short = np.any(used > self.stock, axis=1)
+            made = int(np.argmax(short)) if short.any() else len(pending)
+            accepted[pending[:made]] = True
+            if made:
+                self.stock -= used[made - 1]
+            if made == len(pending):
+                break
+            # The first order stock could not cover is rejected, and so is every later one of a size that no longer fits
+            fits &= np.all(self.matrix <= self.stock, axis=1)
+            position = pending[made] + 1
+        return accepted
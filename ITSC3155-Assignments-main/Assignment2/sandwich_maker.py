@@ -1,11 +1,53 @@
+import threading
+from contextlib import ExitStack
+
+import data
+
 
 class SandwichMaker:
-    def __init__(self, resources):
+    def __init__(self, resources, recipes=None):
         self.machine_resources = resources
+        self.recipes = recipes if recipes is not None else data.recipes
+        # One lock per resource so kiosks only wait on each other for the ingredients they share
+        self._locks = {item: threading.Lock() for item in resources}
+
+    def _locked(self, ingredients):
+        """Holds the locks of `ingredients`, always taken in name order so two kiosks can't deadlock."""
+        stack = ExitStack()
+        for item in sorted(ingredients):
+            stack.enter_context(self._locks[item])
+        return stack
+
+    def _missing(self, ingredients):
+        return [item for item, amount in ingredients.items() if self.machine_resources.get(item, 0) < amount]
 
     def check_resources(self, ingredients):
         """Returns True when order can be made, False if ingredients are insufficient."""
-        #####
+        missing = self._missing(ingredients)
+        for item in missing:
+            print(f"Sorry there is not enough {item}.")
+        return not missing
 
     def make_sandwich(self, sandwich_size, order_ingredients):
-        ########
\ No newline at end of file
+        """Deducts the ingredients and serves the sandwich; False if another kiosk used them up first."""
+        if not self._take(order_ingredients):
+            return False
+        print(f"{sandwich_size} sandwich is ready. Bon appetit!")
+        return True
+
+    def try_make(self, size):
+        """Checks and deducts the ingredients for one `size` sandwich as a single step.
+           Returns True when it was made, False (with nothing deducted) when stock is short."""
+        return self._take(self.recipes[size]["ingredients"])
+
+    def _take(self, ingredients):
+        unknown = [item for item in ingredients if item not in self._locks]
+        if unknown:
+            # Not stocked at all: nothing to lock, nothing to deduct
+            return False
+        with self._locked(ingredients):
+            if self._missing(ingredients):
+                return False
+            for item, amount in ingredients.items():
+                self.machine_resources[item] -= amount
+        return True
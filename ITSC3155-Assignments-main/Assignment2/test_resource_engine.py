@@ -0,0 +1,61 @@
+import random
+
+import numpy as np
+
+import data
+from resource_engine import ResourceEngine
+
+
+def _one_by_one(resources, order_sizes):
+    stock = dict(resources)
+    accepted = []
+    for size in order_sizes:
+        ingredients = data.recipes[size]["ingredients"]
+        ok = all(stock[item] >= amount for item, amount in ingredients.items())
+        if ok:
+            for item, amount in ingredients.items():
+                stock[item] -= amount
+        accepted.append(ok)
+    return accepted, stock
+
+
+def test_matches_making_orders_one_by_one():
+    rng = random.Random(7)
+    for _ in range(200):
+        resources = {item: rng.randint(0, 400) for item in data.resources}
+        order_sizes = rng.choices(list(data.recipes), k=rng.randint(0, 120))
+        engine = ResourceEngine(dict(resources))
+
+        accepted = engine.process(order_sizes)
+
+        expected, stock = _one_by_one(resources, order_sizes)
+        assert accepted.tolist() == expected
+        assert engine.machine_resources == stock
+
+
+def test_smaller_orders_still_fit_after_a_large_one_is_rejected():
+    engine = ResourceEngine({"bread": 12, "ham": 18, "cheese": 24})
+
+    accepted = engine.process(["large", "medium", "large", "small", "small"])
+
+    assert accepted.tolist() == [True, True, False, True, False]
+    assert engine.machine_resources == {"bread": 0, "ham": 0, "cheese": 0}
+
+
+def test_batches_carry_stock_over():
+    orders = random.Random(3).choices(list(data.recipes), k=1000)
+    whole, split = ResourceEngine({"bread": 900, "ham": 1500, "cheese": 2000}), \
+        ResourceEngine({"bread": 900, "ham": 1500, "cheese": 2000})
+
+    expected = whole.process(orders)
+    accepted = np.concatenate([split.process(split.encode(orders[:400])), split.process(orders[400:])])
+
+    assert np.array_equal(accepted, expected)
+    assert split.machine_resources == whole.machine_resources
+
+
+def test_unstocked_ingredients_never_fit():
+    recipes = {"club": {"ingredients": {"bread": 2, "turkey": 1}, "cost": 6.0}, **data.recipes}
+    engine = ResourceEngine({"bread": 100, "ham": 100, "cheese": 100}, recipes)
+
+    assert engine.process(["club", "small"]).tolist() == [False, True]
@@ -0,0 +1,67 @@
+import sys
+import threading
+
+import data
+from sandwich_maker import SandwichMaker
+
+
+def _stock(bread=12, ham=18, cheese=24):
+    return {"bread": bread, "ham": ham, "cheese": cheese}
+
+
+def test_try_make_deducts_or_leaves_stock_alone():
+    maker = SandwichMaker(_stock())
+
+    assert maker.try_make("large") is True
+    assert maker.machine_resources == {"bread": 6, "ham": 10, "cheese": 12}
+    assert maker.try_make("large") is True
+    assert maker.try_make("small") is False
+    assert maker.machine_resources == {"bread": 0, "ham": 2, "cheese": 0}
+
+
+def test_check_resources_names_what_is_short(capsys):
+    maker = SandwichMaker(_stock(ham=3))
+
+    assert maker.check_resources(data.recipes["small"]["ingredients"]) is False
+    assert capsys.readouterr().out == "Sorry there is not enough ham.\n"
+    assert maker.check_resources(data.recipes["small"]["ingredients"] | {"ham": 3}) is True
+
+
+def test_kiosks_sharing_a_machine_never_overdraw():
+    stock = _stock(bread=10_000, ham=15_000, cheese=20_000)
+    maker = SandwichMaker(dict(stock))
+    sizes = list(data.recipes)
+    made = {size: 0 for size in sizes}
+    counted = threading.Lock()
+    start = threading.Barrier(8)
+
+    def kiosk(offset):
+        start.wait()
+        mine = {size: 0 for size in sizes}
+        for attempt in range(5_000):
+            size = sizes[(attempt + offset) % len(sizes)]
+            if maker.try_make(size):
+                mine[size] += 1
+        with counted:
+            for size, count in mine.items():
+                made[size] += count
+
+    kiosks = [threading.Thread(target=kiosk, args=(offset,)) for offset in range(8)]
+    # Switch threads as often as possible so an unlocked check-then-deduct would interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in kiosks:
+            thread.start()
+        for thread in kiosks:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    # Every deduction is accounted for by a sandwich that was reported made, and nothing went negative
+    for item, amount in maker.machine_resources.items():
+        used = sum(data.recipes[size]["ingredients"][item] * count for size, count in made.items())
+        assert amount >= 0
+        assert amount == stock[item] - used
+    # The machine ran out, so the kiosks really did compete for the last ingredients
+    assert not any(maker.try_make(size) for size in sizes)
@@ -0,0 +1,82 @@
+# admission.py
+import threading
+
+from fastapi import HTTPException
+from starlette import status
+
+import metrics
+
+IN_FLIGHT = metrics.REGISTRY.gauge(
+    "admission_in_flight", "Requests currently admitted.", ("controller",))
+QUEUE_DEPTH = metrics.REGISTRY.gauge(
+    "admission_queue_depth", "Requests waiting for a free slot.", ("controller",))
+SHED = metrics.REGISTRY.counter(
+    "admission_shed_total", "Requests rejected with 503 because the queue was full or the wait timed out.",
+    ("controller",))
+
+
+class AdmissionController:
+    """
+    Caps concurrent requests for a group of endpoints. Up to `max_in_flight`
+    requests run at once, `max_queue` more may wait up to `queue_timeout`
+    seconds for a slot, and anything beyond that fails fast with 503.
+    """
+
+    def __init__(self, name: str, max_in_flight: int, max_queue: int, queue_timeout: float,
+                 retry_after: int = 1):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+        self._shed = SHED.labels(name)
+        IN_FLIGHT.labels(name).set_function(lambda: self.in_flight)
+        QUEUE_DEPTH.labels(name).set_function(lambda: self.waiting)
+
+    @property
+    def shed_count(self) -> int:
+        return int(self._shed.value)
+
+    def acquire(self) -> bool:
+        with self._cond:
+            # Newcomers queue behind existing waiters instead of jumping ahead of them
+            if self.in_flight < self.max_in_flight and not self.waiting:
+                self.in_flight += 1
+                return True
+            if self.waiting >= self.max_queue:
+                self._shed.inc()
+                return False
+
+            self.waiting += 1
+            try:
+                admitted = self._cond.wait_for(lambda: self.in_flight < self.max_in_flight, self.queue_timeout)
+            finally:
+                self.waiting -= 1
+            if not admitted:
+                self._shed.inc()
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def __call__(self):
+        """
+        FastAPI dependency: holds a slot for the duration of the request.
+        """
+        if not self.acquire():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly.",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        try:
+            yield
+        finally:
+            self.release()
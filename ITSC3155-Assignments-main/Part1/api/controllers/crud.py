@@ -0,0 +1,167 @@
+import typing
+from typing import Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status, Response
+from pydantic import BaseModel
+from sqlalchemy import delete, inspect, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+
+def database_error(db: Session, e: SQLAlchemyError):
+    db.rollback()
+    error = str(getattr(e, "orig", None) or e)
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+
+def _nested_schema(annotation) -> Optional[type]:
+    """
+    The pydantic model inside an annotation such as `Sandwich`, `list[OrderDetail]`
+    or `Optional[Sandwich]`, or None for plain values.
+    """
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in typing.get_args(annotation):
+        nested = _nested_schema(arg)
+        if nested is not None:
+            return nested
+    return None
+
+
+def loader_options(model, response_model, _parent=None) -> Tuple:
+    """
+    Eager-loading options for every relationship the response model nests:
+    selectinload for collections (one extra query per level, no row explosion)
+    and joinedload for many-to-one (joined into the parent's query).
+    """
+    if response_model is None:
+        return ()
+    relationships = inspect(model).relationships
+    options = []
+    for name, field in response_model.model_fields.items():
+        nested = _nested_schema(field.annotation)
+        if nested is None or name not in relationships:
+            continue
+        relationship = relationships[name]
+        strategy = selectinload if relationship.uselist else joinedload
+        attribute = getattr(model, name)
+        option = getattr(_parent, strategy.__name__)(attribute) if _parent is not None else strategy(attribute)
+        options.append(option)
+        options.extend(loader_options(relationship.mapper.class_, nested, option))
+    return tuple(options)
+
+
+class CRUDController:
+    """
+    Create, read, update and delete for one model, shared by the api controllers.
+    `fields` are the columns copied from a create request; reads eagerly load
+    whatever relationships `response_model` serializes.
+
+    Updates and deletes are a single statement: UPDATE ... RETURNING where the
+    dialect supports it (SQLite, PostgreSQL), otherwise UPDATE plus a primary
+    key read (MySQL and MariaDB); DELETE checks its rowcount instead of
+    querying first. An updated row whose response nests relationships is
+    read back with the same eager loading as read_one.
+
+    `view` keeps a read-side projection in step: `view.orders(db, item_id)`
+    names (and locks, before the write) the documents a row feeds and
+    `view.refresh(db, ids)` rewrites them inside the same transaction, before
+    commit. Updates that change no column the documents show
+    (`view.uses(names)` is False) leave them alone.
+    """
+
+    def __init__(self, model, fields: Sequence[str], response_model=None, view=None):
+        self.model = model
+        self.fields = tuple(fields)
+        self.response_model = response_model
+        self.view = view
+        self._options = None
+
+    @property
+    def options(self) -> Tuple:
+        # Built on first use: inspecting relationships needs every model imported
+        if self._options is None:
+            self._options = loader_options(self.model, self.response_model)
+        return self._options
+
+    def create(self, db: Session, request):
+        new_item = self.model(**{name: getattr(request, name) for name in self.fields})
+
+        try:
+            db.add(new_item)
+            if self.view is not None:
+                db.flush()
+                self.view.refresh(db, self.view.orders(db, new_item.id))
+            db.commit()
+            db.refresh(new_item)
+        except SQLAlchemyError as e:
+            raise database_error(db, e)
+
+        return new_item
+
+    def read_all(self, db: Session):
+        try:
+            result = db.query(self.model).options(*self.options).all()
+        except SQLAlchemyError as e:
+            raise database_error(db, e)
+        return result
+
+    def read_one(self, db: Session, item_id):
+        try:
+            item = db.get(self.model, item_id, options=self.options)
+        except SQLAlchemyError as e:
+            raise database_error(db, e)
+        if item is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+        return item
+
+    def update(self, db: Session, item_id, request):
+        update_data = request.model_dump(exclude_unset=True)
+        if not update_data:
+            return self.read_one(db, item_id)
+
+        statement = update(self.model).where(self.model.id == item_id).values(**update_data)
+        view = self.view if self.view is not None and self.view.uses(update_data) else None
+        try:
+            # The row may move between documents, e.g. a detail changing order_id
+            touched = view.orders(db, item_id) if view is not None else set()
+            if db.get_bind().dialect.update_returning and not self.options:
+                item = db.scalars(
+                    statement.returning(self.model),
+                    execution_options={"populate_existing": True},
+                ).first()
+            elif db.get_bind().dialect.update_returning:
+                # Nested responses: RETURNING only confirms the row, the read loads it with
+                # its relationships (and column properties such as totals) eagerly
+                item = None
+                if db.scalars(statement.returning(self.model.id)).first() is not None:
+                    item = db.get(self.model, item_id, options=self.options, populate_existing=True)
+            else:
+                # MySQL has no UPDATE ... RETURNING; rowcount counts matched rows (FOUND_ROWS is set)
+                result = db.execute(statement)
+                item = None
+                if result.rowcount:
+                    item = db.get(self.model, item_id, options=self.options, populate_existing=True)
+            if item is None:
+                db.rollback()
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+            if view is not None:
+                view.refresh(db, touched | view.orders(db, item_id))
+            db.commit()
+        except SQLAlchemyError as e:
+            raise database_error(db, e)
+        return item
+
+    def delete(self, db: Session, item_id):
+        try:
+            touched = self.view.orders(db, item_id) if self.view is not None else set()
+            result = db.execute(delete(self.model).where(self.model.id == item_id))
+            if not result.rowcount:
+                db.rollback()
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+            if self.view is not None:
+                self.view.refresh(db, touched)
+            db.commit()
+        except SQLAlchemyError as e:
+            raise database_error(db, e)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
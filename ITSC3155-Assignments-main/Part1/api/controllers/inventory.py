@@ -0,0 +1,109 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+from ..models.recipes import Recipe
+from ..models.resources import Resource
+from ..models.sandwiches import Sandwich
+
+
+def sandwich_quantities(lines: Iterable[Tuple[int, int]]) -> Dict[int, int]:
+    """
+    Total quantity per sandwich_id from `(sandwich_id, amount)` order lines.
+    """
+    quantities: Dict[int, int] = {}
+    for sandwich_id, amount in lines:
+        quantities[sandwich_id] = quantities.get(sandwich_id, 0) + amount
+    return quantities
+
+
+def required_resources(db: Session, quantities: Dict[int, int]) -> Dict[int, int]:
+    """
+    Amount of each resource needed to make the given sandwich quantities,
+    from one aggregate query over recipes.
+    """
+    if not quantities:
+        return {}
+    quantity = case(quantities, value=Recipe.sandwich_id, else_=0)
+    rows = db.execute(
+        select(Recipe.resource_id, func.sum(Recipe.amount * quantity))
+        .where(Recipe.sandwich_id.in_(quantities))
+        .group_by(Recipe.resource_id)
+    )
+    return {resource_id: int(needed) for resource_id, needed in rows if needed}
+
+
+def consume(db: Session, needed: Dict[int, int]):
+    """
+    Deduct resources in one conditional UPDATE that only touches rows holding
+    enough stock. If any row is short, nothing is deducted and a 409 names the
+    shortfalls. Runs in the caller's transaction; the caller commits.
+    """
+    if not needed:
+        return
+    if any(amount < 0 for amount in needed.values()):
+        # UPDATE ... amount - (negative) would add stock; schemas reject negative order amounts
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail="Resource amounts to consume must not be negative.")
+    amount = case(needed, value=Resource.id)
+    result = db.execute(
+        update(Resource)
+        .where(Resource.id.in_(needed), Resource.amount >= amount)
+        .values(amount=Resource.amount - amount),
+        execution_options={"synchronize_session": False},
+    )
+    if result.rowcount == len(needed):
+        return
+
+    db.rollback()
+    stock = {resource_id: (item, amount) for resource_id, item, amount in
+             db.execute(select(Resource.id, Resource.item, Resource.amount).where(Resource.id.in_(needed)))}
+    short = []
+    for resource_id, amount in sorted(needed.items()):
+        item, available = stock.get(resource_id, (resource_id, 0))
+        if available < amount:
+            short.append(f"{item} (need {amount}, have {available})")
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                        detail=f"Not enough resources: {', '.join(short)}")
+
+
+def consume_for(db: Session, lines: Iterable[Tuple[int, int]]):
+    consume(db, required_resources(db, sandwich_quantities(lines)))
+
+
+def consume_change(db: Session, before: Tuple[int, int], after: Tuple[int, int]):
+    """
+    Deducts what an order line edited from `before` to `after` (sandwich_id,
+    amount) needs beyond what it already took: per resource, the new recipe
+    total minus the old one. Stock is never given back, so a smaller amount
+    or a cheaper sandwich deducts nothing.
+    """
+    if before == after:
+        return
+    taken = required_resources(db, {before[0]: before[1]})
+    needed = required_resources(db, {after[0]: after[1]})
+    consume(db, {resource_id: amount - taken.get(resource_id, 0) for resource_id, amount in needed.items()
+                 if amount > taken.get(resource_id, 0)})
+
+
+def max_makeable(db: Session, sandwich_id: Optional[int] = None) -> List[dict]:
+    """
+    How many of each sandwich the current stock allows: the smallest
+    floor(resource amount / recipe amount) over its recipe, computed in SQL.
+    None for sandwiches without a recipe.
+    """
+    makeable = func.min(Resource.amount // Recipe.amount)
+    query = (
+        select(Sandwich.id, Sandwich.sandwich_name, makeable)
+        .outerjoin(Recipe, (Recipe.sandwich_id == Sandwich.id) & (Recipe.amount > 0))
+        .outerjoin(Resource, Resource.id == Recipe.resource_id)
+        .group_by(Sandwich.id, Sandwich.sandwich_name)
+        .order_by(Sandwich.id)
+    )
+    if sandwich_id is not None:
+        query = query.where(Sandwich.id == sandwich_id)
+    return [
+        {"sandwich_id": row_id, "sandwich_name": name, "max_makeable": None if count is None else max(int(count), 0)}
+        for row_id, name, count in db.execute(query)
+    ]
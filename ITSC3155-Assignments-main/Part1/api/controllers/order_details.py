@@ -1,69 +1,47 @@
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from fastapi import HTTPException, status, Response, Depends
+from . import inventory, order_views
+from .crud import CRUDController, database_error
 from ..models import order_details as model
-from sqlalchemy.exc import SQLAlchemyError
-
-
-def create(db: Session, request):
-    new_item = model.OrderDetail(
-        order_id=request.order_id,
-        sandwich_id=request.sandwich_id,
-        amount=request.amount
-    )
-
-    try:
-        db.add(new_item)
-        db.commit()
-        db.refresh(new_item)
-    except SQLAlchemyError as e:
-        error = str(e.__dict__['orig'])
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-
-    return new_item
+from ..schemas import order_details as schema
 
+_controller = CRUDController(model.OrderDetail, ("order_id", "sandwich_id", "amount"), schema.OrderDetail,
+                             view=order_views.order_details_sync)
 
-def read_all(db: Session):
-    try:
-        result = db.query(model.OrderDetail).all()
-    except SQLAlchemyError as e:
-        error = str(e.__dict__['orig'])
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-    return result
+read_all = _controller.read_all
+read_one = _controller.read_one
+delete = _controller.delete
 
 
-def read_one(db: Session, item_id):
+def create(db: Session, request):
+    """
+    Deducts the line's recipe from inventory in the same transaction as the insert.
+    """
     try:
-        item = db.query(model.OrderDetail).filter(model.OrderDetail.id == item_id).first()
-        if not item:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+        inventory.consume_for(db, [(request.sandwich_id, request.amount)])
     except SQLAlchemyError as e:
-        error = str(e.__dict__['orig'])
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-    return item
+        raise database_error(db, e)
+    return _controller.create(db, request)
 
 
 def update(db: Session, item_id, request):
-    try:
-        item = db.query(model.OrderDetail).filter(model.OrderDetail.id == item_id)
-        if not item.first():
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
-        update_data = request.dict(exclude_unset=True)
-        item.update(update_data, synchronize_session=False)
-        db.commit()
-    except SQLAlchemyError as e:
-        error = str(e.__dict__['orig'])
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-    return item.first()
-
-
-def delete(db: Session, item_id):
-    try:
-        item = db.query(model.OrderDetail).filter(model.OrderDetail.id == item_id)
-        if not item.first():
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
-        item.delete(synchronize_session=False)
-        db.commit()
-    except SQLAlchemyError as e:
-        error = str(e.__dict__['orig'])
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
+    """
+    A new sandwich or a larger amount deducts the extra resources in the same
+    transaction as the update; a 409 leaves the line unchanged.
+    """
+    changes = request.model_dump(exclude_unset=True)
+    if changes.get("sandwich_id") is not None or changes.get("amount") is not None:
+        try:
+            # The order documents are locked first, as in CRUDController.update (see order_views.lock)
+            order_views.order_details_sync.orders(db, item_id)
+            current = db.execute(
+                select(model.OrderDetail.sandwich_id, model.OrderDetail.amount)
+                .where(model.OrderDetail.id == item_id).with_for_update()
+            ).first()
+            if current is not None:
+                inventory.consume_change(db, tuple(current), (changes.get("sandwich_id") or current.sandwich_id,
+                                                              changes.get("amount") or current.amount))
+        except SQLAlchemyError as e:
+            raise database_error(db, e)
+    return _controller.update(db, item_id, request)
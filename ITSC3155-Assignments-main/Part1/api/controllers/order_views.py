@@ -0,0 +1,172 @@
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Sequence, Set
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from .crud import loader_options
+from ..dependencies.config import conf
+from ..models.order_details import OrderDetail
+from ..models.order_views import OrderView
+from ..models.orders import Order
+from ..models.recipes import Recipe
+from ..models.resources import Resource
+from ..schemas import orders as schema
+
+_order_options = None
+
+
+def _options():
+    global _order_options
+    if _order_options is None:
+        _order_options = loader_options(Order, schema.Order)
+    return _order_options
+
+
+def build_documents(db: Session, order_ids: Iterable[int]) -> Dict[int, str]:
+    """
+    Rendered JSON per existing order: the GET /orders/{id} response plus the
+    kitchen ticket (each line's ingredients scaled by its amount). This is the
+    join path the view replaces on reads.
+    """
+    orders = db.scalars(
+        select(Order).where(Order.id.in_(order_ids)).options(*_options())
+        .execution_options(populate_existing=True)
+    ).all()
+    sandwich_ids = {detail.sandwich_id for order in orders for detail in order.order_details}
+    recipes: Dict[int, list] = {}
+    if sandwich_ids:
+        rows = db.execute(
+            select(Recipe.sandwich_id, Resource.item, Recipe.amount)
+            .join(Resource, Resource.id == Recipe.resource_id)
+            .where(Recipe.sandwich_id.in_(sandwich_ids))
+            .order_by(Recipe.sandwich_id, Recipe.id)
+        )
+        for sandwich_id, item, amount in rows:
+            recipes.setdefault(sandwich_id, []).append((item, amount))
+
+    documents = {}
+    for order in orders:
+        ticket = [
+            schema.KitchenLine(
+                sandwich_name=detail.sandwich.sandwich_name if detail.sandwich is not None else None,
+                amount=detail.amount,
+                ingredients=[schema.KitchenIngredient(item=item, amount=amount * detail.amount)
+                             for item, amount in recipes.get(detail.sandwich_id, ())],
+            )
+            for detail in order.order_details
+        ]
+        rendered = schema.Order.model_validate(order, from_attributes=True)
+        documents[order.id] = schema.OrderDocument(**dict(rendered), kitchen_ticket=ticket).model_dump_json()
+    return documents
+
+
+def _upsert(db: Session, documents: Dict[int, str]):
+    table = OrderView.__table__
+    rows = [{"order_id": order_id, "document": document, "refreshed_at": datetime.utcnow()}
+            for order_id, document in documents.items()]
+    if db.get_bind().dialect.name == "mysql":
+        statement = mysql_insert(table)
+        statement = statement.on_duplicate_key_update(
+            document=statement.inserted.document, refreshed_at=statement.inserted.refreshed_at)
+    else:
+        # SQLite, for tests and local runs
+        statement = sqlite_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.order_id],
+            set_={"document": statement.excluded.document, "refreshed_at": statement.excluded.refreshed_at})
+    db.execute(statement, rows)
+
+
+def _locking(order_ids):
+    # In id order, so two writers locking overlapping orders can't deadlock
+    return select(Order.id).where(Order.id.in_(order_ids)).order_by(Order.id).with_for_update()
+
+
+def lock(db: Session, order_ids) -> Set[int]:
+    """
+    SELECT ... FOR UPDATE on these orders (a collection or a query of ids),
+    held until the caller commits; returns the ids that exist. Two writes to
+    one order then render one after the other. Taken before a transaction's
+    first plain read, it also keeps MySQL's REPEATABLE READ snapshot from
+    predating the other writer's commit. SQLite has no row locks and skips it.
+    """
+    return set(db.scalars(_locking(order_ids)))
+
+
+def refresh(db: Session, order_ids: Iterable[Optional[int]]):
+    """
+    Rewrite the documents of these orders, dropping those of deleted orders.
+    Runs in the caller's transaction, under lock(); the caller commits.
+    """
+    order_ids = {order_id for order_id in order_ids if order_id is not None}
+    if not order_ids or not conf.order_view_enabled:
+        return
+    lock(db, order_ids)
+    documents = build_documents(db, order_ids)
+    if documents:
+        _upsert(db, documents)
+    gone = order_ids - documents.keys()
+    if gone:
+        db.execute(delete(OrderView).where(OrderView.order_id.in_(gone)))
+
+
+def read(db: Session, order_id: int) -> Optional[str]:
+    """
+    The stored JSON document: a single primary key lookup. Orders written
+    before the view existed are rendered and stored on first read.
+    """
+    document = db.scalar(select(OrderView.document).where(OrderView.order_id == order_id))
+    if document is not None:
+        return document
+    document = build_documents(db, [order_id]).get(order_id)
+    if document is not None and conf.order_view_enabled:
+        _upsert(db, {order_id: document})
+        db.commit()
+    return document
+
+
+class OrderViewSync:
+    """
+    Tells CRUDController which order documents a write to one of its rows
+    touches, locking them (see lock()); it asks before writing. `affected(item_id)`
+    is a query for those order ids; None means the rows are orders themselves. `fields` are the columns documents show;
+    updates that change none of them (e.g. restocking a resource) are skipped.
+    None means every column.
+    """
+
+    def __init__(self, affected: Optional[Callable[[int], object]] = None, fields: Optional[Sequence[str]] = None):
+        self.affected = affected
+        self.fields = None if fields is None else frozenset(fields)
+
+    def uses(self, changed: Iterable[str]) -> bool:
+        return self.fields is None or not self.fields.isdisjoint(changed)
+
+    def orders(self, db: Session, item_id) -> Set[int]:
+        if not conf.order_view_enabled:
+            return set()
+        if self.affected is None:
+            # Writing the orders row locks it, before any read in update() and delete()
+            return {item_id}
+        return lock(db, self.affected(item_id))
+
+    refresh = staticmethod(refresh)
+
+
+orders_sync = OrderViewSync()
+order_details_sync = OrderViewSync(
+    lambda item_id: select(OrderDetail.order_id).where(OrderDetail.id == item_id))
+sandwiches_sync = OrderViewSync(
+    lambda item_id: select(OrderDetail.order_id).where(OrderDetail.sandwich_id == item_id).distinct())
+recipes_sync = OrderViewSync(
+    lambda item_id: select(OrderDetail.order_id)
+    .join(Recipe, Recipe.sandwich_id == OrderDetail.sandwich_id)
+    .where(Recipe.id == item_id).distinct(),
+    fields=("sandwich_id", "resource_id", "amount"))
+# Tickets show a resource's name only, never its stock
+resources_sync = OrderViewSync(
+    lambda item_id: select(OrderDetail.order_id)
+    .join(Recipe, Recipe.sandwich_id == OrderDetail.sandwich_id)
+    .where(Recipe.resource_id == item_id).distinct(),
+    fields=("item",))
@@ -1,68 +1,95 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import func, insert, select, type_coerce
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from fastapi import HTTPException, status, Response, Depends
+from . import inventory, order_views
+from .crud import CRUDController, database_error
 from ..models import orders as model
-from sqlalchemy.exc import SQLAlchemyError
-
+from ..models.order_details import MONEY, OrderDetail
+from ..models.sandwiches import Sandwich
+from ..schemas import orders as schema
 
-def create(db: Session, request):
-    new_item = model.Order(
-        customer_name=request.customer_name,
-        description=request.description
-    )
+_controller = CRUDController(model.Order, ("customer_name", "description"), schema.Order,
+                             view=order_views.orders_sync)
 
-    try:
-        db.add(new_item)
-        db.commit()
-        db.refresh(new_item)
-    except SQLAlchemyError as e:
-        error = str(e.__dict__['orig'])
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+create = _controller.create
+read_all = _controller.read_all
+read_one = _controller.read_one
+update = _controller.update
+delete = _controller.delete
 
-    return new_item
 
-
-def read_all(db: Session):
+def create_with_details(db: Session, request):
+    """
+    An order and all of its detail lines in one transaction: one query checks
+    every sandwich_id, one UPDATE deducts the recipes' resources and one
+    multi-row INSERT writes the lines.
+    """
+    sandwich_ids = {line.sandwich_id for line in request.order_details}
     try:
-        result = db.query(model.Order).all()
-    except SQLAlchemyError as e:
-        error = str(e.__dict__['orig'])
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-    return result
+        found = set(db.scalars(select(Sandwich.id).where(Sandwich.id.in_(sandwich_ids))))
+        missing = sorted(sandwich_ids - found)
+        if missing:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail=f"Sandwich id(s) not found: {', '.join(map(str, missing))}")
 
+        inventory.consume_for(db, [(line.sandwich_id, line.amount) for line in request.order_details])
 
-def read_one(db: Session, item_id):
-    try:
-        item = db.query(model.Order).filter(model.Order.id == item_id).first()
-        if not item:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+        order = model.Order(customer_name=request.customer_name, description=request.description)
+        db.add(order)
+        db.flush()
+        db.execute(insert(OrderDetail.__table__).values([
+            {"order_id": order.id, "sandwich_id": line.sandwich_id, "amount": line.amount}
+            for line in request.order_details
+        ]))
+        order_views.refresh(db, {order.id})
+        db.commit()
+        # Reload with the response's eager-loading options; the lines were written behind the ORM's back
+        return db.get(model.Order, order.id, options=_controller.options, populate_existing=True)
     except SQLAlchemyError as e:
-        error = str(e.__dict__['orig'])
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-    return item
+        raise database_error(db, e)
 
 
-def update(db: Session, item_id, request):
+def read_view(db: Session, item_id):
+    """
+    The order's pre-rendered JSON document from order_view.
+    """
     try:
-        item = db.query(model.Order).filter(model.Order.id == item_id)
-        if not item.first():
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
-        update_data = request.dict(exclude_unset=True)
-        item.update(update_data, synchronize_session=False)
-        db.commit()
+        document = order_views.read(db, item_id)
     except SQLAlchemyError as e:
-        error = str(e.__dict__['orig'])
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-    return item.first()
+        raise database_error(db, e)
+    if document is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+    return Response(content=document, media_type="application/json")
 
 
-def delete(db: Session, item_id):
+def daily_totals(db: Session, start: Optional[date] = None, end: Optional[date] = None):
+    """
+    Order count and SUM(amount * price) per day, aggregated in one query.
+    `end` is inclusive.
+    """
+    day = func.date(model.Order.order_date)
+    query = (
+        select(
+            day.label("day"),
+            func.count(func.distinct(model.Order.id)).label("orders"),
+            type_coerce(func.coalesce(func.sum(OrderDetail.amount * Sandwich.price), 0), MONEY).label("total"),
+        )
+        .select_from(model.Order)
+        .outerjoin(OrderDetail, OrderDetail.order_id == model.Order.id)
+        .outerjoin(Sandwich, Sandwich.id == OrderDetail.sandwich_id)
+        .group_by(day)
+        .order_by(day)
+    )
+    # Compare the raw column so an index on order_date can be used
+    if start is not None:
+        query = query.where(model.Order.order_date >= start)
+    if end is not None:
+        query = query.where(model.Order.order_date < end + timedelta(days=1))
     try:
-        item = db.query(model.Order).filter(model.Order.id == item_id)
-        if not item.first():
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
-        item.delete(synchronize_session=False)
-        db.commit()
+        return [row._asdict() for row in db.execute(query)]
     except SQLAlchemyError as e:
-        error = str(e.__dict__['orig'])
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
+        raise database_error(db, e)
@@ -0,0 +1,13 @@
+from . import order_views
+from .crud import CRUDController
+from ..models import recipes as model
+from ..schemas import recipes as schema
+
+_controller = CRUDController(model.Recipe, ("sandwich_id", "resource_id", "amount"), schema.Recipe,
+                             view=order_views.recipes_sync)
+
+create = _controller.create
+read_all = _controller.read_all
+read_one = _controller.read_one
+update = _controller.update
+delete = _controller.delete
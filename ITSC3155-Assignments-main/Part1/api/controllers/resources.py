@@ -0,0 +1,13 @@
+from . import order_views
+from .crud import CRUDController
+from ..models import resources as model
+from ..schemas import resources as schema
+
+_controller = CRUDController(model.Resource, ("item", "amount"), schema.Resource,
+                             view=order_views.resources_sync)
+
+create = _controller.create
+read_all = _controller.read_all
+read_one = _controller.read_one
+update = _controller.update
+delete = _controller.delete
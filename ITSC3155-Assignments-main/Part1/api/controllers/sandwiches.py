@@ -0,0 +1,13 @@
+from . import order_views
+from .crud import CRUDController
+from ..models import sandwiches as model
+from ..schemas import sandwiches as schema
+
+_controller = CRUDController(model.Sandwich, ("sandwich_name", "price"), schema.Sandwich,
+                             view=order_views.sandwiches_sync)
+
+create = _controller.create
+read_all = _controller.read_all
+read_one = _controller.read_one
+update = _controller.update
+delete = _controller.delete
@@ -1,3 +1,7 @@
+import os
+import tempfile
+
+
 class conf:
     db_host = "localhost"
     db_name = "Part1"
@@ -5,4 +9,29 @@ class conf:
     db_user = "root"
     db_password = "rootroot"
     app_host = "localhost"
-    app_port = 8000
\ No newline at end of file
+    app_port = 8000
+    # One process: the store app keeps its event stream, kitchen queue and admission limits in memory
+    app_workers = int(os.getenv("APP_WORKERS", "1"))
+    # Admission control for order-mutating endpoints
+    order_max_in_flight = 8
+    order_max_queue = 16
+    order_queue_timeout = 2.0
+    # Order event stream for kitchen displays
+    order_event_history = 1000
+    order_event_heartbeat = 15.0
+    # Kitchen prep queue
+    kitchen_stations = 3
+    kitchen_prep_seconds_per_item = 120
+    # Product search index; rebuilt after this many seconds to pick up other workers' writes
+    product_search_refresh = 300.0
+    # Promo code engine caches
+    promo_cache_ttl = 60.0
+    promo_negative_cache_ttl = 30.0
+    product_price_cache_ttl = 60.0
+    # Background deactivation of expired promo codes
+    promo_sweep_interval = 300.0
+    promo_sweep_batch_size = 1000
+    # Where POST /reviews/import writes reject files
+    review_import_reject_dir = os.getenv("REVIEW_IMPORT_REJECT_DIR", tempfile.gettempdir())
+    # Denormalized order_view documents kept up to date by the api controllers
+    order_view_enabled = os.getenv("ORDER_VIEW_ENABLED", "1") != "0"
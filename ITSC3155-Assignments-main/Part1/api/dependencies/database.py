@@ -1,3 +1,4 @@
+import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import conf
@@ -7,7 +8,11 @@ SQLALCHEMY_DATABASE_URL = f"mysql+pymysql://{conf.db_user}:{quote_plus(conf.db_p
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Request-scoped sessions: rows returned by a write stay loaded after commit instead of being re-read
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Forked workers must not reuse the parent's sockets; each child opens its own pool
+os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
 
 Base = declarative_base()
 
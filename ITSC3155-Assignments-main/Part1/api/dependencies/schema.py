@@ -0,0 +1,111 @@
+import hashlib
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, delete, insert, inspect, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateColumn
+
+# Bookkeeping table kept out of the application metadata on purpose
+_version_metadata = MetaData()
+schema_versions = Table(
+    "schema_versions",
+    _version_metadata,
+    Column("component", String(50), primary_key=True),
+    Column("version", String(64), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+_current = set()
+_lock = threading.Lock()
+
+
+def schema_fingerprint(metadata):
+    """
+    Hash of every table, column and index in the metadata. Any model change
+    produces a new version and triggers a create pass on the next boot.
+    """
+    digest = hashlib.sha256()
+    for table in sorted(metadata.sorted_tables, key=lambda t: t.name):
+        digest.update(table.name.encode())
+        for column in table.columns:
+            digest.update(f"{column.name}:{column.type!r}:{column.nullable}:{column.primary_key}".encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            columns = ",".join(column.name for column in index.columns)
+            digest.update(f"{index.name}:{columns}:{index.unique}".encode())
+    return digest.hexdigest()
+
+
+def _stored_version(engine, component):
+    try:
+        with engine.connect() as conn:
+            return conn.execute(
+                select(schema_versions.c.version).where(schema_versions.c.component == component)
+            ).scalar()
+    except DBAPIError:
+        # Version table missing: first boot against this database
+        return None
+
+
+def _apply(engine, metadata, component, version):
+    with engine.begin() as conn:
+        metadata.create_all(conn)
+        # create_all skips existing tables, so add columns and indexes declared later on
+        inspector = inspect(conn)
+        missing = []
+        for table in metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            missing.extend((table, column) for column in table.columns if column.name not in existing)
+        # Existing rows need a value: a NOT NULL column without a server default needs a migration.
+        # Failing here leaves the version unstamped, so the next boot tries again.
+        unaddable = [f"{table.name}.{column.name}" for table, column in missing
+                     if not column.nullable and column.server_default is None]
+        if unaddable:
+            raise RuntimeError(f"Cannot add NOT NULL columns without a server default: {', '.join(unaddable)}")
+        for table, column in missing:
+            conn.execute(text(
+                f"ALTER TABLE {conn.dialect.identifier_preparer.format_table(table)} "
+                f"ADD COLUMN {CreateColumn(column).compile(dialect=conn.dialect)}"
+            ))
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        _version_metadata.create_all(conn)
+        conn.execute(delete(schema_versions).where(schema_versions.c.component == component))
+        conn.execute(insert(schema_versions).values(
+            component=component, version=version, applied_at=datetime.utcnow()
+        ))
+
+
+def ensure_schema(engine, metadata, component):
+    """
+    Create missing tables and indexes once per process. A single SELECT against
+    `schema_versions` decides whether any DDL is needed at all.
+    Returns True when DDL was applied.
+    """
+    key = (id(engine), component)
+    if key in _current:
+        return False
+
+    with _lock:
+        if key in _current:
+            return False
+
+        version = schema_fingerprint(metadata)
+        applied = False
+        for attempt in range(3):
+            if _stored_version(engine, component) == version:
+                break
+            try:
+                _apply(engine, metadata, component, version)
+                applied = True
+                break
+            except DBAPIError:
+                # Another worker booting against the same database won the race; re-check
+                if attempt == 2:
+                    raise
+                time.sleep(0.1 * (attempt + 1))
+
+        _current.add(key)
+        return applied
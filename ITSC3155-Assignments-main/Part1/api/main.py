@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -11,7 +13,14 @@ from .dependencies.config import conf
 from .. import models, schemas
 from ..database import engine, get_db
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    model_loader.index()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 origins = ["*"]
 
@@ -23,7 +32,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-model_loader.index()
 indexRoute.load_routes(app)
 
 if __name__ == "__main__":
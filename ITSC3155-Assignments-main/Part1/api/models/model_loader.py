@@ -1,11 +1,13 @@
-from . import orders, order_details, recipes, sandwiches, resources
+from . import orders, order_details, order_views, recipes, sandwiches, resources
 
-from ..dependencies.database import engine
+from ..dependencies.database import engine, Base
+from ..dependencies.schema import ensure_schema
 
 
 def index():
-    orders.Base.metadata.create_all(engine)
-    order_details.Base.metadata.create_all(engine)
-    recipes.Base.metadata.create_all(engine)
-    sandwiches.Base.metadata.create_all(engine)
-    resources.Base.metadata.create_all(engine)
+    # All models share one Base, so a single pass covers every table
+    return ensure_schema(engine, Base.metadata, "api")
+
+
+if __name__ == "__main__":
+    index()
@@ -1,7 +1,12 @@
 from sqlalchemy import Column, ForeignKey, Integer, String, DECIMAL, DATETIME
-from sqlalchemy.orm import relationship
+from sqlalchemy import select, type_coerce
+from sqlalchemy.orm import column_property, relationship
 from datetime import datetime
 from ..dependencies.database import Base
+from .sandwiches import Sandwich
+
+# Sums of DECIMAL(4, 2) prices; wide enough for any realistic order or day
+MONEY = DECIMAL(12, 2)
 
 class OrderDetail(Base):
     __tablename__ = "order_details"
@@ -10,6 +15,12 @@ class OrderDetail(Base):
     order_id = Column(Integer, ForeignKey("orders.id"))
     sandwich_id = Column(Integer, ForeignKey("sandwiches.id"))
     amount = Column(Integer, index=True, nullable=False)
+    # amount * price, computed by the database so it stays exact
+    subtotal = column_property(
+        select(type_coerce(amount * Sandwich.price, MONEY))
+        .where(Sandwich.id == sandwich_id)
+        .scalar_subquery()
+    )
 
     sandwich = relationship("Sandwich", back_populates="order_details")
     order = relationship("Order", back_populates="order_details")
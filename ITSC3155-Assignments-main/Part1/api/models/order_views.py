@@ -0,0 +1,16 @@
+from sqlalchemy import Column, ForeignKey, Integer, Text, DATETIME
+from datetime import datetime
+from ..dependencies.database import Base
+
+
+class OrderView(Base):
+    """
+    Read-side projection: one pre-rendered JSON document per order, rewritten
+    in the same transaction as every change to the order, its details, or the
+    sandwiches, recipes and resources it refers to.
+    """
+    __tablename__ = "order_view"
+
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), primary_key=True)
+    document = Column(Text, nullable=False)
+    refreshed_at = Column(DATETIME, nullable=False, default=datetime.utcnow)
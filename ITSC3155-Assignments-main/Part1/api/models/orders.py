@@ -1,7 +1,10 @@
 from sqlalchemy import Column, ForeignKey, Integer, String, DECIMAL, DATETIME
-from sqlalchemy.orm import relationship
+from sqlalchemy import func, select, type_coerce
+from sqlalchemy.orm import column_property, relationship
 from datetime import datetime
 from ..dependencies.database import Base
+from .order_details import MONEY, OrderDetail
+from .sandwiches import Sandwich
 
 
 class Order(Base):
@@ -9,7 +12,15 @@ class Order(Base):
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     customer_name = Column(String(100))
-    order_date = Column(DATETIME, nullable=False, server_default=str(datetime.now()))
+    order_date = Column(DATETIME, nullable=False, server_default=func.now())
     description = Column(String(300))
+    # SUM(amount * price) over the order's details, computed by the database
+    total = column_property(
+        select(type_coerce(func.coalesce(func.sum(OrderDetail.amount * Sandwich.price), 0), MONEY))
+        .select_from(OrderDetail)
+        .join(Sandwich, Sandwich.id == OrderDetail.sandwich_id)
+        .where(OrderDetail.order_id == id)
+        .scalar_subquery()
+    )
 
     order_details = relationship("OrderDetail", back_populates="order")
\ No newline at end of file
@@ -1,6 +1,9 @@
-from . import orders, order_details
+from . import orders, order_details, sandwiches, recipes, resources
 
 
 def load_routes(app):
     app.include_router(orders.router)
     app.include_router(order_details.router)
+    app.include_router(sandwiches.router)
+    app.include_router(recipes.router)
+    app.include_router(resources.router)
@@ -1,3 +1,6 @@
+from datetime import date
+from typing import Optional
+
 from fastapi import APIRouter, Depends, FastAPI, status, Response
 from sqlalchemy.orm import Session
 from ..controllers import orders as controller
@@ -15,16 +18,31 @@ def create(request: schema.OrderCreate, db: Session = Depends(get_db)):
     return controller.create(db=db, request=request)
 
 
+@router.post("/with_details", response_model=schema.Order)
+def create_with_details(request: schema.OrderWithDetailsCreate, db: Session = Depends(get_db)):
+    return controller.create_with_details(db=db, request=request)
+
+
 @router.get("/", response_model=list[schema.Order])
 def read_all(db: Session = Depends(get_db)):
     return controller.read_all(db)
 
 
+@router.get("/totals/daily", response_model=list[schema.DailyTotal])
+def read_daily_totals(start: Optional[date] = None, end: Optional[date] = None, db: Session = Depends(get_db)):
+    return controller.daily_totals(db, start=start, end=end)
+
+
 @router.get("/{item_id}", response_model=schema.Order)
 def read_one(item_id: int, db: Session = Depends(get_db)):
     return controller.read_one(db, item_id=item_id)
 
 
+@router.get("/{item_id}/view", response_model=schema.OrderDocument)
+def read_one_view(item_id: int, db: Session = Depends(get_db)):
+    return controller.read_view(db, item_id=item_id)
+
+
 @router.put("/{item_id}", response_model=schema.Order)
 def update(item_id: int, request: schema.OrderUpdate, db: Session = Depends(get_db)):
     return controller.update(db=db, request=request, item_id=item_id)
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, status, Response
+from sqlalchemy.orm import Session
+from ..controllers import inventory, sandwiches as controller
+from ..schemas import sandwiches as schema
+from ..dependencies.database import engine, get_db
+
+router = APIRouter(
+    tags=['Sandwiches'],
+    prefix="/sandwiches"
+)
+
+
+@router.post("/", response_model=schema.Sandwich)
+def create(request: schema.SandwichCreate, db: Session = Depends(get_db)):
+    return controller.create(db=db, request=request)
+
+
+@router.get("/", response_model=list[schema.Sandwich])
+def read_all(db: Session = Depends(get_db)):
+    return controller.read_all(db)
+
+
+@router.get("/makeable", response_model=list[schema.SandwichAvailability])
+def read_makeable(db: Session = Depends(get_db)):
+    return inventory.max_makeable(db)
+
+
+@router.get("/{item_id}/makeable", response_model=schema.SandwichAvailability)
+def read_one_makeable(item_id: int, db: Session = Depends(get_db)):
+    rows = inventory.max_makeable(db, sandwich_id=item_id)
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+    return rows[0]
+
+
+@router.get("/{item_id}", response_model=schema.Sandwich)
+def read_one(item_id: int, db: Session = Depends(get_db)):
+    return controller.read_one(db, item_id=item_id)
+
+
+@router.put("/{item_id}", response_model=schema.Sandwich)
+def update(item_id: int, request: schema.SandwichUpdate, db: Session = Depends(get_db)):
+    return controller.update(db=db, request=request, item_id=item_id)
+
+
+@router.delete("/{item_id}")
+def delete(item_id: int, db: Session = Depends(get_db)):
+    return controller.delete(db=db, item_id=item_id)
@@ -1,26 +1,33 @@
 from datetime import datetime
+from decimal import Decimal
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from .sandwiches import Sandwich
 
 
 class OrderDetailBase(BaseModel):
-    amount: int
+    amount: int = Field(gt=0)  # A negative amount would add stock back when its recipe is consumed
 
 
 class OrderDetailCreate(OrderDetailBase):
     order_id: int
     sandwich_id: int
 
+class OrderDetailLine(OrderDetailBase):
+    sandwich_id: int
+
+
 class OrderDetailUpdate(BaseModel):
     order_id: Optional[int] = None
     sandwich_id: Optional[int] = None
-    amount: Optional[int] = None
+    amount: Optional[int] = Field(None, gt=0)
 
 
 class OrderDetail(OrderDetailBase):
+    amount: int  # Rows stored before amounts were validated still serialize
     id: int
     order_id: int
+    subtotal: Optional[Decimal] = None
     sandwich: Sandwich = None
 
     class ConfigDict:
@@ -1,7 +1,8 @@
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal
 from typing import Optional
-from pydantic import BaseModel
-from .order_details import OrderDetail
+from pydantic import BaseModel, Field
+from .order_details import OrderDetail, OrderDetailLine
 
 
 
@@ -14,6 +15,10 @@ class OrderCreate(OrderBase):
     pass
 
 
+class OrderWithDetailsCreate(OrderBase):
+    order_details: list[OrderDetailLine] = Field(min_length=1)
+
+
 class OrderUpdate(BaseModel):
     customer_name: Optional[str] = None
     description: Optional[str] = None
@@ -22,7 +27,29 @@ class OrderUpdate(BaseModel):
 class Order(OrderBase):
     id: int
     order_date: Optional[datetime] = None
+    total: Optional[Decimal] = None
     order_details: list[OrderDetail] = None
 
     class ConfigDict:
         from_attributes = True
+
+
+class DailyTotal(BaseModel):
+    day: date
+    orders: int
+    total: Decimal
+
+
+class KitchenIngredient(BaseModel):
+    item: str
+    amount: int
+
+
+class KitchenLine(BaseModel):
+    sandwich_name: Optional[str] = None
+    amount: int
+    ingredients: list[KitchenIngredient]
+
+
+class OrderDocument(Order):
+    kitchen_ticket: list[KitchenLine]
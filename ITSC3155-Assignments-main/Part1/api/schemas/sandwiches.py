@@ -1,11 +1,14 @@
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, condecimal
+
+# Matches the DECIMAL(4, 2) column, so prices are stored exactly as sent
+Price = condecimal(max_digits=4, decimal_places=2, ge=0)
 
 
 class SandwichBase(BaseModel):
     sandwich_name: str
-    price: float
+    price: Price
 
 
 class SandwichCreate(SandwichBase):
@@ -14,11 +17,17 @@ class SandwichCreate(SandwichBase):
 
 class SandwichUpdate(BaseModel):
     sandwich_name: Optional[str] = None
-    price: Optional[float] = None
+    price: Optional[Price] = None
 
 
 class Sandwich(SandwichBase):
     id: int
 
     class ConfigDict:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class SandwichAvailability(BaseModel):
+    sandwich_id: int
+    sandwich_name: Optional[str] = None
+    max_makeable: Optional[int] = None  # None when the sandwich has no recipe
@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+PART1 = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The store app (Part1/main.py) uses flat imports such as `import models`, as when it is run from Part1
+if PART1 not in sys.path:
+    sys.path.insert(0, PART1)
+
+# Always a throwaway SQLite file: the store tests delete every row between tests
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'store.db')}"
+
+
+@pytest.fixture
+def store():
+    """
+    TestClient for the store app (Part1/main.py), with the lifespan run and
+    every store table emptied afterwards.
+    """
+    import main
+    import models
+    from database import engine
+
+    with TestClient(main.app) as client:
+        yield client
+    with engine.begin() as conn:
+        for table in reversed(models.Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    main.kitchen.rebuild(())
+
+
+@pytest.fixture
+def db(tmp_path):
+    """
+    Session on a fresh SQLite file with every api table. Each SQL statement it
+    sends is recorded in `db.statements`. Test modules seed data by overriding
+    this fixture with one that takes `db`.
+    """
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+    from ..dependencies.database import Base
+    from ..models import model_loader  # noqa: F401  registers every api model on Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'api.db'}")
+    Base.metadata.create_all(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    session.statements = statements
+    yield session
+    session.close()
+    engine.dispose()
@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+import admission
+from api.dependencies.config import conf
+
+ORDER = {"order_type": "takeout", "order_status": "prepping", "product_ids": [999]}
+
+
+@pytest.fixture
+def admitted(store, monkeypatch):
+    """
+    The store's order admission controller with every slot taken, as under
+    `conf.order_max_in_flight` concurrent order writes.
+    """
+    import main
+    controller = main.order_admission
+    monkeypatch.setattr(controller, "max_queue", 0)
+    for _ in range(conf.order_max_in_flight):
+        assert controller.acquire()
+    yield controller
+    for _ in range(conf.order_max_in_flight):
+        controller.release()
+
+
+def test_saturated_order_endpoints_shed_with_retry_after(store, admitted):
+    shed = admitted.shed_count
+
+    response = store.post("/orders/", json=ORDER)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(admitted.retry_after)
+    assert admitted.shed_count - shed == 1
+    # Read endpoints are not behind the controller
+    assert store.get("/orders/").status_code != 503
+
+
+def test_queued_requests_time_out(store, admitted, monkeypatch):
+    monkeypatch.setattr(admitted, "max_queue", 1)
+    monkeypatch.setattr(admitted, "queue_timeout", 0.05)
+    shed = admitted.shed_count
+
+    started = time.monotonic()
+    response = store.post("/orders/", json=ORDER)
+
+    assert response.status_code == 503
+    assert time.monotonic() - started >= 0.05
+    assert admitted.shed_count - shed == 1
+    assert admitted.waiting == 0
+
+
+def test_queued_request_runs_once_a_slot_frees(store, admitted, monkeypatch):
+    monkeypatch.setattr(admitted, "max_queue", 1)
+    monkeypatch.setattr(admitted, "queue_timeout", 5)
+    threading.Timer(0.05, admitted.release).start()
+
+    response = store.post("/orders/", json=ORDER)
+
+    # Admitted and handled (the product does not exist), not shed
+    assert response.status_code != 503
+    assert admitted.acquire()  # Take the freed slot back for the fixture's releases
+
+
+def test_slots_are_released_after_handler_errors(store):
+    import main
+    controller = main.order_admission
+
+    # Both fail inside the handler: unknown product, unknown order
+    assert store.post("/orders/", json=ORDER).status_code >= 400
+    assert store.put("/orders/12345", json={"order_type": "delivery"}).status_code >= 400
+    assert controller.in_flight == 0
+    assert controller.waiting == 0
+
+
+def test_slots_are_released_after_unhandled_exceptions():
+    controller = admission.AdmissionController("test-errors", max_in_flight=1, max_queue=0, queue_timeout=0)
+    app = FastAPI()
+
+    @app.post("/boom", dependencies=[Depends(controller)])
+    def boom():
+        raise RuntimeError("boom")
+
+    client = TestClient(app, raise_server_exceptions=False)
+    assert client.post("/boom").status_code == 500
+    assert client.post("/boom").status_code == 500
+    assert controller.in_flight == 0
+    assert controller.shed_count == 0
@@ -0,0 +1,89 @@
+import random
+
+from ...autocomplete import Autocomplete, normalize
+
+
+def make_index():
+    index = Autocomplete()
+    index.rebuild([
+        ("product", 1, "Turkey Club"),
+        ("product", 2, "Tuna Melt"),
+        ("product", 3, "Club Deluxe"),
+        ("ingredient", 1, "Turkey"),
+        ("ingredient", 2, "Tomato"),
+    ])
+    return index
+
+
+def test_prefix_matches_rank_whole_name_and_shorter_first():
+    index = make_index()
+
+    assert index.suggest("tu") == [("ingredient", 1, "Turkey"), ("product", 2, "Tuna Melt"),
+                                   ("product", 1, "Turkey Club")]
+    assert index.suggest("club") == [("product", 3, "Club Deluxe"), ("product", 1, "Turkey Club")]
+    assert index.suggest("tu", kind="product", limit=1) == [("product", 2, "Tuna Melt")]
+
+
+def test_single_typo_is_tolerated():
+    index = make_index()
+
+    assert ("product", 1, "Turkey Club") in index.suggest("turkye")  # transposition
+    assert index.suggest("tomsto") == [("ingredient", 2, "Tomato")]  # substitution
+    assert index.suggest("tmato") == [("ingredient", 2, "Tomato")]  # deletion
+    assert index.suggest("xyzzy") == []
+
+
+def test_add_update_remove():
+    index = make_index()
+    index.add("product", 2, "Tuna Wrap")
+    index.remove("product", 1)
+    index.add("product", 4, "Turkey Wrap")
+
+    assert [name for _, _, name in index.suggest("wrap")] == ["Tuna Wrap", "Turkey Wrap"]
+    assert "Turkey Club" not in [name for _, _, name in index.suggest("turkey c")]
+    assert len(index) == 5
+
+
+def _brute_force(names, query, limit, kind=None):
+    # The ranking rule applied to every name, for comparison
+    ranked = []
+    for (item_kind, item_id), name in names.items():
+        words = normalize(name).split()
+        offsets = [i for i, _ in enumerate(words) if " ".join(words[i:]).startswith(query)]
+        if offsets and kind in (None, item_kind):
+            tail = " ".join(words[offsets[0]:]) if offsets[0] == 0 else min(
+                " ".join(words[i:]) for i in offsets if i > 0)
+            ranked.append(((offsets[0] > 0, len(name), tail, name.lower(), item_kind, item_id), (item_kind, item_id)))
+    return [ref for _, ref in sorted(ranked)[:limit]]
+
+
+def test_short_prefixes_return_the_true_top_matches():
+    index = Autocomplete()
+    # Hundreds of long names sort before the one short whole-name match
+    rows = [("product", i, f"Apple Bacon Melt {i:03}") for i in range(300)]
+    rows += [("product", 300, "Avocado Toast"), ("ingredient", 1, "Anchovy"), ("product", 301, "Big Apple")]
+    index.rebuild(rows)
+
+    assert [name for _, _, name in index.suggest("a", limit=3)] == ["Anchovy", "Avocado Toast",
+                                                                    "Apple Bacon Melt 000"]
+    assert index.suggest("a", limit=1, kind="product") == [("product", 300, "Avocado Toast")]
+
+
+def test_ranking_matches_brute_force_after_updates():
+    rng = random.Random(7)
+    words = ["turkey", "tuna", "club", "melt", "tomato", "wrap", "trio", "ham", "toast"]
+    index = Autocomplete(min_typo_length=100)  # prefix matches only
+    names = {}
+    for step in range(400):
+        ref = (rng.choice(["product", "ingredient"]), rng.randint(1, 60))
+        if rng.random() < 0.2:
+            index.remove(*ref)
+            names.pop(ref, None)
+        else:
+            names[ref] = " ".join(rng.choice(words) for _ in range(rng.randint(1, 3)))
+            index.add(*ref, names[ref])
+
+    for query in ["t", "tu", "tom", "m", "club", "wrap t", "x"]:
+        for kind in (None, "product"):
+            expected = _brute_force(names, query, 8, kind)
+            assert [(k, i) for k, i, _ in index.suggest(query, limit=8, kind=kind)] == expected, query
@@ -0,0 +1,82 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from ...response_compression import CompressionMiddleware, negotiate, no_compression
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+ROWS = [{"name": "Burger", "ingredients": [{"name": "bun", "quantity": 1}]}] * 50
+
+
+@app.get("/small")
+def small():
+    return {"ok": True}
+
+
+@app.get("/large")
+def large():
+    return ROWS
+
+
+@app.get("/raw")
+@no_compression
+def raw():
+    return ROWS
+
+
+@app.get("/cors")
+def cors():
+    return JSONResponse(ROWS, headers={"Vary": "Origin, Cookie"})
+
+
+@app.get("/export")
+def export():
+    return StreamingResponse((b"line %d\n" % i for i in range(1000)), media_type="text/plain")
+
+
+client = TestClient(app)
+
+
+def test_negotiate_respects_quality():
+    assert negotiate("gzip;q=0, identity", {"gzip": None}) is None
+    assert negotiate("br;q=1.0, gzip;q=0.5", {"gzip": None}) == "gzip"
+
+
+def test_small_response_is_not_compressed():
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_large_response_is_compressed():
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == ROWS
+
+
+def test_compressed_response_varies_on_accept_encoding():
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_upstream_vary_is_kept():
+    response = client.get("/cors", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers.get_list("vary") == ["Origin, Cookie, Accept-Encoding"]
+
+
+def test_route_opt_out():
+    response = client.get("/raw", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == ROWS
+
+
+def test_streaming_response_is_compressed_incrementally():
+    with client.stream("GET", "/export", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        raw = b"".join(response.iter_raw())
+    assert gzip.decompress(raw).count(b"\n") == 1000
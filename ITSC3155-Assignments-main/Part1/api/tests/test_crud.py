@@ -0,0 +1,164 @@
+from datetime import date, datetime
+from decimal import Decimal
+import pytest
+from fastapi import HTTPException
+from ..controllers import orders, resources as controller
+from ..dependencies.config import conf
+from ..models import order_details as detail_model, orders as order_model, sandwiches as sandwich_model
+from ..schemas import orders as order_schema, resources as schema
+
+
+@pytest.fixture
+def no_order_view(monkeypatch):
+    # Statement counts below are for the writes alone, without order_view maintenance
+    monkeypatch.setattr(conf, "order_view_enabled", False)
+
+
+def test_update_is_one_statement(db, no_order_view):
+    item = controller.create(db, schema.ResourceCreate(item="bread", amount=10))
+    db.statements.clear()
+
+    updated = controller.update(db, item.id, schema.ResourceUpdate(amount=4))
+
+    assert (updated.item, updated.amount) == ("bread", 4)
+    assert [s.split()[0] for s in db.statements] == ["UPDATE"]
+    assert "RETURNING" in db.statements[0]
+
+
+def test_delete_is_one_statement(db, no_order_view):
+    item = controller.create(db, schema.ResourceCreate(item="ham", amount=3))
+    db.statements.clear()
+
+    response = controller.delete(db, item.id)
+
+    assert response.status_code == 204
+    assert [s.split()[0] for s in db.statements] == ["DELETE"]
+    with pytest.raises(HTTPException) as missing:
+        controller.read_one(db, item.id)
+    assert missing.value.status_code == 404
+
+
+def test_missing_ids_are_404(db):
+    with pytest.raises(HTTPException) as update_missing:
+        controller.update(db, 42, schema.ResourceUpdate(amount=1))
+    with pytest.raises(HTTPException) as delete_missing:
+        controller.delete(db, 42)
+    assert update_missing.value.status_code == delete_missing.value.status_code == 404
+
+
+def test_constraint_errors_are_400(db):
+    controller.create(db, schema.ResourceCreate(item="cheese", amount=1))
+    other = controller.create(db, schema.ResourceCreate(item="lettuce", amount=1))
+
+    with pytest.raises(HTTPException) as duplicate:
+        controller.update(db, other.id, schema.ResourceUpdate(item="cheese"))
+    assert duplicate.value.status_code == 400
+    assert controller.read_one(db, other.id).item == "lettuce"
+
+
+def _add_orders(db, count):
+    sandwiches = [sandwich_model.Sandwich(sandwich_name=f"S{len(db.statements)}-{i}", price=5) for i in range(3)]
+    for i in range(count):
+        order = order_model.Order(customer_name=f"Customer {i}")
+        order.order_details = [detail_model.OrderDetail(sandwich=sandwich, amount=1) for sandwich in sandwiches]
+        db.add(order)
+    db.commit()
+    db.expunge_all()
+
+
+def _list_orders_queries(db):
+    db.expunge_all()
+    db.statements.clear()
+    listed = [order_schema.Order.model_validate(order, from_attributes=True) for order in orders.read_all(db)]
+    return len(listed), len(db.statements)
+
+
+def test_listing_orders_takes_constant_queries(db):
+    _add_orders(db, 2)
+    few = _list_orders_queries(db)
+    _add_orders(db, 20)
+    many = _list_orders_queries(db)
+
+    assert (few[0], many[0]) == (2, 22)
+    # orders, then order_details with their sandwich joined in
+    assert few[1] == many[1] == 2
+
+
+def test_read_one_loads_nested_details(db):
+    _add_orders(db, 1)
+    db.statements.clear()
+
+    order = order_schema.Order.model_validate(orders.read_one(db, 1), from_attributes=True)
+
+    assert [detail.sandwich.price for detail in order.order_details] == [5, 5, 5]
+    assert len(db.statements) == 2
+
+
+@pytest.mark.parametrize("returning", [True, False], ids=["returning", "update_then_get"])
+def test_update_loads_nested_details_eagerly(db, no_order_view, monkeypatch, returning):
+    _add_orders(db, 1)
+    # MySQL and MariaDB take the UPDATE plus primary key read path
+    monkeypatch.setattr(db.get_bind().dialect, "update_returning", returning)
+    db.statements.clear()
+
+    updated = orders.update(db, 1, order_schema.OrderUpdate(description="rush"))
+    queries = len(db.statements)
+    order = order_schema.Order.model_validate(updated, from_attributes=True)
+
+    assert order.description == "rush" and [detail.sandwich.price for detail in order.order_details] == [5, 5, 5]
+    # Serializing the response lazy-loads nothing
+    assert len(db.statements) == queries
+
+
+def test_order_with_details_is_one_insert_per_table(db, no_order_view):
+    sandwiches = [sandwich_model.Sandwich(sandwich_name=name, price=4) for name in ("Club", "BLT")]
+    db.add_all(sandwiches)
+    db.commit()
+    lines = [{"sandwich_id": sandwiches[i % 2].id, "amount": i + 1} for i in range(15)]
+    db.statements.clear()
+
+    order = orders.create_with_details(db, order_schema.OrderWithDetailsCreate(
+        customer_name="Jane", order_details=lines))
+
+    inserts = [s for s in db.statements if s.startswith("INSERT")]
+    assert len(inserts) == 2
+    assert [detail.amount for detail in order.order_details] == list(range(1, 16))
+    assert order.order_details[1].sandwich.sandwich_name == "BLT"
+
+
+def test_order_with_unknown_sandwich_writes_nothing(db):
+    with pytest.raises(HTTPException) as missing:
+        orders.create_with_details(db, order_schema.OrderWithDetailsCreate(
+            customer_name="Jane", order_details=[{"sandwich_id": 7, "amount": 1}, {"sandwich_id": 9, "amount": 1}]))
+
+    assert missing.value.status_code == 404
+    assert "7, 9" in missing.value.detail
+    assert orders.read_all(db) == []
+
+
+def test_totals_are_exact_decimals_from_sql(db):
+    club, melt = (sandwich_model.Sandwich(sandwich_name=name, price=price)
+                  for name, price in (("Club", Decimal("4.35")), ("Melt", Decimal("1.10"))))
+    db.add_all([club, melt])
+    db.commit()
+    created = orders.create_with_details(db, order_schema.OrderWithDetailsCreate(
+        customer_name="Jane", order_details=[{"sandwich_id": club.id, "amount": 3},
+                                             {"sandwich_id": melt.id, "amount": 7}]))
+    orders.create(db, order_schema.OrderCreate(customer_name="Empty"))
+
+    order = order_schema.Order.model_validate(orders.read_one(db, created.id), from_attributes=True)
+    assert order.total == Decimal("20.75") and isinstance(order.total, Decimal)
+    assert [detail.subtotal for detail in order.order_details] == [Decimal("13.05"), Decimal("7.70")]
+    assert orders.update(db, created.id, order_schema.OrderUpdate(description="rush")).total == Decimal("20.75")
+
+    [today] = orders.daily_totals(db)
+    assert (today["orders"], today["total"]) == (2, Decimal("20.75"))
+    assert orders.daily_totals(db, end=date(2000, 1, 1)) == []
+
+
+def test_order_date_is_set_by_the_database_at_insert(db):
+    # Not a timestamp frozen when the model module was imported
+    assert "CURRENT_TIMESTAMP" in str(order_model.Order.__table__.c.order_date.server_default.arg.compile(db.bind))
+    before = datetime.utcnow().replace(microsecond=0)
+    order = orders.create(db, order_schema.OrderCreate(customer_name="Jane"))
+    assert before <= order.order_date <= datetime.utcnow()
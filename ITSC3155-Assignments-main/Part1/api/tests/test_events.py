@@ -0,0 +1,96 @@
+import asyncio
+import threading
+
+import pytest
+
+from ...events import EventHub
+
+
+def test_publish_from_thread_reaches_subscriber():
+    hub = EventHub()
+
+    async def run():
+        subscription, backlog = hub.subscribe()
+        thread = threading.Thread(target=hub.publish, args=("order.created", {"id": 1}))
+        thread.start()
+        thread.join()
+        event = await subscription.get(timeout=1)
+        subscription.close()
+        return backlog, event
+
+    backlog, event = asyncio.run(run())
+    assert backlog == []
+    assert (event.type, event.data) == ("order.created", {"id": 1})
+    assert hub.subscriber_count == 0
+
+
+def test_resume_replays_missed_events():
+    hub = EventHub(history=10)
+    for order_id in range(5):
+        hub.publish("order.updated", {"id": order_id})
+
+    async def run():
+        subscription, backlog = hub.subscribe(last_event_id=3)
+        subscription.close()
+        return backlog
+
+    assert [event.id for event in asyncio.run(run())] == [4, 5]
+
+
+def test_resume_past_buffer_sends_reset():
+    hub = EventHub(history=2)
+    for order_id in range(5):
+        hub.publish("order.updated", {"id": order_id})
+
+    async def run():
+        subscription, backlog = hub.subscribe(last_event_id=1)
+        subscription.close()
+        return backlog
+
+    assert [event.type for event in asyncio.run(run())] == ["reset"]
+
+
+@pytest.fixture
+def order_id(store):
+    store.post("/ingredients/", json={"name": "bread", "quantity": 100})
+    product = store.post("/products/", json={"name": "Toast", "price": 2.5, "promotion": 0, "dietary_type": "vegan",
+                                              "ingredients": [{"name": "bread", "quantity": 1}]}).json()
+    return store.post("/orders/", json={"order_type": "takeout", "order_status": "prepping",
+                                        "product_ids": [product["id"]]}).json()["id"]
+
+
+def _published(since):
+    import main
+    return [(event.type, event.data) for event in main.order_events._history if event.id > since]
+
+
+def _last_event_id():
+    import main
+    return main.order_events._history[-1].id if main.order_events._history else 0
+
+
+def test_batch_status_events_carry_the_full_order(store, order_id):
+    since = _last_event_id()
+    store.patch("/orders/status", json={"order_status": "finished", "order_ids": [order_id]})
+    [(event_type, batch)] = _published(since)
+
+    # The single-order endpoints publish schemas.Order; the batch one now does too
+    import schemas
+    assert event_type == "order.updated"
+    assert schemas.Order(**batch).model_dump(mode="json") == store.get(f"/orders/{order_id}").json()
+    assert batch["order_status"] == "finished" and batch["products"][0]["name"] == "Toast"
+
+
+def test_batch_promo_events_match_the_single_order_endpoint(store, order_id):
+    store.post("/promo_codes/", json={"code": "HALF", "discount_percentage": 50, "expiration_date": "2099-01-01"})
+
+    since = _last_event_id()
+    store.patch("/orders/apply_promo", json={"promo_code": "HALF", "order_ids": [order_id]})
+    [(_, batch)] = _published(since)
+
+    since = _last_event_id()
+    store.patch(f"/orders/{order_id}/apply_promo/HALF")
+    [(_, single)] = _published(since)
+
+    assert batch == single
+    assert batch["discounted_total"] == 1.25
@@ -0,0 +1,121 @@
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+from ..controllers import inventory, order_details, orders
+from ..models.recipes import Recipe
+from ..models.resources import Resource
+from ..models.sandwiches import Sandwich
+from ..schemas import order_details as detail_schema, orders as order_schema
+
+
+@pytest.fixture
+def db(db):
+    bread, ham, cheese = (Resource(item=item, amount=amount) for item, amount in
+                          (("bread", 10), ("ham", 6), ("cheese", 5)))
+    club, melt, plain = (Sandwich(sandwich_name=name, price=5) for name in ("Club", "Melt", "Plain"))
+    db.add_all([bread, ham, cheese, club, melt, plain])
+    db.flush()
+    db.add_all([
+        Recipe(sandwich_id=club.id, resource_id=bread.id, amount=2),
+        Recipe(sandwich_id=club.id, resource_id=ham.id, amount=3),
+        Recipe(sandwich_id=melt.id, resource_id=bread.id, amount=2),
+        Recipe(sandwich_id=melt.id, resource_id=cheese.id, amount=1),
+    ])
+    db.commit()
+    return db
+
+
+def _stock(db):
+    db.expire_all()
+    return {resource.item: resource.amount for resource in db.query(Resource)}
+
+
+def test_required_resources_is_one_aggregate_query(db):
+    db.statements.clear()
+
+    needed = inventory.required_resources(db, inventory.sandwich_quantities([(1, 1), (2, 3), (1, 1)]))
+
+    assert needed == {1: 2 * 2 + 3 * 2, 2: 2 * 3, 3: 3 * 1}
+    assert len(db.statements) == 1
+
+
+def test_consume_deducts_in_one_update(db):
+    db.statements.clear()
+    inventory.consume(db, {1: 4, 3: 2})
+    db.commit()
+
+    assert [s.split()[0] for s in db.statements] == ["UPDATE"]
+    assert _stock(db) == {"bread": 6, "ham": 6, "cheese": 3}
+
+
+def test_consume_is_all_or_nothing(db):
+    with pytest.raises(HTTPException) as short:
+        inventory.consume(db, {1: 4, 2: 7})
+
+    assert short.value.status_code == 409
+    assert short.value.detail == "Not enough resources: ham (need 7, have 6)"
+    assert _stock(db) == {"bread": 10, "ham": 6, "cheese": 5}
+
+
+def test_max_makeable(db):
+    assert inventory.max_makeable(db) == [
+        {"sandwich_id": 1, "sandwich_name": "Club", "max_makeable": 2},
+        {"sandwich_id": 2, "sandwich_name": "Melt", "max_makeable": 5},
+        {"sandwich_id": 3, "sandwich_name": "Plain", "max_makeable": None},
+    ]
+    assert inventory.max_makeable(db, sandwich_id=2)[0]["max_makeable"] == 5
+
+
+def test_orders_consume_inventory(db):
+    cart = order_schema.OrderWithDetailsCreate(
+        customer_name="Jane", order_details=[{"sandwich_id": 1, "amount": 2}, {"sandwich_id": 2, "amount": 1}])
+    orders.create_with_details(db, cart)
+
+    assert _stock(db) == {"bread": 4, "ham": 0, "cheese": 4}
+    with pytest.raises(HTTPException) as short:
+        orders.create_with_details(db, cart)
+    assert short.value.status_code == 409
+    assert len(orders.read_all(db)) == 1
+
+
+def test_negative_amounts_are_rejected(db):
+    with pytest.raises(ValidationError):
+        order_schema.OrderWithDetailsCreate(customer_name="Jane", order_details=[{"sandwich_id": 1, "amount": -50}])
+    with pytest.raises(ValidationError):
+        detail_schema.OrderDetailUpdate(amount=0)
+    with pytest.raises(HTTPException) as negative:
+        inventory.consume(db, {1: -50})
+
+    assert negative.value.status_code == 422
+    assert _stock(db)["bread"] == 10
+
+
+def test_editing_a_line_deducts_what_it_needs_beyond_what_it_took(db):
+    order = orders.create_with_details(db, order_schema.OrderWithDetailsCreate(
+        customer_name="Jane", order_details=[{"sandwich_id": 1, "amount": 1}]))
+    line_id = order.order_details[0].id
+    assert _stock(db) == {"bread": 8, "ham": 3, "cheese": 5}
+
+    order_details.update(db, line_id, detail_schema.OrderDetailUpdate(amount=2))
+    assert _stock(db) == {"bread": 6, "ham": 0, "cheese": 5}
+
+    # Club to Melt: bread is already taken, cheese is new; ham is not given back
+    order_details.update(db, line_id, detail_schema.OrderDetailUpdate(sandwich_id=2))
+    assert _stock(db) == {"bread": 6, "ham": 0, "cheese": 3}
+
+    # Smaller amounts deduct nothing and return nothing
+    order_details.update(db, line_id, detail_schema.OrderDetailUpdate(amount=1))
+    assert _stock(db) == {"bread": 6, "ham": 0, "cheese": 3}
+
+
+def test_editing_a_line_beyond_stock_is_409_and_changes_nothing(db):
+    order = orders.create_with_details(db, order_schema.OrderWithDetailsCreate(
+        customer_name="Jane", order_details=[{"sandwich_id": 1, "amount": 1}]))
+    line_id = order.order_details[0].id
+
+    with pytest.raises(HTTPException) as short:
+        order_details.update(db, line_id, detail_schema.OrderDetailUpdate(amount=1000))
+
+    assert short.value.status_code == 409
+    assert _stock(db) == {"bread": 8, "ham": 3, "cheese": 5}
+    assert order_details.read_one(db, line_id).amount == 1
@@ -0,0 +1,107 @@
+import pytest
+
+from ...kitchen import KitchenScheduler
+
+
+def test_delivery_and_age_ordering():
+    kitchen = KitchenScheduler(stations=2)
+    kitchen.add(1, "takeout", prep_seconds=60, queued_at=1000)
+    kitchen.add(2, "delivery", prep_seconds=60, queued_at=1100)
+    kitchen.add(3, "takeout", prep_seconds=60, queued_at=1050)
+
+    assert kitchen.peek() == [2, 1, 3]
+
+
+def test_stations_keep_their_order_until_complete():
+    kitchen = KitchenScheduler(stations=2)
+    kitchen.add(1, "takeout", prep_seconds=60, queued_at=1000)
+    kitchen.add(2, "takeout", prep_seconds=60, queued_at=1001)
+
+    assert kitchen.claim(1) == 1
+    assert kitchen.claim(1) == 1
+    assert kitchen.claim(2) == 2
+    assert kitchen.complete(1) == 1
+    assert kitchen.claim(1) is None
+    assert kitchen.snapshot() == {"waiting": 0, "stations": {1: None, 2: 2}}
+
+
+def test_removed_orders_are_skipped():
+    kitchen = KitchenScheduler(stations=1)
+    for order_id in range(1, 200):
+        kitchen.add(order_id, "takeout", prep_seconds=0, queued_at=order_id)
+    for order_id in range(1, 199):
+        kitchen.remove(order_id)
+
+    assert kitchen.claim(1) == 199
+
+
+def test_unknown_station():
+    with pytest.raises(ValueError):
+        KitchenScheduler(stations=1).claim(2)
+
+
+def test_requeued_orders_keep_their_arrival_time():
+    kitchen = KitchenScheduler(stations=1)
+    kitchen.add(1, "takeout", prep_seconds=60, queued_at=1000)
+    kitchen.add(2, "takeout", prep_seconds=60, queued_at=1001)
+
+    # An edit re-queues without a time and must not lose its place
+    kitchen.add(1, "takeout", prep_seconds=60)
+    assert kitchen.peek() == [1, 2]
+
+    # Once it has left the queue, re-adding starts over
+    kitchen.remove(1)
+    kitchen.add(1, "takeout", prep_seconds=60)
+    assert kitchen.peek() == [2, 1]
+
+
+@pytest.fixture
+def order(store):
+    store.post("/ingredients/", json={"name": "bread", "quantity": 100})
+    product = store.post("/products/", json={"name": "Toast", "price": 2.5, "promotion": 0, "dietary_type": "vegan",
+                                              "ingredients": [{"name": "bread", "quantity": 1}]}).json()
+    return {"order_type": "takeout", "order_status": "prepping", "product_ids": [product["id"]]}
+
+
+def test_editing_an_order_keeps_its_kitchen_position(store, order):
+    first = store.post("/orders/", json=order).json()
+    second = store.post("/orders/", json=order).json()
+
+    assert store.put(f"/orders/{first['id']}", json=order).status_code == 200
+
+    assert store.get("/kitchen/queue").json()["next"] == [first["id"], second["id"]]
+
+
+def test_only_claimed_prepping_orders_can_be_finished(store, order):
+    waiting = store.post("/orders/", json=order).json()["id"]
+    done = store.post("/orders/", json={**order, "order_status": "finished"}).json()["id"]
+
+    # Never claimed by a station
+    assert store.post(f"/kitchen/orders/{waiting}/finish").status_code == 409
+    assert store.post(f"/kitchen/orders/{done}/finish").status_code == 409
+    assert store.post("/kitchen/orders/9999/finish").status_code == 404
+
+    assert store.post("/kitchen/stations/1/next").json()["id"] == waiting
+    response = store.post(f"/kitchen/orders/{waiting}/finish")
+    assert response.status_code == 200 and response.json()["order_status"] == "finished"
+    assert store.get("/kitchen/queue").json()["stations"]["1"] is None
+
+    # Already finished
+    assert store.post(f"/kitchen/orders/{waiting}/finish").status_code == 409
+
+
+def test_claimed_order_changed_meanwhile_is_not_finished(store, order):
+    import main
+
+    order_id = store.post("/orders/", json=order).json()["id"]
+    store.post("/kitchen/stations/1/next")
+    # Paid through another path while the station still holds it
+    with main.SessionLocal() as db:
+        db.query(main.models.Order).filter(main.models.Order.id == order_id).update({"order_status": "paid"})
+        db.commit()
+
+    response = store.post(f"/kitchen/orders/{order_id}/finish")
+
+    assert response.status_code == 409
+    assert store.get(f"/orders/{order_id}").json()["order_status"] == "paid"
+    assert store.get("/kitchen/queue").json()["stations"]["1"] is None
@@ -0,0 +1,62 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = metrics.Registry()
+    histogram = registry.histogram("test_latency_seconds", "Test latency.", ("route",), buckets=(0.1, 1.0))
+
+    histogram.labels("/orders/").observe(0.05)
+    histogram.labels("/orders/").observe(0.5)
+    histogram.labels("/orders/").observe(5)
+
+    output = registry.render()
+    assert 'test_latency_seconds_bucket{route="/orders/",le="0.1"} 1' in output
+    assert 'test_latency_seconds_bucket{route="/orders/",le="1"} 2' in output
+    assert 'test_latency_seconds_bucket{route="/orders/",le="+Inf"} 3' in output
+    assert 'test_latency_seconds_count{route="/orders/"} 3' in output
+
+
+def test_middleware_labels_by_route_template():
+    app = FastAPI()
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/orders/{order_id}")
+    def read_order(order_id: int):
+        return {"id": order_id}
+
+    # REGISTRY is process-wide, so compare against the count before these requests
+    requests = metrics.REQUESTS.labels("GET", "/orders/{order_id}", "200")
+    before = requests.value
+
+    client = TestClient(app)
+    client.get("/orders/1")
+    client.get("/orders/2")
+
+    assert requests.value - before == 2
+    assert 'http_requests_total{method="GET",route="/orders/{order_id}",status="200"}' in metrics.REGISTRY.render()
+
+
+def test_cache_hit_ratio():
+    stats = metrics.CacheStats("test_cache")
+    stats.hit()
+    stats.hit()
+    stats.hit()
+    stats.miss()
+
+    assert stats.ratio() == 0.75
+    assert 'cache_hit_ratio{cache="test_cache"} 0.75' in metrics.REGISTRY.render()
+
+
+def test_store_app_writes_to_the_registry_tests_read(store):
+    # The same module the store imports, not a second copy with its own registry
+    requests = metrics.REQUESTS.labels("GET", "/metrics", "200")
+    before = requests.value
+
+    store.get("/metrics")
+    output = store.get("/metrics").text
+
+    assert requests.value - before == 2
+    assert 'http_requests_total{method="GET",route="/metrics",status="200"}' in output
@@ -0,0 +1,58 @@
+import pytest
+
+
+@pytest.fixture
+def orders(store):
+    store.post("/ingredients/", json={"name": "bread", "quantity": 100})
+    product = store.post("/products/", json={"name": "Toast", "price": 2.5, "promotion": 0, "dietary_type": "vegan",
+                                              "ingredients": [{"name": "bread", "quantity": 1}]}).json()
+
+    def create(order_type, order_status):
+        return store.post("/orders/", json={"order_type": order_type, "order_status": order_status,
+                                            "product_ids": [product["id"]]}).json()["id"]
+
+    return {
+        "takeout": create("takeout", "prepping"),
+        "delivery": create("delivery", "prepping"),
+        "finished": create("takeout", "finished"),
+    }
+
+
+def _statuses(store):
+    return {order["id"]: order["order_status"] for order in store.get("/orders/").json()}
+
+
+def test_update_by_ids_reports_each_id(store, orders):
+    response = store.patch("/orders/status", json={
+        "order_status": "finished", "order_ids": [orders["takeout"], orders["finished"], 9999]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["updated"] == 1
+    assert sorted((r["id"], r["result"]) for r in body["results"]) == sorted([
+        (orders["takeout"], "updated"), (orders["finished"], "unchanged"), (9999, "not_found")])
+    assert _statuses(store) == {orders["takeout"]: "finished", orders["delivery"]: "prepping",
+                                orders["finished"]: "finished"}
+
+
+def test_update_by_filter_touches_only_matching_orders(store, orders):
+    response = store.patch("/orders/status", json={
+        "order_status": "finished", "filter": {"order_type": "delivery"}})
+
+    assert response.status_code == 200
+    assert response.json()["results"] == [{"id": orders["delivery"], "result": "updated"}]
+    assert _statuses(store)[orders["takeout"]] == "prepping"
+    assert orders["delivery"] not in store.get("/kitchen/queue").json()["next"]
+
+
+@pytest.mark.parametrize("selection", [
+    {"filter": {}},
+    {"filter": {"order_type": None}},
+    {"order_ids": []},
+    {},
+])
+def test_selections_that_match_everything_or_nothing_are_rejected(store, orders, selection):
+    response = store.patch("/orders/status", json={"order_status": "finished", **selection})
+
+    assert response.status_code == 422
+    assert set(_statuses(store).values()) == {"prepping", "finished"}
@@ -0,0 +1,122 @@
+import json
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import mysql
+from ..controllers import order_details, order_views, orders, recipes, resources, sandwiches
+from ..models.order_views import OrderView
+from ..models.recipes import Recipe
+from ..models.resources import Resource
+from ..models.sandwiches import Sandwich
+from ..schemas import order_details as detail_schema, orders as order_schema
+from ..schemas import recipes as recipe_schema, resources as resource_schema, sandwiches as sandwich_schema
+
+
+@pytest.fixture
+def db(db):
+    bread, ham = Resource(item="bread", amount=1000), Resource(item="ham", amount=1000)
+    club, blt = Sandwich(sandwich_name="Club", price=Decimal("4.50")), Sandwich(sandwich_name="BLT", price=3)
+    db.add_all([bread, ham, club, blt])
+    db.flush()
+    db.add_all([Recipe(sandwich_id=club.id, resource_id=bread.id, amount=2),
+                Recipe(sandwich_id=club.id, resource_id=ham.id, amount=1)])
+    db.commit()
+    return db
+
+
+def _order(db, *lines):
+    return orders.create_with_details(db, order_schema.OrderWithDetailsCreate(
+        customer_name="Jane", order_details=[{"sandwich_id": sandwich_id, "amount": amount}
+                                             for sandwich_id, amount in lines]))
+
+
+def _stored(db, order_id):
+    document = db.scalar(select(OrderView.document).where(OrderView.order_id == order_id))
+    return None if document is None else json.loads(document)
+
+
+def test_view_is_written_with_the_order(db):
+    order = _order(db, (1, 2), (2, 1))
+
+    document = _stored(db, order.id)
+    assert Decimal(document["total"]) == Decimal("12.00")
+    assert document["kitchen_ticket"][0] == {
+        "sandwich_name": "Club", "amount": 2,
+        "ingredients": [{"item": "bread", "amount": 4}, {"item": "ham", "amount": 2}],
+    }
+    assert document["kitchen_ticket"][1]["ingredients"] == []
+
+
+def test_read_is_one_primary_key_lookup(db):
+    order = _order(db, (1, 1))
+    db.statements.clear()
+
+    response = orders.read_view(db, order.id)
+
+    assert json.loads(response.body)["id"] == order.id
+    assert len(db.statements) == 1
+
+
+def test_writes_to_referenced_rows_refresh_documents(db):
+    first, second = _order(db, (1, 1)), _order(db, (2, 1))
+
+    sandwiches.update(db, 1, sandwich_schema.SandwichUpdate(price=Decimal("5.25")))
+    assert Decimal(_stored(db, first.id)["total"]) == Decimal("5.25")
+
+    recipes.update(db, 1, recipe_schema.RecipeUpdate(amount=3))
+    assert _stored(db, first.id)["kitchen_ticket"][0]["ingredients"][0] == {"item": "bread", "amount": 3}
+
+    # Moving a line between orders rewrites both documents
+    detail_id = _stored(db, first.id)["order_details"][0]["id"]
+    order_details.update(db, detail_id, detail_schema.OrderDetailUpdate(order_id=second.id))
+    assert _stored(db, first.id)["order_details"] == []
+    assert len(_stored(db, second.id)["order_details"]) == 2
+
+
+def test_restocking_leaves_documents_alone(db):
+    order = _order(db, (1, 1))
+    db.statements.clear()
+
+    resources.update(db, 1, resource_schema.ResourceUpdate(amount=5))
+
+    # Just the UPDATE ... RETURNING: no order lookup, no render, no upsert
+    assert len(db.statements) == 1
+    assert db.statements[0].startswith("UPDATE resources")
+
+    resources.update(db, 1, resource_schema.ResourceUpdate(item="rye"))
+    assert _stored(db, order.id)["kitchen_ticket"][0]["ingredients"][0] == {"item": "rye", "amount": 2}
+
+
+def test_affected_orders_are_locked_before_the_write(db):
+    order = _order(db, (1, 1))
+    db.statements.clear()
+
+    recipes.update(db, 1, recipe_schema.RecipeUpdate(amount=3))
+
+    # The lock comes first, so the render's snapshot is newer than any other writer's commit
+    assert db.statements[0].startswith("SELECT orders.id \nFROM orders \nWHERE orders.id IN (SELECT")
+    assert db.statements[1].startswith("UPDATE recipes")
+    assert _stored(db, order.id)["kitchen_ticket"][0]["ingredients"][0]["amount"] == 3
+    # SQLite drops the clause; MySQL gets it
+    assert str(order_views._locking([order.id]).compile(dialect=mysql.dialect())).endswith("FOR UPDATE")
+
+
+def test_deleted_orders_leave_the_view(db):
+    order = orders.create(db, order_schema.OrderCreate(customer_name="Jane"))
+    assert _stored(db, order.id) is not None
+
+    orders.delete(db, order.id)
+
+    assert _stored(db, order.id) is None
+
+
+def test_missing_documents_are_built_on_first_read(db):
+    order = _order(db, (1, 1))
+    db.query(OrderView).delete()
+    db.commit()
+
+    document = json.loads(order_views.read(db, order.id))
+
+    assert document == _stored(db, order.id)
+    assert document["customer_name"] == "Jane"
@@ -0,0 +1,50 @@
+import csv
+import io
+import json
+
+import promo_codes
+
+BATCH = {"count": 25, "discount_percentage": 10, "expiration_date": "2099-01-01", "prefix": "FALL"}
+
+
+def test_bulk_returns_counts_and_a_handle_not_the_codes(store):
+    response = store.post("/promo_codes/bulk", json=BATCH)
+
+    assert response.status_code == 201
+    body = response.json()
+    assert "codes" not in body
+    assert body["created"] == 25
+    assert body["codes_url"] == f"/promo_codes/bulk/{body['batch_id']}/codes"
+
+
+def test_batch_codes_stream_as_ndjson_and_csv(store):
+    batch = store.post("/promo_codes/bulk", json=BATCH).json()
+    # Another batch with the same prefix is not part of the export
+    store.post("/promo_codes/bulk", json=BATCH)
+
+    ndjson = store.get(batch["codes_url"])
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    codes = [json.loads(line)["code"] for line in ndjson.text.splitlines()]
+    assert len(set(codes)) == 25 and all(code.startswith("FALL") for code in codes)
+
+    exported = store.get(batch["codes_url"], params={"format": "csv"})
+    assert exported.headers["content-type"].startswith("text/csv")
+    assert [row["code"] for row in csv.DictReader(io.StringIO(exported.text))] == codes
+
+    # The exported codes are the ones stored
+    listed = {promo["code"]: promo for promo in store.get("/promo_codes/").json()}
+    assert all(listed[code]["discount_percentage"] == 10 for code in codes)
+
+
+def test_unknown_batch_is_404(store):
+    assert store.get("/promo_codes/bulk/nope/codes").status_code == 404
+
+
+def test_batches_are_generated_and_read_a_page_at_a_time(store):
+    seen = []
+    result = promo_codes.bulk_create_promo_codes(25, 10, promo_codes.date(2099, 1, 1), batch_size=10,
+                                                 on_batch=seen.append)
+
+    assert [len(batch) for batch in seen] == [10, 10, 5]
+    assert list(promo_codes.iter_batch_codes(result.batch_id, page_size=10)) == [
+        code for batch in seen for code in batch]
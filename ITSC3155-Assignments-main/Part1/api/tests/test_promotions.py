@@ -0,0 +1,109 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from ...promotions import CODE_ALPHABET, ExpirySweeper, PromoEngine, PromoRule, generate_codes
+
+
+class Loader:
+    def __init__(self, rules):
+        self.rules = rules
+        self.calls = 0
+
+    def __call__(self, code):
+        self.calls += 1
+        return self.rules.get(code)
+
+
+def test_codes_and_misses_are_cached():
+    rule = PromoRule("SAVE20", 20, date.today() + timedelta(days=30))
+    load = Loader({"SAVE20": rule})
+    engine = PromoEngine()
+
+    assert engine.rule("SAVE20", load) == rule
+    assert engine.rule("SAVE20", load) == rule
+    assert engine.rule("NOPE", load) is None
+    assert engine.rule("NOPE", load) is None
+    assert load.calls == 2
+
+    engine.invalidate_code("NOPE")
+    load.rules["NOPE"] = PromoRule("NOPE", 5, date.today())
+    assert engine.rule("NOPE", load).discount_percentage == 5
+
+
+def test_cached_code_does_not_outlive_its_expiration():
+    rule = PromoRule("LASTDAY", 10, date.today())
+    assert 0 < rule.seconds_left(datetime.utcnow()) <= 86400
+    assert PromoRule("OLD", 10, date.today() - timedelta(days=1)).seconds_left(datetime.utcnow()) <= 0
+
+    load = Loader({"OLD": PromoRule("OLD", 10, date(2000, 1, 1))})
+    assert PromoEngine().rule("OLD", load) is None
+
+
+def test_prices_load_only_missing_products():
+    engine = PromoEngine()
+    requested = []
+
+    def load(product_ids):
+        requested.append(sorted(product_ids))
+        return {product_id: 10.0 * product_id for product_id in product_ids}
+
+    assert engine.prices([1, 2, 2], load) == {1: 10.0, 2: 20.0}
+    assert engine.prices([2, 3], load) == {2: 20.0, 3: 30.0}
+    engine.invalidate_price(2)
+    engine.prices([2], load)
+    assert requested == [[1, 2], [3], [2]]
+
+
+def test_apply_returns_new_items_and_does_not_compound():
+    rule = PromoRule("SAVE20", 20, date.today())
+    items = [{"product_id": 1, "quantity": 2}, {"product_id": 9, "quantity": 1}]
+
+    discounted, total = PromoEngine.apply(rule, items, {1: 10.0})
+    assert discounted == [{"product_id": 1, "quantity": 2, "price": 8.0}, {"product_id": 9, "quantity": 1}]
+    assert total == 16.0
+    assert items == [{"product_id": 1, "quantity": 2}, {"product_id": 9, "quantity": 1}]
+
+    again, total = PromoEngine.apply(rule, discounted, {1: 10.0})
+    assert again[0]["price"] == 8.0 and total == 16.0
+
+
+def test_generate_codes_are_unique_and_skip_existing():
+    existing = {"FALL" + "A" * 6}
+    codes = generate_codes(5000, existing, length=6, prefix="FALL")
+
+    assert len(set(codes)) == 5000
+    assert all(len(code) == 10 and code.startswith("FALL") for code in codes)
+    assert "FALL" + "A" * 6 not in codes
+    assert len(existing) == 5001
+    assert set("".join(codes)) <= set("FALL" + CODE_ALPHABET)
+
+
+def test_generate_codes_refuses_a_too_small_code_space():
+    with pytest.raises(ValueError):
+        generate_codes(600, set(), length=2)
+
+
+def test_expiry_sweeper_runs_until_stopped_and_survives_errors():
+    calls = []
+    errors = []
+    ran_twice = threading.Event()
+
+    def sweep():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+        ran_twice.set()
+        return 0
+
+    sweeper = ExpirySweeper(sweep, interval=0.01, on_error=errors.append)
+    sweeper.start()
+    assert ran_twice.wait(2)
+    sweeper.stop(timeout=2)
+
+    count = len(calls)
+    time.sleep(0.05)
+    assert len(calls) == count
+    assert isinstance(errors[0], RuntimeError)
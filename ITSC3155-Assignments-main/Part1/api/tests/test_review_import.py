@@ -0,0 +1,144 @@
+import io
+import json
+import os
+
+import pytest
+from sqlalchemy import event, select
+
+import review_import
+from review_import import ReviewImporter, import_reviews, parse_records, text_lines
+
+
+def test_text_lines_joins_lines_and_characters_split_across_chunks():
+    data = '{"title": "café"}\n{"title": "a b"}\nlast'.encode()
+    chunks = [data[i:i + 3] for i in range(0, len(data), 3)]
+
+    assert list(text_lines(chunks)) == ['{"title": "café"}\n', '{"title": "a b"}\n', "last"]
+
+
+def test_text_lines_rejects_non_utf8():
+    with pytest.raises(UnicodeDecodeError):
+        list(text_lines([b'{"title": "caf\xe9"}\n']))
+
+
+def test_parse_ndjson_keeps_line_numbers_and_flags_bad_rows():
+    lines = ['{"product_id": 1}\n', "\n", "not json\n", "[1, 2]\n", '{"product_id": 2}']
+
+    records = list(parse_records(lines, "ndjson"))
+
+    assert [(number, record) for number, record, _ in records] == [
+        (1, {"product_id": 1}), (3, None), (4, None), (5, {"product_id": 2})]
+    assert records[1][2] == "not json"
+
+
+def test_parse_csv_with_a_quoted_multiline_field():
+    body = 'product_id,title,description\n1,Great,"Crunchy,\nwarm bread"\n2,Fine,Ok\n'
+
+    records = list(parse_records(text_lines([body.encode()]), "csv"))
+
+    assert [(number, record["description"]) for number, record, _ in records] == [
+        (3, "Crunchy,\nwarm bread"), (4, "Ok")]
+
+
+def test_rejects_are_written_with_line_and_reason():
+    rejects = io.StringIO()
+    importer = ReviewImporter({1: "Club"}, reject_file=rejects, keep_errors=1)
+    importer._flush = lambda: None  # Validation only, no database
+    records = [
+        (1, {"product_id": 1, "title": "Good", "description": "Yes"}),
+        (2, {"product_id": 9, "title": "Good", "description": "Yes"}),
+        (3, {"product_id": "x", "title": "Good", "description": "Yes"}),
+        (4, {"product_id": 1, "title": "", "description": "Yes"}),
+        (5, {"product_id": 1, "title": "Good", "description": "Yes", "created_at": "yesterday"}),
+        (6, None),
+    ]
+
+    result = importer.run((number, record, json.dumps(record)) for number, record in records)
+
+    written = [json.loads(line) for line in rejects.getvalue().splitlines()]
+    assert [(entry["line"], entry["error"]) for entry in written] == [
+        (2, "product 9 does not exist"),
+        (3, "product_id must be an integer"),
+        (4, "title and description are required"),
+        (5, "created_at must be an ISO 8601 timestamp"),
+        (6, "unparseable row"),
+    ]
+    assert result.rejected == 5
+    assert result.errors == written[:1]
+
+
+@pytest.fixture
+def club(store):
+    return store.post("/products/", json={"name": "Club", "price": 5, "promotion": 0, "dietary_type": "none",
+                                          "ingredients": []}).json()["id"]
+
+
+def test_batches_insert_reviews_and_upsert_summaries(store, club):
+    from database import engine
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        rows = [{"product_id": club, "title": f"Review {i}", "description": "Tasty",
+                 "created_at": f"2024-05-0{i + 1}T12:00:00+02:00"} for i in range(5)]
+        body = "".join(json.dumps(row) + "\n" for row in rows).encode()
+        result = import_reviews([body], "ndjson", batch_size=2)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert (result.imported, result.rejected) == (5, 0)
+    # 5 rows in batches of 2: three INSERTs into reviews, each with its summary upsert
+    assert sum(s.startswith("INSERT INTO reviews") for s in statements) == 3
+    assert sum(s.startswith("INSERT INTO product_review_summaries") for s in statements) == 3
+
+    page = store.get(f"/products/{club}/reviews").json()
+    # Counts add up across batches; the latest time is stored as naive UTC
+    assert page["summary"] == {"review_count": 5, "latest_review_at": "2024-05-05T10:00:00"}
+    assert page["reviews"][0]["title"].startswith("Review 4")
+
+
+def test_summary_latest_time_never_moves_back(store, club):
+    import_reviews([b'{"product_id": %d, "title": "New", "description": "x", "created_at": "2024-06-01"}\n' % club],
+                   "ndjson")
+    import_reviews([b'{"product_id": %d, "title": "Old", "description": "x", "created_at": "2020-01-01"}\n' % club],
+                   "ndjson")
+
+    assert store.get(f"/products/{club}/reviews").json()["summary"] == {
+        "review_count": 2, "latest_review_at": "2024-06-01T00:00:00"}
+
+
+def test_endpoint_reports_rejects_in_a_file(store, club, tmp_path, monkeypatch):
+    from api.dependencies.config import conf
+    monkeypatch.setattr(conf, "review_import_reject_dir", str(tmp_path))
+    body = f"product_id,title,description\n{club},Great,Yes\n999,Lost,Yes\n"
+
+    response = store.post("/reviews/import", params={"format": "csv"}, content=body.encode())
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["imported"], result["rejected"]) == (1, 1)
+    with open(result["rejects_file"]) as rejects:
+        assert json.loads(rejects.read())["line"] == 3
+    assert os.listdir(tmp_path) == [os.path.basename(result["rejects_file"])]
+
+
+def test_endpoint_without_rejects_leaves_no_file(store, club, tmp_path, monkeypatch):
+    from api.dependencies.config import conf
+    monkeypatch.setattr(conf, "review_import_reject_dir", str(tmp_path))
+
+    response = store.post("/reviews/import", content=b'{"product_id": %d, "title": "a", "description": "b"}' % club)
+
+    assert response.json()["rejects_file"] is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_non_utf8_body_is_400_and_cleans_up(store, club, tmp_path, monkeypatch):
+    from api.dependencies.config import conf
+    monkeypatch.setattr(conf, "review_import_reject_dir", str(tmp_path))
+
+    response = store.post("/reviews/import", content=b'{"product_id": 999, "title": "caf\xe9", "description": "x"}\n')
+
+    assert response.status_code == 400
+    assert "UTF-8" in response.json()["detail"]
+    assert os.listdir(tmp_path) == []
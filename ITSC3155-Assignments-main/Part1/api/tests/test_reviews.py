@@ -0,0 +1,104 @@
+import pytest
+from sqlalchemy import insert, select
+
+
+@pytest.fixture
+def products(store):
+    def create(name):
+        return store.post("/products/", json={"name": name, "price": 5, "promotion": 0, "dietary_type": "none",
+                                              "ingredients": []}).json()["id"]
+
+    return create("Club"), create("Melt")
+
+
+def _review(store, product_id, title="Good"):
+    response = store.post("/reviews/", json={"product_id": product_id, "title": title, "description": "Tasty"})
+    assert response.status_code == 201
+    return response.json()
+
+
+def _summary(store, product_id):
+    return store.get(f"/products/{product_id}/reviews").json()["summary"]
+
+
+def test_pages_follow_the_cursor_to_the_last_page(store, products):
+    club, _ = products
+    ids = [_review(store, club, f"Review {i}")["id"] for i in range(5)]
+
+    first = store.get(f"/products/{club}/reviews", params={"limit": 2}).json()
+    # A review added after the first page does not shift the pages that follow
+    _review(store, club, "Late")
+    second = store.get(f"/products/{club}/reviews", params={"limit": 2, "before_id": first["next_before_id"]}).json()
+    last = store.get(f"/products/{club}/reviews", params={"limit": 2, "before_id": second["next_before_id"]}).json()
+
+    assert [r["id"] for r in first["reviews"]] == ids[4:2:-1]
+    assert [r["id"] for r in second["reviews"]] == ids[2:0:-1]
+    assert [r["id"] for r in last["reviews"]] == ids[:1]
+    assert last["next_before_id"] is None
+
+
+def test_exact_last_page_has_no_cursor(store, products):
+    club, _ = products
+    for i in range(2):
+        _review(store, club)
+
+    page = store.get(f"/products/{club}/reviews", params={"limit": 2}).json()
+
+    assert len(page["reviews"]) == 2
+    assert page["next_before_id"] is None
+
+
+@pytest.mark.parametrize("before_id", ["abc", 0, -3])
+def test_invalid_cursor_is_rejected(store, products, before_id):
+    response = store.get(f"/products/{products[0]}/reviews", params={"before_id": before_id})
+    assert response.status_code == 422
+
+
+def test_unknown_product_is_404(store):
+    assert store.get("/products/9999/reviews").status_code == 404
+
+
+def test_summary_follows_create_update_and_delete(store, products):
+    club, melt = products
+    first = _review(store, club)
+    second = _review(store, club)
+
+    summary = _summary(store, club)
+    assert summary["review_count"] == 2
+    assert summary["latest_review_at"] == second["created_at"]
+
+    # Moving a review to another product updates both summaries
+    moved = store.patch(f"/reviews/{second['id']}", json={"product_id": melt})
+    assert moved.status_code == 200
+    assert _summary(store, club) == {"review_count": 1, "latest_review_at": first["created_at"]}
+    assert _summary(store, melt) == {"review_count": 1, "latest_review_at": second["created_at"]}
+
+    assert store.delete(f"/reviews{first['id']}").status_code == 201
+    assert _summary(store, club) == {"review_count": 0, "latest_review_at": None}
+
+
+def test_backfill_fills_an_empty_summary_table_once(store, products):
+    import main
+    import models
+    from database import engine
+
+    club, melt = products
+    with engine.begin() as conn:
+        conn.execute(insert(models.Review), [
+            {"product_id": club, "title": "a", "description": "x"},
+            {"product_id": club, "title": "b", "description": "x"},
+            {"product_id": melt, "title": "c", "description": "x"},
+        ])
+
+    main.backfill_review_summaries()
+
+    with engine.connect() as conn:
+        counts = dict(conn.execute(select(models.ProductReviewSummary.product_id,
+                                          models.ProductReviewSummary.review_count)).all())
+    assert counts == {club: 2, melt: 1}
+
+    # With summaries present it is a no-op, so incremental counts are never overwritten
+    with engine.begin() as conn:
+        conn.execute(insert(models.Review).values(product_id=melt, title="d", description="x"))
+    main.backfill_review_summaries()
+    assert _summary(store, melt)["review_count"] == 1
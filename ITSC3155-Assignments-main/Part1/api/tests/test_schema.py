@@ -0,0 +1,74 @@
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, event, inspect, select
+from ..dependencies.database import Base
+from ..dependencies import schema
+from ..models import model_loader  # noqa: F401  registers every api model on Base
+
+
+def test_ensure_schema_runs_ddl_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+
+    assert schema.ensure_schema(engine, Base.metadata, "api") is True
+    assert schema.ensure_schema(engine, Base.metadata, "api") is False
+
+    with engine.connect() as conn:
+        stored = conn.execute(select(schema.schema_versions.c.version)).scalar()
+    assert stored == schema.schema_fingerprint(Base.metadata)
+
+
+def test_current_schema_costs_one_query(tmp_path):
+    url = f"sqlite:///{tmp_path / 'schema.db'}"
+    schema.ensure_schema(create_engine(url), Base.metadata, "api")
+
+    # A fresh engine stands in for a new worker process
+    engine = create_engine(url)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    assert schema.ensure_schema(engine, Base.metadata, "api") is False
+    assert len(statements) == 1
+
+
+def test_new_nullable_columns_are_added_to_existing_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    old = MetaData()
+    Table("notes", old, Column("id", Integer, primary_key=True))
+    old.create_all(engine)
+
+    new = MetaData()
+    Table("notes", new, Column("id", Integer, primary_key=True), Column("body", String(50)))
+    assert schema.ensure_schema(engine, new, "notes") is True
+
+    assert {column["name"] for column in inspect(engine).get_columns("notes")} == {"id", "body"}
+
+
+def test_not_null_columns_use_their_server_default(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    old = MetaData()
+    Table("notes", old, Column("id", Integer, primary_key=True))
+    old.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(old.tables["notes"].insert().values(id=1))
+
+    new = MetaData()
+    Table("notes", new, Column("id", Integer, primary_key=True),
+          Column("pinned", Integer, nullable=False, server_default="0"))
+    assert schema.ensure_schema(engine, new, "notes") is True
+
+    with engine.connect() as conn:
+        assert conn.execute(select(new.tables["notes"].c.pinned)).scalar() == 0
+
+
+def test_not_null_columns_without_a_default_fail_and_stay_unstamped(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    old = MetaData()
+    Table("notes", old, Column("id", Integer, primary_key=True))
+    old.create_all(engine)
+
+    new = MetaData()
+    Table("notes", new, Column("id", Integer, primary_key=True), Column("body", String(50), nullable=False))
+    with pytest.raises(RuntimeError, match="notes.body"):
+        schema.ensure_schema(engine, new, "notes")
+
+    assert schema._stored_version(engine, "notes") is None
+    assert "body" not in {column["name"] for column in inspect(engine).get_columns("notes")}
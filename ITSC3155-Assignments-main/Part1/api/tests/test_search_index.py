@@ -0,0 +1,69 @@
+from ...search_index import ProductIndex, tokenize
+
+
+def make_index():
+    index = ProductIndex()
+    index.rebuild([
+        (1, "Turkey Club", "none", ["turkey", "bacon", "lettuce"]),
+        (2, "Veggie Delight", "vegetarian", ["lettuce", "tomato", "cucumber"]),
+        (3, "Tomato Basil Soup", "vegan", ["tomato", "basil"]),
+    ])
+    return index
+
+
+def test_tokenize_lowercases_and_splits():
+    assert tokenize("Gluten-Free BLT, 12in") == ["gluten", "free", "blt", "12in"]
+
+
+def test_and_or_queries_and_ranking():
+    index = make_index()
+
+    assert [pid for pid, _ in index.search("tomato lettuce")] == [2]
+    # A name match outranks matching several ingredients
+    assert [pid for pid, _ in index.search("tomato lettuce", mode="or")] == [3, 2, 1]
+    assert [pid for pid, _ in index.search("tomato")] == [3, 2]
+
+
+def test_prefix_matching_and_dietary_filter():
+    index = make_index()
+
+    assert {pid for pid, _ in index.search("tom")} == {2, 3}
+    assert index.search("tom", prefix=False) == []
+    assert [pid for pid, _ in index.search("tom", dietary_type="vegan")] == [3]
+
+
+def test_incremental_updates():
+    index = make_index()
+    index.add(2, "Garden Wrap", "vegan", ["spinach"])
+    index.add(4, "Spinach Melt", "vegetarian", ["spinach", "cheese"])
+    index.remove(3)
+
+    assert index.search("tomato") == []
+    assert [pid for pid, _ in index.search("spin")] == [4, 2]
+    assert "basil" not in index._vocabulary
+    assert len(index) == 3
+
+
+def test_ingredient_include_exclude_filter():
+    index = make_index()
+
+    assert index.filter(include=["Tomato"]) == [2, 3]
+    assert index.filter(exclude=["lettuce"]) == [3]
+    assert index.filter(include=["tomato"], exclude=["basil"]) == [2]
+    assert index.filter(include=["peanuts"]) == []
+    assert index.filter(exclude=["peanuts"], dietary_type="vegan") == [3]
+    assert [pid for pid, _ in index.search("tomato", exclude=["cucumber"])] == [3]
+
+
+def test_ingredient_filter_follows_updates_and_grows():
+    index = make_index()
+    # Enough new ingredients to need a second 64-bit word, and enough products to grow the arrays
+    for product_id in range(10, 1300):
+        index.add(product_id, f"Special {product_id}", "none", [f"extra {product_id % 100}", "lettuce"])
+    index.add(1, "Turkey Club", "none", ["turkey", "mayo"])
+    index.remove(2)
+
+    assert index.filter(include=["lettuce"], exclude=["extra 5"])[:2] == [10, 11]
+    assert 1 not in index.filter(include=["lettuce"])
+    assert index.filter(include=["extra 99", "lettuce"]) == list(range(99, 1300, 100))
+    assert index.filter(include=["tomato"]) == [3]
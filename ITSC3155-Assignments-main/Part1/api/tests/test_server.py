@@ -0,0 +1,17 @@
+import pytest
+
+import server
+from ..main import app as api_app
+
+
+def test_store_app_refuses_several_workers(store):
+    launcher = server.Launcher("main:app", "127.0.0.1", 0, workers=2)
+
+    with pytest.raises(SystemExit, match="--workers 1"):
+        launcher.run()
+    # Refused before binding the listening socket or forking
+    assert launcher.sock is None and not launcher.children
+
+
+def test_apps_without_process_state_can_fork_workers():
+    assert server.process_local_state(api_app) == ()
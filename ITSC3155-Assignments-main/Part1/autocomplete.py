@@ -0,0 +1,209 @@
+# autocomplete.py
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def normalize(name: str) -> str:
+    return " ".join(WORD_PATTERN.findall((name or "").lower()))
+
+
+class Autocomplete:
+    """
+    Typeahead over product and ingredient names. Every word start of a name
+    is a key, so "club" finds "Turkey Club". Keys are kept in sorted lists,
+    one per rank class (whole-name or later-word match, name length, kind),
+    and a lookup bisects into the classes best first, stopping once it has
+    `limit` names: a true top-k without scanning every key under a short
+    prefix. When a prefix has too few matches, names one edit away from it
+    (a dropped, added, swapped or wrong character) fill in.
+    """
+
+    def __init__(self, refresh_seconds: Optional[float] = None, min_typo_length: int = 3):
+        self.refresh_seconds = refresh_seconds
+        self.min_typo_length = min_typo_length
+        self._keys: List[str] = []  # every key in one sorted list, for typo variants
+        # (later word, name length) -> kind -> sorted (key, lowercase name, kind, id, offset) entries
+        self._classes: Dict[Tuple[bool, int], Dict[str, List[tuple]]] = {}
+        self._levels: List[Tuple[bool, int]] = []  # sorted keys of _classes, best rank first
+        self._names: Dict[Tuple[str, int], str] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _word_keys(name: str):
+        normalized = normalize(name)
+        for offset in range(len(normalized)):
+            if offset == 0 or normalized[offset - 1] == " ":
+                yield normalized[offset:], offset
+
+    @classmethod
+    def _entries(cls, kind: str, item_id: int, name: str):
+        lowered = name.lower()
+        for key, offset in cls._word_keys(name):
+            yield (offset > 0, len(lowered)), (key, lowered, kind, item_id, offset)
+
+    def add(self, kind: str, item_id: int, name: str):
+        """
+        Index a name, replacing the one previously indexed for this item.
+        """
+        with self._lock:
+            self._remove(kind, item_id)
+            self._names[(kind, item_id)] = name
+            for level, entry in self._entries(kind, item_id, name):
+                insort(self._keys, entry[0])
+                if level not in self._classes:
+                    self._classes[level] = {}
+                    self._levels = sorted(self._classes)
+                insort(self._classes[level].setdefault(kind, []), entry)
+
+    def remove(self, kind: str, item_id: int):
+        with self._lock:
+            self._remove(kind, item_id)
+
+    def _remove(self, kind, item_id):
+        name = self._names.pop((kind, item_id), None)
+        if name is None:
+            return
+        for level, entry in self._entries(kind, item_id, name):
+            del self._keys[bisect_left(self._keys, entry[0])]
+            kinds = self._classes[level]
+            entries = kinds[kind]
+            del entries[bisect_left(entries, entry)]
+            if not entries:
+                del kinds[kind]
+                if not kinds:
+                    del self._classes[level]
+                    self._levels = sorted(self._classes)
+
+    def rebuild(self, items: Iterable[Tuple[str, int, str]]):
+        """
+        Replace everything from `(kind, id, name)` rows.
+        """
+        names = {}
+        keys = []
+        classes: Dict[Tuple[bool, int], Dict[str, List[tuple]]] = {}
+        for kind, item_id, name in items:
+            names[(kind, item_id)] = name
+            for level, entry in self._entries(kind, item_id, name):
+                keys.append(entry[0])
+                classes.setdefault(level, {}).setdefault(kind, []).append(entry)
+        keys.sort()
+        for kinds in classes.values():
+            for entries in kinds.values():
+                entries.sort()
+        with self._lock:
+            self._keys = keys
+            self._classes = classes
+            self._levels = sorted(classes)
+            self._names = names
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self, loader: Callable[[], Iterable[Tuple[str, int, str]]]):
+        """
+        Build on first use, and again once older than `refresh_seconds` so
+        names changed by other worker processes show up.
+        """
+        loaded_at = self._loaded_at
+        if loaded_at is not None and (
+                self.refresh_seconds is None or time.monotonic() - loaded_at < self.refresh_seconds):
+            return
+        with self._lock:
+            if self._loaded_at is loaded_at:
+                self.rebuild(loader())
+
+    def _next_chars(self, head: str) -> List[str]:
+        """
+        Distinct characters that follow `head` in some key, found by jumping
+        from one branch to the next with bisect instead of scanning.
+        """
+        keys = self._keys
+        chars = []
+        size = len(head)
+        position = bisect_left(keys, head)
+        while position < len(keys) and keys[position].startswith(head):
+            if len(keys[position]) == size:
+                position += 1
+                continue
+            char = keys[position][size]
+            chars.append(char)
+            position = bisect_left(keys, head + chr(ord(char) + 1), position)
+        return chars
+
+    def _edits(self, word: str):
+        """
+        Strings one deletion, transposition, substitution or insertion away,
+        limited to substituted/inserted characters that some key continues with.
+        """
+        for i in range(len(word)):
+            yield word[:i] + word[i + 1:]
+        for i in range(len(word) - 1):
+            yield word[:i] + word[i + 1] + word[i] + word[i + 2:]
+        for i in range(len(word) + 1):
+            head = word[:i]
+            chars = self._next_chars(head)
+            if not chars:
+                # No key starts with `head`, so no edit further right can match either
+                break
+            for char in chars:
+                if i < len(word) and char != word[i]:
+                    yield head + char + word[i + 1:]
+                yield head + char + word[i:]
+
+    def _has_prefix(self, prefix: str) -> bool:
+        position = bisect_left(self._keys, prefix)
+        return position < len(self._keys) and self._keys[position].startswith(prefix)
+
+    def _collect(self, prefixes: List[str], kind: Optional[str], limit: int, found: Dict[Tuple[str, int], None]):
+        """
+        Add names matching any of `prefixes` to `found` in rank order until it
+        holds `limit`: whole-name before later-word matches, then shorter names,
+        then alphabetical. Each class is already in that order, so no class is
+        read past the first `limit` new names under a prefix.
+        """
+        for level in self._levels:
+            if len(found) >= limit:
+                return
+            candidates = []
+            for entry_kind, entries in self._classes[level].items():
+                if kind is not None and entry_kind != kind:
+                    continue
+                for prefix in prefixes:
+                    seen = set()
+                    position = bisect_left(entries, (prefix,))
+                    while len(seen) < limit and position < len(entries) and entries[position][0].startswith(prefix):
+                        ref = entries[position][2:4]
+                        position += 1
+                        if ref not in found and ref not in seen:
+                            seen.add(ref)
+                            candidates.append(entries[position - 1])
+            candidates.sort()
+            for entry in candidates:
+                if len(found) >= limit:
+                    return
+                found.setdefault(entry[2:4])
+
+    def suggest(self, prefix: str, limit: int = 10, kind: Optional[str] = None) -> List[Tuple[str, int, str]]:
+        """
+        Up to `limit` best `(kind, id, name)` matches for what has been typed so far.
+        """
+        query = normalize(prefix)
+        if not query:
+            return []
+        found: Dict[Tuple[str, int], None] = {}
+        with self._lock:
+            if self._has_prefix(query):
+                self._collect([query], kind, limit, found)
+            # Exact matches rank before typo matches, so typos only fill what is left
+            if len(found) < limit and len(query) >= self.min_typo_length:
+                variants = sorted(variant for variant in set(self._edits(query))
+                                  if variant and self._has_prefix(variant))
+                self._collect(variants, kind, limit, found)
+            return [(ref_kind, item_id, self._names[(ref_kind, item_id)]) for ref_kind, item_id in found]
+
+    def __len__(self):
+        return len(self._names)
@@ -0,0 +1,66 @@
+# autocomplete.py
+"""
+Lookup latency of the /autocomplete index for typed prefixes, with and
+without typos, on a synthetic catalog.
+
+    python benchmarks/autocomplete.py --products 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autocomplete import Autocomplete  # noqa: E402
+
+STEMS = ["turkey", "ham", "veggie", "chicken", "tuna", "club", "melt", "wrap", "italian", "caprese",
+         "pastrami", "reuben", "meatball", "avocado", "falafel", "salmon"]
+
+
+def catalog(count, rng):
+    for product_id in range(1, count + 1):
+        yield "product", product_id, " ".join(f"{rng.choice(STEMS)}{rng.randint(1, 99)}" for _ in range(3))
+    for ingredient_id in range(1, 501):
+        yield "ingredient", ingredient_id, f"{rng.choice(STEMS)} ingredient {ingredient_id}"
+
+
+def typo(word, rng):
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    index = Autocomplete()
+    started = time.perf_counter()
+    index.rebuild(catalog(args.products, rng))
+    print(f"built index over {len(index)} names in {time.perf_counter() - started:.2f}s")
+
+    queries = {
+        "prefix": lambda: rng.choice(STEMS)[:rng.randint(2, 6)],
+        "word + digit": lambda: f"{rng.choice(STEMS)}{rng.randint(1, 9)}",
+        "typo": lambda: typo(rng.choice(STEMS) + "zz", rng)[:-2],
+        "no match": lambda: rng.choice(["xqzv", "bread9", "pbj"]),
+    }
+    for label, make_query in queries.items():
+        timings = []
+        for _ in range(args.queries):
+            query = make_query()
+            started = time.perf_counter()
+            index.suggest(query, limit=10)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        print(f"{label:>13}: p50 {statistics.median(timings):.3f} ms  "
+              f"p99 {timings[int(len(timings) * 0.99)]:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# compression.py
+"""
+Bytes on the wire and CPU per request for each available codec, using a
+synthetic GET /orders/ payload (orders with repeated product/ingredient lists).
+
+    python benchmarks/compression.py --orders 1000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from response_compression import available_codecs  # noqa: E402
+
+PRODUCTS = [
+    {"name": "Burger", "price": 9.5, "promotion": 0, "dietary_type": "none",
+     "ingredients": [{"name": "bun", "quantity": 1}, {"name": "beef patty", "quantity": 1},
+                     {"name": "lettuce", "quantity": 2}, {"name": "tomato", "quantity": 2},
+                     {"name": "cheese", "quantity": 1}]},
+    {"name": "Veggie Wrap", "price": 7.25, "promotion": 10, "dietary_type": "vegan",
+     "ingredients": [{"name": "tortilla", "quantity": 1}, {"name": "hummus", "quantity": 2},
+                     {"name": "lettuce", "quantity": 2}, {"name": "cucumber", "quantity": 3}]},
+    {"name": "Fish and Chips", "price": 12.0, "promotion": 0, "dietary_type": "pescatarian",
+     "ingredients": [{"name": "cod", "quantity": 1}, {"name": "potato", "quantity": 3},
+                     {"name": "batter", "quantity": 1}]},
+]
+
+
+def payload(orders):
+    return json.dumps([
+        {"id": i, "order_type": "takeout" if i % 3 else "delivery", "order_status": "prepping",
+         "order_date": "2024-12-01", "products": [PRODUCTS[i % 3], PRODUCTS[(i + 1) % 3]]}
+        for i in range(orders)
+    ]).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    body = payload(args.orders)
+    print(f"identity: {len(body):>10,} bytes")
+    for name, codec in available_codecs().items():
+        start = time.process_time()
+        for _ in range(args.runs):
+            compressed = codec().compress(body, final=True)
+        cpu_ms = (time.process_time() - start) / args.runs * 1000
+        print(f"{name:>8}: {len(compressed):>10,} bytes  ratio {len(body) / len(compressed):5.1f}x  "
+              f"cpu {cpu_ms:.2f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
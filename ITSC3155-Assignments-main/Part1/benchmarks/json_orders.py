@@ -0,0 +1,91 @@
+# json_orders.py
+"""
+Serialization cost of the GET /orders/ list: Pydantic models re-validated
+against response_model (old path) vs plain dicts + FastJSONResponse.
+
+    python benchmarks/json_orders.py --orders 10000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+from types import SimpleNamespace
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from pydantic import TypeAdapter  # noqa: E402
+
+import main  # noqa: E402
+import schemas  # noqa: E402
+from fast_json import FastJSONResponse  # noqa: E402
+
+
+def fixtures(count):
+    products = {
+        i: SimpleNamespace(id=i, name=f"Product {i}", price=5.0 + i, promotion=0, dietary_type="none",
+                           ingredients=[{"name": f"ingredient {j}", "quantity": j + 1} for j in range(5)])
+        for i in range(1, 21)
+    }
+    orders = [
+        SimpleNamespace(id=i, order_type="takeout", order_status="prepping", order_date=date(2024, 12, 1),
+                        products=[{"product_id": i % 20 + 1, "quantity": 2}, {"product_id": (i + 7) % 20 + 1, "quantity": 1}])
+        for i in range(count)
+    ]
+    return products, orders
+
+
+def old_path(products, orders):
+    response = [
+        schemas.Order(
+            id=order.id, order_type=order.order_type, order_status=order.order_status, order_date=order.order_date,
+            products=[
+                schemas.ProductUpdate(
+                    name=product.name, price=product.price, promotion=product.promotion,
+                    dietary_type=product.dietary_type,
+                    ingredients=[schemas.IngredientUpdate(**ingredient) for ingredient in product.ingredients],
+                )
+                for item in order.products
+                for product in [products[item["product_id"]]]
+                for _ in range(item["quantity"])
+            ],
+        )
+        for order in orders
+    ]
+    # What FastAPI does with response_model: validate again, then encode
+    adapter = TypeAdapter(List[schemas.Order])
+    return adapter.dump_json(adapter.validate_python(response, from_attributes=True))
+
+
+def new_path(products, orders):
+    products_by_id = {product_id: main.product_to_dict(product) for product_id, product in products.items()}
+    return FastJSONResponse([main.order_to_dict(order, products_by_id) for order in orders]).body
+
+
+def timed(fn, *args, runs):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        body = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, len(body)
+
+
+def main_():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    products, orders = fixtures(args.orders)
+    old, old_size = timed(old_path, products, orders, runs=args.runs)
+    new, new_size = timed(new_path, products, orders, runs=args.runs)
+    print(f"pydantic + response_model: {old * 1000:8.1f} ms  ({old_size:,} bytes)")
+    print(f"dicts + FastJSONResponse:  {new * 1000:8.1f} ms  ({new_size:,} bytes)")
+    print(f"speedup: {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main_()
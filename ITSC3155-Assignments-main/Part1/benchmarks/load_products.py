@@ -0,0 +1,67 @@
+# load_products.py
+"""
+Load test for GET /products/ against a running server.
+
+    python server.py --workers 1 &   # then 2, 4, ...
+    python benchmarks/load_products.py --clients 8 --duration 10
+
+Clients are separate processes so the load generator itself is not limited
+to one core. Compare requests/sec across worker counts to check scaling.
+"""
+import argparse
+import multiprocessing
+import statistics
+import time
+
+import httpx
+
+
+def _client(url, duration, results):
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+    with httpx.Client(timeout=10) as client:
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                response = client.get(url)
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+    results.put((latencies, errors))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000/products/")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_client, args=(args.url, args.duration, results))
+        for _ in range(args.clients)
+    ]
+    for process in processes:
+        process.start()
+
+    latencies, errors = [], 0
+    for _ in processes:
+        client_latencies, client_errors = results.get()
+        latencies.extend(client_latencies)
+        errors += client_errors
+    for process in processes:
+        process.join()
+
+    latencies.sort()
+    print(f"requests: {len(latencies)}  errors: {errors}")
+    print(f"throughput: {len(latencies) / args.duration:.1f} req/s")
+    print(f"p50: {statistics.median(latencies) * 1000:.2f} ms  "
+          f"p99: {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# order_view.py
+"""
+Read latency of an api order rendered through the joins (orders ->
+order_details -> sandwiches, recipes -> resources) against the
+pre-rendered order_view document, on SQLite.
+
+    python benchmarks/order_view.py --orders 5000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from api.controllers import order_views, orders  # noqa: E402
+from api.dependencies.database import Base  # noqa: E402
+from api.models import model_loader  # noqa: E402,F401
+from api.models.order_details import OrderDetail  # noqa: E402
+from api.models.orders import Order  # noqa: E402
+from api.models.recipes import Recipe  # noqa: E402
+from api.models.resources import Resource  # noqa: E402
+from api.models.sandwiches import Sandwich  # noqa: E402
+from api.schemas import orders as schema  # noqa: E402
+
+
+def populate(engine, order_count, lines, rng):
+    with engine.begin() as conn:
+        conn.execute(insert(Resource), [{"id": i, "item": f"resource {i}", "amount": 10 ** 6} for i in range(1, 41)])
+        conn.execute(insert(Sandwich), [{"id": i, "sandwich_name": f"sandwich {i}", "price": rng.randint(300, 999) / 100}
+                                        for i in range(1, 51)])
+        conn.execute(insert(Recipe), [{"sandwich_id": s, "resource_id": r, "amount": rng.randint(1, 3)}
+                                      for s in range(1, 51) for r in rng.sample(range(1, 41), 5)])
+        conn.execute(insert(Order), [{"id": i, "customer_name": f"customer {i}"} for i in range(1, order_count + 1)])
+        conn.execute(insert(OrderDetail), [{"order_id": o, "sandwich_id": rng.randint(1, 50), "amount": rng.randint(1, 4)}
+                                           for o in range(1, order_count + 1) for _ in range(lines)])
+
+
+def measure(label, session_factory, read, order_count, reads, rng):
+    timings = []
+    for _ in range(reads):
+        order_id = rng.randint(1, order_count)
+        started = time.perf_counter()
+        # A session per read, like a request
+        with session_factory() as db:
+            read(db, order_id)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    print(f"{label:>22}: p50 {statistics.median(timings):.3f} ms  p99 {timings[int(len(timings) * 0.99)]:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--lines", type=int, default=5)
+    parser.add_argument("--reads", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'orders.db')}")
+        Base.metadata.create_all(engine)
+        populate(engine, args.orders, args.lines, rng)
+        session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+        started = time.perf_counter()
+        with session_factory() as db:
+            for first in range(1, args.orders + 1, 500):
+                order_views.refresh(db, range(first, min(first + 500, args.orders + 1)))
+            db.commit()
+        print(f"rendered {args.orders} order_view documents in {time.perf_counter() - started:.2f}s")
+
+        measure("order only (joins)", session_factory,
+                lambda db, order_id: schema.Order.model_validate(
+                    orders.read_one(db, order_id), from_attributes=True).model_dump_json(),
+                args.orders, args.reads, rng)
+        measure("order + ticket (joins)", session_factory,
+                lambda db, order_id: order_views.build_documents(db, [order_id]), args.orders, args.reads, rng)
+        measure("order_view lookup", session_factory, order_views.read, args.orders, args.reads, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# search_products.py
+"""
+Query latency of the in-memory product index on a synthetic catalog, and
+ingredient include/exclude filtering vs walking every product's JSON.
+
+    python benchmarks/search_products.py --products 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import ProductIndex  # noqa: E402
+
+WORDS = [f"{stem}{i}" for stem in ("turkey", "ham", "veggie", "chicken", "tuna", "club", "melt", "wrap")
+         for i in range(60)]
+INGREDIENTS = [f"ingredient{i}" for i in range(400)]
+DIETARY_TYPES = ["none", "vegetarian", "vegan", "gluten free"]
+
+
+def catalog(count, rng):
+    for product_id in range(1, count + 1):
+        yield (product_id, " ".join(rng.sample(WORDS, 3)), rng.choice(DIETARY_TYPES),
+               rng.sample(INGREDIENTS, 6))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    products = list(catalog(args.products, rng))
+    index = ProductIndex()
+    started = time.perf_counter()
+    index.rebuild(products)
+    print(f"built index over {len(index)} products in {time.perf_counter() - started:.2f}s")
+
+    queries = {
+        "one term": lambda: rng.choice(WORDS),
+        "two terms AND": lambda: f"{rng.choice(WORDS)} {rng.choice(INGREDIENTS)}",
+        "prefix": lambda: rng.choice(WORDS)[:-1],
+        "two terms OR": lambda: f"{rng.choice(WORDS)} {rng.choice(WORDS)}",
+    }
+    for label, make_query in queries.items():
+        mode = "or" if label.endswith("OR") else "and"
+        timings = []
+        for _ in range(args.queries):
+            query = make_query()
+            started = time.perf_counter()
+            index.search(query, mode=mode, limit=50)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        print(f"{label:>14}: p50 {statistics.median(timings):.3f} ms  "
+              f"p99 {timings[int(len(timings) * 0.99)]:.3f} ms")
+
+    rows = [{"id": pid, "dietary_type": dietary, "ingredients": [{"name": n, "quantity": 1} for n in names]}
+            for pid, _, dietary, names in products]
+
+    def json_walk(include, exclude):
+        return [row["id"] for row in rows
+                if all(any(i["name"] == name for i in row["ingredients"]) for name in include)
+                and not any(i["name"] in exclude for i in row["ingredients"])]
+
+    filters = [([rng.choice(INGREDIENTS)], rng.sample(INGREDIENTS, 2)) for _ in range(20)]
+    for label, run in (("JSON walk", json_walk), ("bitsets", lambda inc, exc: index.filter(inc, exc))):
+        started = time.perf_counter()
+        for include, exclude in filters:
+            run(include, exclude)
+        print(f"{label:>14}: {(time.perf_counter() - started) * 1000 / len(filters):.2f} ms per include/exclude filter")
+
+
+if __name__ == "__main__":
+    main()
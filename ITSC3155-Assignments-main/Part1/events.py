@@ -0,0 +1,107 @@
+# events.py
+import asyncio
+import json
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    type: str
+    data: dict
+
+    def to_sse(self) -> str:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data, default=str)}\n\n"
+
+
+class Subscription:
+    """
+    Async iterator over events for one client. Events are handed over from the
+    publishing thread with call_soon_threadsafe, so sync endpoints can publish.
+    """
+
+    def __init__(self, hub, loop, max_pending):
+        self._hub = hub
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._max_pending = max_pending
+        self.overflowed = False
+
+    def _deliver(self, event):
+        if self._queue.qsize() >= self._max_pending:
+            # Slow consumer: drop it, the client resumes with Last-Event-ID
+            self.overflowed = True
+            self._hub.unsubscribe(self)
+            self._queue.put_nowait(None)
+            return
+        self._queue.put_nowait(event)
+
+    def push(self, event):
+        self._loop.call_soon_threadsafe(self._deliver, event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """
+        Next event, or None on timeout or after the subscription was dropped.
+        """
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self._hub.unsubscribe(self)
+
+
+class EventHub:
+    """
+    In-process broadcast hub with a bounded replay buffer. Event ids increase
+    monotonically within a process; subscribers resuming from an id still in
+    the buffer receive everything they missed, older ids get a `reset` event.
+    Each worker process has its own hub and only sees its own writes.
+    """
+
+    def __init__(self, history: int = 1000, max_pending: int = 1000):
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._history = deque(maxlen=history)
+        self._subscribers = set()
+        self._max_pending = max_pending
+
+    def publish(self, event_type: str, data: dict) -> Event:
+        with self._lock:
+            event = Event(self._next_id, event_type, data)
+            self._next_id += 1
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.push(event)
+        return event
+
+    def subscribe(self, last_event_id: Optional[int] = None):
+        """
+        Register a subscriber on the running loop. Returns the subscription and
+        the backlog to replay, taken atomically so no event is missed or doubled.
+        """
+        subscription = Subscription(self, asyncio.get_running_loop(), self._max_pending)
+        with self._lock:
+            backlog = []
+            if last_event_id is not None:
+                oldest = self._history[0].id if self._history else self._next_id
+                if last_event_id + 1 < oldest or last_event_id >= self._next_id:
+                    # Gap in the buffer (or an id from before a restart): client must refetch
+                    backlog.append(Event(self._next_id - 1, "reset", {}))
+                else:
+                    backlog.extend(event for event in self._history if event.id > last_event_id)
+            self._subscribers.add(subscription)
+        return subscription, backlog
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
@@ -0,0 +1,36 @@
+# fast_json.py
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the standard library encoder
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for content that is already plain dicts/lists. Returning it
+    from an endpoint skips FastAPI's response_model validation, so rows read
+    from the database are serialized directly instead of validated twice.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,138 @@
+# kitchen.py
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+
+class KitchenScheduler:
+    """
+    Priority queue of `prepping` orders handed out to N prep stations.
+
+    An order's priority is fixed when it is queued: its arrival time, moved
+    earlier by a per-type boost (delivery drivers wait on us) and later by its
+    estimated prep time, so among orders of similar age quick ones go first.
+    Because the key never changes, older orders naturally rise to the top and
+    add/claim/remove stay O(log n). Removed orders are dropped lazily on pop.
+    """
+
+    def __init__(self, stations: int, type_boost: Optional[Dict[str, float]] = None, prep_weight: float = 0.5):
+        self.stations = stations
+        self.type_boost = type_boost if type_boost is not None else {"delivery": 300.0, "takeout": 0.0}
+        self.prep_weight = prep_weight
+        self._heap = []
+        self._entries = {}  # order_id -> heap entry, for lazy removal
+        self._queued_at = {}  # order_id -> arrival time of waiting orders
+        self._assigned = {}  # station_id -> order_id
+        self._station_of = {}  # order_id -> station_id
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def priority(self, order_type: str, queued_at: float, prep_seconds: float) -> float:
+        return queued_at - self.type_boost.get(order_type, 0.0) + prep_seconds * self.prep_weight
+
+    def add(self, order_id: int, order_type: str, prep_seconds: float, queued_at: Optional[float] = None):
+        """
+        Queue an order, replacing its previous entry if it was already waiting.
+        A waiting order keeps its original arrival time unless `queued_at` is
+        given, so editing it does not send it to the back of the queue.
+        Orders already being prepared at a station are left where they are.
+        """
+        with self._lock:
+            if order_id in self._station_of:
+                return
+            if queued_at is None:
+                queued_at = self._queued_at.get(order_id, time.time())
+            self._discard(order_id)
+            self._queued_at[order_id] = queued_at
+            entry = [self.priority(order_type, queued_at, prep_seconds), next(self._sequence), order_id, True]
+            self._entries[order_id] = entry
+            heapq.heappush(self._heap, entry)
+
+    def remove(self, order_id: int):
+        """
+        Forget an order wherever it is: waiting in the queue or at a station.
+        """
+        with self._lock:
+            self._discard(order_id)
+            station_id = self._station_of.pop(order_id, None)
+            if station_id is not None:
+                del self._assigned[station_id]
+
+    def _discard(self, order_id):
+        self._queued_at.pop(order_id, None)
+        entry = self._entries.pop(order_id, None)
+        if entry is not None:
+            entry[-1] = False
+            # Compact once dead entries dominate, keeping the heap O(open orders)
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                self._heap = [e for e in self._heap if e[-1]]
+                heapq.heapify(self._heap)
+
+    def claim(self, station_id: int) -> Optional[int]:
+        """
+        Next order for a station. A station keeps its current order until it is
+        completed, so repeated calls return the same order.
+        """
+        if not 1 <= station_id <= self.stations:
+            raise ValueError(f"Station must be between 1 and {self.stations}.")
+        with self._lock:
+            if station_id in self._assigned:
+                return self._assigned[station_id]
+            while self._heap:
+                _, _, order_id, valid = heapq.heappop(self._heap)
+                if valid:
+                    del self._entries[order_id]
+                    del self._queued_at[order_id]
+                    self._assigned[station_id] = order_id
+                    self._station_of[order_id] = station_id
+                    return order_id
+            return None
+
+    def complete(self, order_id: int) -> Optional[int]:
+        """
+        Mark an order done and free its station. Returns the station id, if any.
+        """
+        with self._lock:
+            self._discard(order_id)
+            station_id = self._station_of.pop(order_id, None)
+            if station_id is not None:
+                del self._assigned[station_id]
+            return station_id
+
+    def station_of(self, order_id: int) -> Optional[int]:
+        """
+        The station currently making an order, or None when it is not claimed.
+        """
+        with self._lock:
+            return self._station_of.get(order_id)
+
+    def peek(self, limit: int = 10) -> List[int]:
+        with self._lock:
+            return [entry[2] for entry in heapq.nsmallest(limit, (e for e in self._heap if e[-1]))]
+
+    def rebuild(self, orders: Iterable[tuple]):
+        """
+        Replace all state from `(order_id, order_type, prep_seconds, queued_at)`
+        rows, e.g. every `prepping` order in the database after a restart.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._queued_at.clear()
+            self._assigned.clear()
+            self._station_of.clear()
+            self._heap = []
+            for order_id, order_type, prep_seconds, queued_at in orders:
+                entry = [self.priority(order_type, queued_at, prep_seconds), next(self._sequence), order_id, True]
+                self._entries[order_id] = entry
+                self._queued_at[order_id] = queued_at
+                self._heap.append(entry)
+            heapq.heapify(self._heap)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "waiting": len(self._entries),
+                "stations": {station_id: self._assigned.get(station_id) for station_id in range(1, self.stations + 1)},
+            }
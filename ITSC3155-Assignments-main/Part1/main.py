@@ -1,23 +1,97 @@
 # main.py
+import itertools
+import os
+import uuid
 from collections import Counter
+from contextlib import asynccontextmanager
 from datetime import datetime, date
-from typing import List
+from typing import List, Optional
 
-from fastapi import FastAPI, Depends, HTTPException
+import anyio.from_thread
+import anyio.to_thread
+from fastapi import FastAPI, Depends, HTTPException, Header, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import parse_obj_as
-from sqlalchemy import Float, text, func
+from sqlalchemy import Float, text, func, or_, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from sqlalchemy.orm import Session
 from starlette import status
 
+import metrics
 import models, schemas
+from admission import AdmissionController
+from autocomplete import Autocomplete
+from events import EventHub
+from kitchen import KitchenScheduler
+from promotions import ExpirySweeper, PromoEngine, PromoRule
+from promo_codes import SWEEP_ERRORS, bulk_create_promo_codes, deactivate_expired, iter_batch_codes
+from review_import import import_reviews
+from search_index import ProductIndex
+from fast_json import FastJSONResponse
+from response_compression import CompressionMiddleware
+from api.dependencies.config import conf
 from api.dependencies.database import Base
-from database import engine, get_db
-
-app = FastAPI()
-
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+from database import engine, get_db, init_db, SessionLocal
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create database tables once, skipped when the stored schema version is current
+    init_db()
+    backfill_review_summaries()
+    rebuild_kitchen_queue()
+    promo_sweeper.start()
+    yield
+    promo_sweeper.stop(timeout=5)
+
+
+app = FastAPI(lifespan=lifespan)
+# Compress large JSON lists; registered first so metrics time the compression too
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.track_pool(engine)
+
+# Bounds concurrent order writes so a rush fails fast instead of piling up on DB locks
+order_admission = AdmissionController(
+    "orders",
+    max_in_flight=conf.order_max_in_flight,
+    max_queue=conf.order_max_queue,
+    queue_timeout=conf.order_queue_timeout,
+)
+
+# Pushes order changes to kitchen displays instead of having them poll GET /orders/
+order_events = EventHub(history=conf.order_event_history)
+
+# Decides which `prepping` order each kitchen station makes next
+kitchen = KitchenScheduler(stations=conf.kitchen_stations)
+
+# Full-text product search; built on first search and kept current by the product endpoints
+product_index = ProductIndex(refresh_seconds=conf.product_search_refresh)
+
+# POS typeahead over product and ingredient names, kept current the same way
+name_suggestions = Autocomplete(refresh_seconds=conf.product_search_refresh)
+
+# Promo codes and product prices served from memory when applying discounts
+promo_engine = PromoEngine(
+    ttl=conf.promo_cache_ttl,
+    negative_ttl=conf.promo_negative_cache_ttl,
+    price_ttl=conf.product_price_cache_ttl,
+    code_stats=metrics.CacheStats("promo_codes"),
+    price_stats=metrics.CacheStats("product_prices"),
+)
+
+# State above lives in this process only; server.py refuses to fork several workers over it
+app.state.process_local = ("order admission limits", "order event stream", "kitchen queue",
+                           "search and promo caches")
+
+# Deactivates expired promo codes in the background so the active set stays small
+promo_sweeper = ExpirySweeper(
+    lambda: deactivate_expired(batch_size=conf.promo_sweep_batch_size),
+    interval=conf.promo_sweep_interval,
+    on_error=lambda e: SWEEP_ERRORS.inc(),
+)
 
 
 @app.post("/ingredients/", response_model=schemas.Ingredient, status_code=status.HTTP_201_CREATED)
@@ -30,10 +104,11 @@ def create_ingredient(ingredient: schemas.IngredientCreate, db: Session = Depend
     try:
         db.commit()
         db.refresh(db_ingredient)
-        return db_ingredient
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=400, detail="Ingredient already exists.")
+    name_suggestions.add("ingredient", db_ingredient.id, db_ingredient.name)
+    return db_ingredient
 
 
 
@@ -85,6 +160,7 @@ def update_ingredient(ingredient_id: int, ingredient_update: schemas.IngredientU
 
     db.commit()
     db.refresh(db_ingredient)
+    name_suggestions.add("ingredient", db_ingredient.id, db_ingredient.name)
     return db_ingredient
 
 @app.delete("/ingredients/{ingredient_id}", response_model=schemas.Ingredient)
@@ -99,6 +175,7 @@ def delete_ingredient(ingredient_id: int, db: Session = Depends(get_db)):
     # Delete the ingredient
     db.delete(db_ingredient)
     db.commit()
+    name_suggestions.remove("ingredient", ingredient_id)
 
     return db_ingredient  # Return the deleted ingredient for confirmation
 
@@ -118,10 +195,11 @@ def create_product(product: schemas.ProductCreate, db: Session = Depends(get_db)
     try:
         db.commit()
         db.refresh(db_product)
-        return db_product
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=400, detail="Product already exists.")
+    index_product(db_product)
+    return db_product
 
 @app.get("/products/", response_model=List[schemas.Product], status_code=status.HTTP_200_OK)
 def get_all_products(db: Session = Depends(get_db)):
@@ -181,10 +259,12 @@ def update_product(product_id: int, product_update: schemas.ProductUpdate, db: S
     try:
         db.commit()
         db.refresh(db_product)
-        return db_product
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error updating product: {str(e)}")
+    index_product(db_product)
+    promo_engine.invalidate_price(product_id)
+    return db_product
 
 
 @app.delete("/products/{product_id}", response_model=schemas.Product)
@@ -199,6 +279,9 @@ def delete_product(product_id: int, db: Session = Depends(get_db)):
     # Delete the product
     db.delete(db_product)
     db.commit()
+    product_index.remove(product_id)
+    name_suggestions.remove("product", product_id)
+    promo_engine.invalidate_price(product_id)
 
     # Reset IDs
     # products = db.query(models.Product).order_by(models.Product.id).all()
@@ -208,7 +291,8 @@ def delete_product(product_id: int, db: Session = Depends(get_db)):
 
     return db_product # Return the deleted product for confirmation
 
-@app.post("/orders/", response_model=schemas.Order, status_code=status.HTTP_201_CREATED)
+@app.post("/orders/", response_model=schemas.Order, status_code=status.HTTP_201_CREATED,
+          dependencies=[Depends(order_admission)])
 def create_order(order: schemas.CreateOrder, db: Session = Depends(get_db)):
     try:
         # Fetch products based on IDs
@@ -231,6 +315,7 @@ def create_order(order: schemas.CreateOrder, db: Session = Depends(get_db)):
         for ingredient_name, required_quantity in required_ingredients.items():
             ingredient = db.query(models.Ingredient).filter(models.Ingredient.name == ingredient_name).first()
             if not ingredient or ingredient.quantity < required_quantity:
+                metrics.ORDERS.labels("rejected_insufficient_ingredients").inc()
                 raise HTTPException(
                     status_code=400,
                     detail=f"Not enough of ingredient '{ingredient_name}' to fulfill the order. "
@@ -258,18 +343,22 @@ def create_order(order: schemas.CreateOrder, db: Session = Depends(get_db)):
 
         db.commit()
         db.refresh(new_order)
+        metrics.ORDERS.labels("accepted").inc()
 
         # Use the utility function to transform products into Pydantic models
         full_products = transform_products_to_pydantic(products_json, db)
 
         # Return the newly created order with detailed product information
-        return schemas.Order(
+        response_order = schemas.Order(
             id=new_order.id,
             order_type=new_order.order_type,
             order_status=new_order.order_status,
             order_date=new_order.order_date,
             products=full_products
         )
+        schedule_order(new_order)
+        order_events.publish("order.created", response_order.model_dump())
+        return response_order
 
     except Exception as e:
         db.rollback()
@@ -277,7 +366,8 @@ def create_order(order: schemas.CreateOrder, db: Session = Depends(get_db)):
 
 
 
-@app.get("/orders/", response_model=List[schemas.Order], status_code=status.HTTP_200_OK)
+@app.get("/orders/", response_model=List[schemas.Order], status_code=status.HTTP_200_OK,
+         response_class=FastJSONResponse)
 def get_all_orders(db: Session = Depends(get_db)):
     """
     Retrieve a list of all orders with detailed product information.
@@ -287,24 +377,48 @@ def get_all_orders(db: Session = Depends(get_db)):
         if not orders:
             raise HTTPException(status_code=404, detail="No orders found")
 
-        response_orders = [
-            schemas.Order(
-                id=order.id,
-                order_type=order.order_type,
-                order_status=order.order_status,
-                order_date=order.order_date.date(),
-                products=transform_products_to_pydantic(order.products, db)
-            )
-            for order in orders
-        ]
-
-        return response_orders
+        # Built as plain dicts and returned directly to skip response_model re-validation
+        products_by_id = load_products_by_id(orders, db)
+        return FastJSONResponse([order_to_dict(order, products_by_id) for order in orders])
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving orders: {str(e)}")
 
 
 
+@app.get("/orders/events", response_class=StreamingResponse)
+async def stream_order_events(request: Request, last_event_id: Optional[int] = None,
+                              last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID")):
+    """
+    Server-Sent Events stream of order created/updated/paid/deleted events.
+    Reconnecting clients resume from the `Last-Event-ID` header (or `last_event_id` query).
+    """
+    resume_from = last_event_id_header if last_event_id_header is not None else last_event_id
+    subscription, backlog = order_events.subscribe(resume_from)
+
+    async def event_stream():
+        try:
+            yield "retry: 2000\n\n"
+            for event in backlog:
+                yield event.to_sse()
+            while not subscription.overflowed:
+                event = await subscription.get(timeout=conf.order_event_heartbeat)
+                if event is None:
+                    if await request.is_disconnected():
+                        break
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield event.to_sse()
+        finally:
+            subscription.close()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @app.get("/orders/{order_id}", response_model=schemas.Order, status_code=status.HTTP_200_OK)
 def get_order(order_id: int, db: Session = Depends(get_db)):
     """
@@ -347,7 +461,7 @@ def get_order(order_id: int, db: Session = Depends(get_db)):
             id=order.id,
             order_type=order.order_type,
             order_status=order.order_status,
-            order_date=order.order_date.date(),
+            order_date=as_date(order.order_date),
             products=full_products
         )
 
@@ -356,7 +470,8 @@ def get_order(order_id: int, db: Session = Depends(get_db)):
 
 
 
-@app.put("/orders/{order_id}", response_model=schemas.Order, status_code=status.HTTP_200_OK)
+@app.put("/orders/{order_id}", response_model=schemas.Order, status_code=status.HTTP_200_OK,
+         dependencies=[Depends(order_admission)])
 def update_order(order_id: int, updated_order: schemas.CreateOrder, db: Session = Depends(get_db)):
     """
     Update an existing order by ID.
@@ -380,6 +495,7 @@ def update_order(order_id: int, updated_order: schemas.CreateOrder, db: Session
             for ingredient in product.ingredients:
                 db_ingredient = db.query(models.Ingredient).filter(models.Ingredient.name == ingredient["name"]).first()
                 if not db_ingredient or db_ingredient.quantity < (ingredient["quantity"] * product_counts[product.id]):
+                    metrics.ORDERS.labels("rejected_insufficient_ingredients").inc()
                     raise HTTPException(
                         status_code=400,
                         detail=f"Insufficient {ingredient['name']} for product {product.name}"
@@ -426,13 +542,16 @@ def update_order(order_id: int, updated_order: schemas.CreateOrder, db: Session
                 )
 
         # Fix order_date to return only the date part
-        return schemas.Order(
+        response_order = schemas.Order(
             id=order.id,
             order_type=order.order_type,
             order_status=order.order_status,
-            order_date=order.order_date.date(),
+            order_date=as_date(order.order_date),
             products=full_products
         )
+        schedule_order(order)
+        order_events.publish("order.updated", response_order.model_dump())
+        return response_order
 
     except Exception as e:
         db.rollback()
@@ -456,7 +575,7 @@ def delete_order(order_id: int, db: Session = Depends(get_db)):
             id=order.id,
             order_type=order.order_type,
             order_status=order.order_status,
-            order_date=order.order_date.date() if isinstance(order.order_date, datetime) else order.order_date,
+            order_date=as_date(order.order_date),
             products=order.products or []
         )
 
@@ -464,6 +583,8 @@ def delete_order(order_id: int, db: Session = Depends(get_db)):
         db.delete(order)
         db.commit()
 
+        kitchen.remove(order_id)
+        order_events.publish("order.deleted", deleted_order.model_dump())
         return deleted_order
 
     except Exception as e:
@@ -495,6 +616,7 @@ def create_review(review: schemas.CreateReview, db: Session = Depends(get_db)):
     )
     db.add(db_review)
     try:
+        adjust_review_summary(db, review.product_id, 1)
         db.commit()
         db.refresh(db_review)
         return db_review
@@ -503,6 +625,54 @@ def create_review(review: schemas.CreateReview, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Review could not be created due to a database constraint.")
 
 
+@app.post("/reviews/import", response_model=schemas.ReviewImportResult, status_code=status.HTTP_200_OK)
+async def import_reviews_in_bulk(request: Request, format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    """
+    Import reviews from an NDJSON or CSV request body. The body is streamed and written in
+    batches; rejected rows go to a reject file on the server. Also available as `python review_import.py`.
+    """
+    body = request.stream().__aiter__()
+
+    def chunks():
+        # Pull the async request body from the worker thread running the import
+        while True:
+            try:
+                yield anyio.from_thread.run(body.__anext__)
+            except StopAsyncIteration:
+                return
+
+    reject_path = os.path.join(
+        conf.review_import_reject_dir,
+        f"reviews-{datetime.utcnow():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}.rejects.ndjson",
+    )
+
+    def run():
+        with open(reject_path, "w") as rejects:
+            return import_reviews(chunks(), format, rejects)
+
+    result = None
+    try:
+        result = await anyio.to_thread.run_sync(run)
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Request body must be UTF-8 ({e.reason}); "
+                                                    "rows before it were imported.")
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error importing reviews: {str(e)}")
+    finally:
+        # Keep the reject file only when it has something in it
+        if (result is None or not result.rejected) and os.path.exists(reject_path):
+            os.remove(reject_path)
+
+    return schemas.ReviewImportResult(
+        imported=result.imported,
+        rejected=result.rejected,
+        seconds=round(result.seconds, 3),
+        rows_per_second=round(result.rows_per_second),
+        rejects_file=reject_path if result.rejected else None,
+        errors=result.errors,
+    )
+
+
 @app.get("/reviews{review_id}", response_model=schemas.Review, status_code=status.HTTP_201_CREATED)
 def get_review(review_id: int, db: Session = Depends(get_db)):
     """
@@ -539,6 +709,36 @@ def get_all_reviews(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Database error occurred")
 
 
+@app.get("/products/{product_id}/reviews", response_model=schemas.ProductReviews, status_code=status.HTTP_200_OK)
+def get_product_reviews(product_id: int,
+                        before_id: Optional[int] = Query(None, ge=1),
+                        limit: int = Query(20, ge=1, le=100),
+                        db: Session = Depends(get_db)):
+    """
+    One product's reviews, newest first, together with its review count and latest review time.
+    Pass `next_before_id` from a page as `before_id` to get the next one.
+    """
+    summary = db.get(models.ProductReviewSummary, product_id)
+
+    # Keyset page over the (product_id, id) index; one extra row tells whether another page exists
+    query = db.query(models.Review).filter(models.Review.product_id == product_id)
+    if before_id is not None:
+        query = query.filter(models.Review.id < before_id)
+    reviews = query.order_by(models.Review.id.desc()).limit(limit + 1).all()
+
+    if summary is None and not reviews:
+        if db.get(models.Product, product_id) is None:
+            raise HTTPException(status_code=404, detail=f"Product with ID {product_id} does not exist.")
+
+    next_before_id = reviews[limit - 1].id if len(reviews) > limit else None
+    return schemas.ProductReviews(
+        product_id=product_id,
+        summary=schemas.ReviewSummary.model_validate(summary) if summary else schemas.ReviewSummary(),
+        reviews=[schemas.Review.model_validate(review) for review in reviews[:limit]],
+        next_before_id=next_before_id,
+    )
+
+
 @app.patch("/reviews/{review_id}", response_model=schemas.Review, status_code=status.HTTP_200_OK)
 def update_review(review_id: int, review_update: schemas.ReviewUpdate, db: Session = Depends(get_db)):
     """
@@ -553,6 +753,7 @@ def update_review(review_id: int, review_update: schemas.ReviewUpdate, db: Sessi
         raise HTTPException(status_code=404, detail=f"Product with ID {review_update.product_id} not found.")
 
     # Update review fields
+    previous_product_id = db_review.product_id
     if review_update.product_id is not None:
         db_review.product_id = review_update.product_id
     if review_update.title is not None:
@@ -560,6 +761,10 @@ def update_review(review_id: int, review_update: schemas.ReviewUpdate, db: Sessi
     if review_update.description is not None:
         db_review.description = review_update.description
 
+    if db_review.product_id != previous_product_id:
+        # The review moved: one less for the old product, one more for the new one
+        adjust_review_summary(db, previous_product_id, -1)
+        adjust_review_summary(db, db_review.product_id, 1)
     db.commit()
     db.refresh(db_review)
     return db_review
@@ -577,13 +782,17 @@ def delete_review(review_id: int, db: Session = Depends(get_db)):
             raise HTTPException(status_code=404, detail=f"Review with ID {review_id} not found")
 
         db.delete(deleted_review)
+        adjust_review_summary(db, deleted_review.product_id, -1)
         db.commit()
         return deleted_review
 
+    except HTTPException:
+        raise
     except Exception as e:
+        db.rollback()
         raise HTTPException(status_code=500, detail=f"Error retrieving review: {str(e)}")
 
-@app.get("/orders_by_date_range/", response_model=List[schemas.Order])
+@app.get("/orders_by_date_range/", response_model=List[schemas.Order], response_class=FastJSONResponse)
 def get_orders_by_date_range(start_date: str, end_date: str, db: Session = Depends(get_db)):
     """
     Retrieve all orders within a specific date range.
@@ -617,44 +826,11 @@ def get_orders_by_date_range(start_date: str, end_date: str, db: Session = Depen
             detail=f"No orders found between {start_date} and {end_date}.",
         )
 
-    # Convert to Pydantic models
-    validated_orders = []
-    for order in orders:
-        # Handle missing or `None` products
-        if not order.products:
-            order.products = []
-
-        full_products = []
-        for product_data in order.products:
-            product = db.query(models.Product).filter(models.Product.id == product_data["product_id"]).first()
-            if product:
-                full_products.append(
-                    schemas.ProductUpdate(
-                        name=product.name,
-                        price=product.price,
-                        promotion=product.promotion,
-                        dietary_type=product.dietary_type,
-                        ingredients=[
-                            schemas.IngredientUpdate(
-                                name=ingredient["name"],
-                                quantity=ingredient["quantity"],
-                            )
-                            for ingredient in product.ingredients
-                        ],
-                    )
-                )
-
-        validated_orders.append(
-            schemas.Order(
-                id=order.id,
-                order_type=order.order_type,
-                order_status=order.order_status,
-                order_date=order.order_date,
-                products=full_products,
-            )
-        )
-
-    return validated_orders
+    # Orders by date list each product once, regardless of its quantity
+    products_by_id = load_products_by_id(orders, db)
+    return FastJSONResponse([
+        order_to_dict(order, products_by_id, repeat_quantity=False) for order in orders
+    ])
 
 
 @app.get("/revenue/{date}", response_model=str)
@@ -690,25 +866,130 @@ def get_daily_revenue(date: str, db: Session = Depends(get_db)):
 
 
 @app.get("/products/search/", response_model=List[schemas.Product], status_code=status.HTTP_200_OK)
-def search_products_by_dietary_type(dietary_type: str, db: Session = Depends(get_db)):
+def search_products(q: Optional[str] = None,
+                    dietary_type: Optional[str] = None,
+                    include: Optional[List[str]] = Query(None),
+                    exclude: Optional[List[str]] = Query(None),
+                    mode: str = Query("and", pattern="^(and|or)$"),
+                    limit: int = Query(50, ge=1, le=500),
+                    db: Session = Depends(get_db)):
     """
-    Search for products by dietary type.
+    Search products by name, dietary type and ingredient names, best matches first.
+    `q` terms also match word prefixes; `mode` decides whether all or any must match.
+    `include`/`exclude` keep products with all / none of the given ingredients,
+    e.g. `?exclude=peanuts&exclude=milk`. Without `q` results are ordered by ID.
     """
+    if q is None and dietary_type is None and not include and not exclude:
+        raise HTTPException(status_code=400, detail="Provide a search query, dietary type or ingredient filter.")
+
     try:
-        # Query products with the specified dietary type
-        products = db.query(models.Product).filter(models.Product.dietary_type == dietary_type).all()
+        if q is None and not include and not exclude:
+            # Query products with the specified dietary type
+            products = db.query(models.Product).filter(models.Product.dietary_type == dietary_type).all()
+        else:
+            product_index.ensure_loaded(lambda: product_index_rows(db))
+            if q is None:
+                product_ids = product_index.filter(include, exclude, dietary_type, limit=limit)
+            else:
+                ranked = product_index.search(q, mode=mode, limit=limit, dietary_type=dietary_type,
+                                              include=include, exclude=exclude)
+                product_ids = [product_id for product_id, _ in ranked]
+            rank = {product_id: position for position, product_id in enumerate(product_ids)}
+            products = db.query(models.Product).filter(models.Product.id.in_(rank)).all() if rank else []
+            products.sort(key=lambda product: rank[product.id])
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error searching for products: {str(e)}")
 
-        if not products:
-            raise HTTPException(status_code=404, detail=f"No products found for dietary type: {dietary_type}")
+    if not products:
+        raise HTTPException(status_code=404, detail="No products found matching the search.")
+    return products
 
-        return products
+
+@app.get("/autocomplete", response_model=List[schemas.Suggestion], status_code=status.HTTP_200_OK)
+def autocomplete(q: str = Query(..., min_length=1),
+                 limit: int = Query(10, ge=1, le=50),
+                 kind: Optional[str] = Query(None, alias="type", pattern="^(product|ingredient)$"),
+                 db: Session = Depends(get_db)):
+    """
+    Product and ingredient names matching what has been typed so far, tolerating one typo.
+    """
+    try:
+        name_suggestions.ensure_loaded(lambda: suggestion_rows(db))
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error loading suggestions: {str(e)}")
+    return [{"type": item_kind, "id": item_id, "name": name}
+            for item_kind, item_id, name in name_suggestions.suggest(q, limit=limit, kind=kind)]
+
+
+@app.patch("/orders/status", response_model=schemas.BatchOrderStatusResponse, status_code=status.HTTP_200_OK,
+           dependencies=[Depends(order_admission)])
+def update_order_statuses(batch: schemas.BatchOrderStatusUpdate, db: Session = Depends(get_db)):
+    """
+    Move many orders to one status, selected by IDs and/or a filter, with a single UPDATE.
+    """
+    conditions = []
+    if batch.order_ids is not None:
+        conditions.append(models.Order.id.in_(batch.order_ids))
+    if batch.filter is not None:
+        if batch.filter.start_date is not None:
+            conditions.append(models.Order.order_date >= batch.filter.start_date)
+        if batch.filter.end_date is not None:
+            conditions.append(models.Order.order_date <= batch.filter.end_date)
+        if batch.filter.order_type is not None:
+            conditions.append(models.Order.order_type == batch.filter.order_type)
+        if batch.filter.order_status is not None:
+            conditions.append(models.Order.order_status == batch.filter.order_status)
+
+    try:
+        # Lock the matching rows so the per-id results reflect what the UPDATE changed
+        matched = db.query(
+            models.Order.id, models.Order.order_type, models.Order.order_status, models.Order.order_date,
+            models.Order.products
+        ).filter(*conditions).with_for_update().all()
+
+        to_update = [row for row in matched if row.order_status != batch.order_status]
+        if to_update:
+            db.query(models.Order).filter(
+                models.Order.id.in_([row.id for row in to_update])
+            ).update({models.Order.order_status: batch.order_status}, synchronize_session=False)
+        # Events carry the full order, as from the single-order endpoints; one query for all products
+        products_by_id = load_products_by_id(to_update, db)
+        db.commit()
 
     except Exception as e:
         db.rollback()
-        raise HTTPException(status_code=500, detail=f"Error searching for products: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error updating order statuses: {str(e)}")
+
+    event_type = "order.paid" if batch.order_status == "paid" else "order.updated"
+    for row in to_update:
+        if batch.order_status == "prepping":
+            kitchen.add(row.id, row.order_type, prep_seconds(row.products))
+        else:
+            kitchen.remove(row.id)
+        order_events.publish(event_type, order_event(row, products_by_id, order_status=batch.order_status))
+
+    updated_ids = {row.id for row in to_update}
+    results = [
+        schemas.OrderStatusResult(id=row.id, result="updated" if row.id in updated_ids else "unchanged")
+        for row in matched
+    ]
+    matched_ids = {row.id for row in matched}
+    results.extend(
+        schemas.OrderStatusResult(id=order_id, result="not_found")
+        for order_id in dict.fromkeys(batch.order_ids or []) if order_id not in matched_ids
+    )
+
+    return schemas.BatchOrderStatusResponse(
+        order_status=batch.order_status,
+        updated=len(to_update),
+        results=results,
+    )
 
 
-@app.patch("/orders/{order_id}/pay", response_model=schemas.Order, status_code=status.HTTP_200_OK)
+@app.patch("/orders/{order_id}/pay", response_model=schemas.Order, status_code=status.HTTP_200_OK,
+           dependencies=[Depends(order_admission)])
 def pay_order(order_id: int, db: Session = Depends(get_db)):
     """
     Mark an order as 'paid'.
@@ -732,13 +1013,16 @@ def pay_order(order_id: int, db: Session = Depends(get_db)):
         full_products = transform_products_to_pydantic(db_order.products, db)
 
         # Return the updated order
-        return schemas.Order(
+        response_order = schemas.Order(
             id=db_order.id,
             order_type=db_order.order_type,
             order_status=db_order.order_status,
-            order_date=db_order.order_date.date(),  # Ensure date only
+            order_date=as_date(db_order.order_date),  # Ensure date only
             products=full_products
         )
+        schedule_order(db_order)
+        order_events.publish("order.paid", response_order.model_dump())
+        return response_order
 
     except Exception as e:
         db.rollback()
@@ -760,21 +1044,88 @@ def create_promo_code(promo_code: schemas.CreatePromoCode, db: Session = Depends
         db.add(new_promo_code)
         db.commit()
         db.refresh(new_promo_code)
+        # Drop a cached "unknown code" answer
+        promo_engine.invalidate_code(new_promo_code.code)
         return new_promo_code
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error creating promo code: {str(e)}")
 
-@app.get("/promo_codes/", response_model=List[schemas.PromoCodeResponse])
-def get_all_promo_codes(db: Session = Depends(get_db)):
+@app.post("/promo_codes/bulk", response_model=schemas.BulkPromoCodesResponse, status_code=status.HTTP_201_CREATED)
+def create_promo_codes_in_bulk(request: schemas.BulkPromoCodesCreate):
     """
-    Retrieve all promotional codes.
+    Mint many single-use promotional codes for a campaign. Also available as `python promo_codes.py`.
     """
-    promo_codes = db.query(models.PromoCode).all()
-    return promo_codes
+    try:
+        result = bulk_create_promo_codes(
+            request.count, request.discount_percentage, request.expiration_date,
+            prefix=request.prefix, length=request.length,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error creating promo codes: {str(e)}")
+
+    # Counts and a handle only: a batch may hold 500k codes, exported by streaming
+    return schemas.BulkPromoCodesResponse(
+        batch_id=result.batch_id,
+        created=result.created,
+        seconds=round(result.seconds, 3),
+        codes_per_second=round(result.codes_per_second),
+        codes_url=f"/promo_codes/bulk/{result.batch_id}/codes",
+    )
+
 
+@app.get("/promo_codes/bulk/{batch_id}/codes", response_class=StreamingResponse)
+def export_promo_code_batch(batch_id: str, format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    """
+    Stream the codes of a bulk batch as NDJSON (`{"code": ...}` per line) or CSV, a page at a time.
+    """
+    try:
+        codes = iter_batch_codes(batch_id)
+        first = next(codes, None)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting promo codes: {str(e)}")
+    if first is None:
+        raise HTTPException(status_code=404, detail=f"Promo code batch {batch_id} not found.")
+
+    def lines():
+        if format == "csv":
+            # Codes are [A-Z0-9] only, so no CSV quoting is needed
+            yield "code\n"
+            for code in itertools.chain([first], codes):
+                yield f"{code}\n"
+        else:
+            for code in itertools.chain([first], codes):
+                yield f'{{"code": "{code}"}}\n'
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(lines(), media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="promo-codes-{batch_id}.{format}"'})
 
-@app.patch("/orders/{order_id}/apply_promo/{promo_code}", response_model=schemas.Order, status_code=status.HTTP_200_OK)
+@app.get("/promo_codes/", response_model=List[schemas.PromoCodeResponse])
+def get_all_promo_codes(status_filter: str = Query("active", alias="status", pattern="^(active|inactive|all)$"),
+                        after_id: Optional[int] = None,
+                        limit: int = Query(100, ge=1, le=1000),
+                        db: Session = Depends(get_db)):
+    """
+    Retrieve promotional codes, active ones by default, ordered by ID.
+    Pass the last ID of a page as `after_id` to get the next one.
+    """
+    today = datetime.utcnow().date()
+    query = db.query(models.PromoCode)
+    if status_filter == "active":
+        # Codes past their date count as inactive even before the sweeper reaches them
+        query = query.filter(models.PromoCode.is_active.is_(True), models.PromoCode.expiration_date >= today)
+    elif status_filter == "inactive":
+        query = query.filter(or_(models.PromoCode.is_active.is_(False), models.PromoCode.expiration_date < today))
+    if after_id is not None:
+        query = query.filter(models.PromoCode.id > after_id)
+    return query.order_by(models.PromoCode.id).limit(limit).all()
+
+
+@app.patch("/orders/{order_id}/apply_promo/{promo_code}", response_model=schemas.OrderWithDiscount,
+           status_code=status.HTTP_200_OK, dependencies=[Depends(order_admission)])
 def apply_promo_code(order_id: int, promo_code: str, db: Session = Depends(get_db)):
     """
     Apply a promotional code to an order by reducing product prices.
@@ -785,29 +1136,81 @@ def apply_promo_code(order_id: int, promo_code: str, db: Session = Depends(get_d
         if not db_order:
             raise HTTPException(status_code=404, detail=f"Order with ID {order_id} not found.")
 
-        # Fetch the promo code
-        promo = db.query(models.PromoCode).filter(models.PromoCode.code == promo_code).first()
-        if not promo or promo.expiration_date < datetime.utcnow().date():
+        rule = promo_engine.rule(promo_code, promo_rule_loader(db))
+        if rule is None:
             raise HTTPException(status_code=400, detail="Invalid or expired promo code.")
 
-        # Apply the promo discount to each product in the order
-        for product in db_order.products:
-            product_details = db.query(models.Product).filter(models.Product.id == product["product_id"]).first()
-            if product_details:
-                product["price"] = product_details.price * (1 - promo.discount_percentage / 100)
+        prices = promo_engine.prices((item["product_id"] for item in db_order.products or []),
+                                     product_price_loader(db))
+        # Assign a new list: SQLAlchemy does not see in-place edits of the JSON dicts
+        db_order.products, discounted_total = promo_engine.apply(rule, db_order.products, prices)
 
         # Commit the changes to the database
         db.commit()
 
         # Refresh the order and convert to Pydantic for response
         db.refresh(db_order)
-        return convert_to_pydantic_order(db_order, db)
+        response_order = schemas.OrderWithDiscount(
+            **convert_to_pydantic_order(db_order, db).model_dump(),
+            discounted_total=discounted_total,
+        )
+        order_events.publish("order.updated", response_order.model_dump())
+        return response_order
 
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error applying promo code: {str(e)}")
 
 
+@app.patch("/orders/apply_promo", response_model=schemas.BatchPromoResponse, status_code=status.HTTP_200_OK,
+           dependencies=[Depends(order_admission)])
+def apply_promo_code_to_orders(batch: schemas.BatchPromoApply, db: Session = Depends(get_db)):
+    """
+    Apply one promotional code to many orders: one code lookup, one price load, one batched UPDATE.
+    """
+    rule = promo_engine.rule(batch.promo_code, promo_rule_loader(db))
+    if rule is None:
+        raise HTTPException(status_code=400, detail="Invalid or expired promo code.")
+
+    try:
+        orders = db.query(
+            models.Order.id, models.Order.order_type, models.Order.order_status, models.Order.order_date,
+            models.Order.products
+        ).filter(models.Order.id.in_(batch.order_ids)).with_for_update().all()
+        prices = promo_engine.prices(
+            (item["product_id"] for order in orders for item in order.products or []), product_price_loader(db)
+        )
+
+        totals = {}
+        rows = []
+        for order in orders:
+            products, totals[order.id] = promo_engine.apply(rule, order.products, prices)
+            rows.append({"id": order.id, "products": products})
+        if rows:
+            # ORM bulk UPDATE by primary key, sent as a single executemany
+            db.execute(update(models.Order), rows)
+        products_by_id = load_products_by_id(orders, db)
+        db.commit()
+
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error applying promo code: {str(e)}")
+
+    for order in orders:
+        # Same shape as PATCH /orders/{order_id}/apply_promo/{promo_code} publishes
+        order_events.publish("order.updated",
+                             order_event(order, products_by_id, discounted_total=totals[order.id]))
+
+    results = [
+        schemas.PromoResult(id=order_id, result="applied", discounted_total=totals[order_id])
+        if order_id in totals else schemas.PromoResult(id=order_id, result="not_found")
+        for order_id in dict.fromkeys(batch.order_ids)
+    ]
+    return schemas.BatchPromoResponse(promo_code=batch.promo_code, applied=len(totals), results=results)
+
+
 @app.patch("/promo_codes/{promo_id}/deactivate", response_model=schemas.PromoCodeResponse)
 def deactivate_promo_code(promo_id: int, db: Session = Depends(get_db)):
     promo = db.query(models.PromoCode).filter(models.PromoCode.id == promo_id).first()
@@ -816,9 +1219,76 @@ def deactivate_promo_code(promo_id: int, db: Session = Depends(get_db)):
     promo.is_active = False
     db.commit()
     db.refresh(promo)
+    promo_engine.invalidate_code(promo.code)
     return promo
 
 
+@app.get("/kitchen/queue", status_code=status.HTTP_200_OK)
+def get_kitchen_queue(limit: int = 10):
+    """
+    Show how many orders are waiting, the next ones in line and what each station is making.
+    """
+    return {**kitchen.snapshot(), "next": kitchen.peek(limit)}
+
+
+@app.post("/kitchen/stations/{station_id}/next", response_model=schemas.Order, status_code=status.HTTP_200_OK)
+def claim_next_order(station_id: int, db: Session = Depends(get_db)):
+    """
+    Hand the highest-priority waiting order to a station.
+    """
+    try:
+        order_id = kitchen.claim(station_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if order_id is None:
+        raise HTTPException(status_code=404, detail="No orders waiting.")
+
+    db_order = db.query(models.Order).filter(models.Order.id == order_id).first()
+    if not db_order:
+        kitchen.remove(order_id)
+        raise HTTPException(status_code=404, detail=f"Order with ID {order_id} not found.")
+    return convert_to_pydantic_order(db_order, db)
+
+
+@app.post("/kitchen/orders/{order_id}/finish", response_model=schemas.Order, status_code=status.HTTP_200_OK)
+def finish_order(order_id: int, db: Session = Depends(get_db)):
+    """
+    Mark an order 'finished' and free the station that was making it.
+    Only an order a station has claimed and is still prepping can be finished.
+    """
+    db_order = db.query(models.Order).filter(models.Order.id == order_id).first()
+    if not db_order:
+        raise HTTPException(status_code=404, detail=f"Order with ID {order_id} not found.")
+    if kitchen.station_of(order_id) is None:
+        raise HTTPException(status_code=409, detail=f"Order with ID {order_id} has not been claimed by a station.")
+
+    # Conditional UPDATE, so an order finished or changed meanwhile is not finished twice
+    finished = db.query(models.Order).filter(
+        models.Order.id == order_id, models.Order.order_status == "prepping"
+    ).update({models.Order.order_status: "finished"}, synchronize_session=False)
+    if not finished:
+        db.rollback()
+        # No longer the station's to make, as claim_next_order drops orders that are gone
+        kitchen.remove(order_id)
+        raise HTTPException(status_code=409,
+                            detail=f"Order with ID {order_id} is '{db_order.order_status}', not 'prepping'.")
+    db.commit()
+    db.refresh(db_order)
+    kitchen.complete(order_id)
+
+    response_order = convert_to_pydantic_order(db_order, db)
+    order_events.publish("order.updated", response_order.model_dump())
+    return response_order
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    """
+    Expose request latency, pool usage and order counters in Prometheus text format.
+    """
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/employee_training", response_model=str, status_code=status.HTTP_200_OK)
 def employee_training():
     """
@@ -903,6 +1373,197 @@ def transform_products_to_pydantic(product_json_list: List[dict], db: Session) -
     return full_products
 
 
+def schedule_order(order: models.Order):
+    """
+    Keep the kitchen queue in step with an order's status: only `prepping` orders wait for a station.
+    """
+    if order.order_status == "prepping":
+        kitchen.add(order.id, order.order_type, prep_seconds(order.products))
+    else:
+        kitchen.remove(order.id)
+
+
+def prep_seconds(products_json: List[dict]) -> float:
+    """
+    Estimated prep time of an order from its number of items.
+    """
+    return sum(item["quantity"] for item in products_json or []) * conf.kitchen_prep_seconds_per_item
+
+
+def index_product(product):
+    product_index.add(product.id, product.name, product.dietary_type,
+                      [ingredient.get("name", "") for ingredient in product.ingredients or []])
+    name_suggestions.add("product", product.id, product.name)
+
+
+def product_index_rows(db: Session):
+    """
+    Rows for ProductIndex.rebuild, read without building ORM objects.
+    """
+    for product_id, name, dietary_type, ingredients in db.query(
+            models.Product.id, models.Product.name, models.Product.dietary_type, models.Product.ingredients):
+        yield product_id, name, dietary_type, [ingredient.get("name", "") for ingredient in ingredients or []]
+
+
+def suggestion_rows(db: Session):
+    for product_id, name in db.query(models.Product.id, models.Product.name):
+        yield "product", product_id, name
+    for ingredient_id, name in db.query(models.Ingredient.id, models.Ingredient.name):
+        yield "ingredient", ingredient_id, name
+
+
+def promo_rule_loader(db: Session):
+    """
+    Loader for PromoEngine.rule: one active code, or None.
+    """
+    def load(code: str):
+        row = db.query(
+            models.PromoCode.code, models.PromoCode.discount_percentage, models.PromoCode.expiration_date
+        ).filter(models.PromoCode.code == code, models.PromoCode.is_active.is_(True)).first()
+        return PromoRule(row.code, row.discount_percentage, row.expiration_date) if row else None
+    return load
+
+
+def product_price_loader(db: Session):
+    """
+    Loader for PromoEngine.prices: the prices of many products in one query.
+    """
+    def load(product_ids: List[int]):
+        return dict(db.query(models.Product.id, models.Product.price).filter(models.Product.id.in_(product_ids)).all())
+    return load
+
+
+def adjust_review_summary(db: Session, product_id: int, delta: int):
+    """
+    Add `delta` to a product's review count inside the caller's transaction,
+    and re-read its latest review time through the (product_id, id) index.
+    """
+    db.flush()
+    latest = db.query(models.Review.created_at).filter(
+        models.Review.product_id == product_id
+    ).order_by(models.Review.id.desc()).limit(1).scalar()
+
+    table = models.ProductReviewSummary.__table__
+    values = {"product_id": product_id, "review_count": max(delta, 0), "latest_review_at": latest}
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        statement = mysql_insert(table).values(**values)
+        statement = statement.on_duplicate_key_update(
+            review_count=table.c.review_count + delta, latest_review_at=latest
+        )
+    else:  # SQLite, for tests and local runs
+        statement = sqlite_insert(table).values(**values).on_conflict_do_update(
+            index_elements=[table.c.product_id],
+            set_={"review_count": table.c.review_count + delta, "latest_review_at": latest},
+        )
+    db.execute(statement)
+
+
+def backfill_review_summaries():
+    """
+    Fill product_review_summaries from the reviews table when it is still
+    empty, e.g. on the first boot after the table was introduced.
+    """
+    summaries = models.ProductReviewSummary.__table__
+    reviews = models.Review.__table__
+    try:
+        with engine.begin() as conn:
+            if conn.execute(select(summaries.c.product_id).limit(1)).first() is not None:
+                return
+            conn.execute(summaries.insert().from_select(
+                ["product_id", "review_count", "latest_review_at"],
+                select(reviews.c.product_id, func.count(), func.max(reviews.c.created_at))
+                .group_by(reviews.c.product_id),
+            ))
+    except IntegrityError:
+        # Another worker backfilled first
+        pass
+
+
+def rebuild_kitchen_queue():
+    """
+    Reload every `prepping` order into the kitchen queue, e.g. after a restart.
+    """
+    db = SessionLocal()
+    try:
+        orders = db.query(models.Order).filter(models.Order.order_status == "prepping").all()
+        kitchen.rebuild(
+            (
+                order.id,
+                order.order_type,
+                prep_seconds(order.products),
+                datetime.combine(as_date(order.order_date), datetime.min.time()).timestamp(),
+            )
+            for order in orders
+        )
+    finally:
+        db.close()
+
+
+def as_date(value):
+    """
+    `orders.order_date` is a DATE column, but older rows may come back as datetimes.
+    """
+    return value.date() if isinstance(value, datetime) else value
+
+
+def load_products_by_id(orders: List[models.Order], db: Session) -> dict:
+    """
+    Fetch every product referenced by the given orders in a single query.
+    """
+    product_ids = {item["product_id"] for order in orders for item in (order.products or [])}
+    if not product_ids:
+        return {}
+    products = db.query(models.Product).filter(models.Product.id.in_(product_ids)).all()
+    return {product.id: product_to_dict(product) for product in products}
+
+
+def product_to_dict(product: models.Product) -> dict:
+    """
+    Plain-dict equivalent of schemas.ProductUpdate for a stored product.
+    """
+    return {
+        "name": product.name,
+        "price": product.price,
+        "promotion": product.promotion,
+        "dietary_type": product.dietary_type,
+        "ingredients": [
+            {"name": ingredient["name"], "quantity": ingredient["quantity"]}
+            for ingredient in product.ingredients
+        ],
+    }
+
+
+def order_to_dict(order: models.Order, products_by_id: dict, repeat_quantity: bool = True) -> dict:
+    """
+    Plain-dict equivalent of schemas.Order. Product dicts are shared between
+    orders, so repeated products cost nothing extra to build.
+    """
+    full_products = []
+    for item in order.products or []:
+        product = products_by_id.get(item["product_id"])
+        if product:
+            full_products.extend([product] * (item["quantity"] if repeat_quantity else 1))
+
+    return {
+        "id": order.id,
+        "order_type": order.order_type,
+        "order_status": order.order_status,
+        "order_date": as_date(order.order_date),
+        "products": full_products,
+    }
+
+
+def order_event(order, products_by_id: dict, **changes) -> dict:
+    """
+    Event payload for an order read as a row: the schemas.Order the single-order
+    endpoints publish, with `changes` (a new status, a discounted_total) applied.
+    """
+    data = {**order_to_dict(order, products_by_id), **changes}
+    model = schemas.OrderWithDiscount if "discounted_total" in data else schemas.Order
+    return model(**data).model_dump()
+
+
 def transform_pydantic_to_json(products: List[schemas.ProductUpdate]) -> List[dict]:
     """
     Converts a list of Pydantic ProductUpdate schemas into JSON-friendly dictionaries.
@@ -949,6 +1610,6 @@ def convert_to_pydantic_order(order: models.Order, db: Session) -> schemas.Order
         id=order.id,
         order_type=order.order_type,
         order_status=order.order_status,
-        order_date=order.order_date.date(),  # Convert datetime to date
+        order_date=as_date(order.order_date),  # Convert datetime to date
         products=full_products
     )
@@ -2,7 +2,7 @@
 from datetime import datetime
 
 from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Float, JSON, DateTime, CheckConstraint, Table, Date, \
-    Boolean
+    Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -43,6 +43,24 @@ class Review(Base):
     product_id = Column(Integer, nullable=False)
     title = Column(String(255), nullable=False)
     description = Column(String(255))
+    created_at = Column(DateTime, default=datetime.utcnow)  # NULL for reviews written before it existed
+
+    __table_args__ = (
+        # One product's reviews, newest first, paged by id
+        Index("ix_reviews_product_id_id", "product_id", "id"),
+    )
+
+
+class ProductReviewSummary(Base):
+    """
+    Per-product review aggregates, kept current by the review endpoints so
+    product pages don't count reviews on every view.
+    """
+    __tablename__ = "product_review_summaries"
+
+    product_id = Column(Integer, primary_key=True)
+    review_count = Column(Integer, nullable=False, default=0)
+    latest_review_at = Column(DateTime)
 
 
 class PromoCode(Base):
@@ -53,3 +71,12 @@ class PromoCode(Base):
     discount_percentage = Column(Float, nullable=False)
     expiration_date = Column(Date, nullable=False)
     is_active = Column(Boolean, default=True)
+    # Set by bulk generation, so a campaign's codes can be exported afterwards
+    batch_id = Column(String(32), index=True)
+
+    __table_args__ = (
+        # Covers the apply-time lookup of one active code
+        Index("ix_promo_codes_code_active_expiration", "code", "is_active", "expiration_date"),
+        # Active-code listing and the expiry sweep
+        Index("ix_promo_codes_active_expiration", "is_active", "expiration_date"),
+    )
@@ -0,0 +1,163 @@
+# promo_codes.py
+"""
+Bulk generation of single-use promo codes for marketing campaigns, and the
+sweep that deactivates expired codes.
+
+    python promo_codes.py 100000 --discount 15 --expires 2026-12-31 --prefix FALL --output codes.txt
+"""
+import argparse
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Callable, Iterator, List, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+import metrics
+import models
+from database import engine
+from promotions import generate_codes
+
+MAX_CODE_LENGTH = models.PromoCode.code.type.length
+
+EXPIRED = metrics.REGISTRY.counter(
+    "promo_codes_expired_total", "Promo codes deactivated by the expiry sweep.")
+SWEEP_ERRORS = metrics.REGISTRY.counter(
+    "promo_sweep_errors_total", "Expiry sweeps that failed and will be retried next interval.")
+
+
+@dataclass
+class BulkResult:
+    batch_id: str
+    created: int
+    seconds: float
+
+    @property
+    def codes_per_second(self) -> float:
+        return self.created / self.seconds if self.seconds else float(self.created)
+
+
+def bulk_create_promo_codes(count: int, discount_percentage: float, expiration_date: date,
+                            prefix: str = "", length: int = 10, batch_size: int = 10_000,
+                            on_batch: Optional[Callable[[List[str]], None]] = None) -> BulkResult:
+    """
+    Create `count` unique codes. Uniqueness is checked against an in-memory
+    set seeded with the existing codes sharing the prefix, and rows go in with
+    one executemany INSERT per batch, each batch in its own transaction. A
+    batch that still collides (another writer minted the same code meanwhile)
+    has its clashing codes replaced and is retried.
+
+    Codes are not kept: every row is tagged with the returned `batch_id` for
+    export with iter_batch_codes(), and `on_batch` sees each committed batch.
+    """
+    if len(prefix) + length > MAX_CODE_LENGTH:
+        raise ValueError(f"Prefix plus code length must not exceed {MAX_CODE_LENGTH} characters.")
+
+    started = time.perf_counter()
+    batch_id = uuid.uuid4().hex
+    table = models.PromoCode.__table__
+    with engine.connect() as conn:
+        existing = set(conn.scalars(select(table.c.code).where(table.c.code.startswith(prefix, autoescape=True))))
+
+    created = 0
+    while created < count:
+        batch = generate_codes(min(batch_size, count - created), existing, length, prefix)
+        for attempt in range(3):
+            rows = [
+                {"code": code, "discount_percentage": discount_percentage,
+                 "expiration_date": expiration_date, "is_active": True, "batch_id": batch_id}
+                for code in batch
+            ]
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(table), rows)
+                break
+            except IntegrityError:
+                if attempt == 2:
+                    raise
+                with engine.connect() as conn:
+                    taken = set(conn.scalars(select(table.c.code).where(table.c.code.in_(batch))))
+                existing.update(taken)
+                kept = [code for code in batch if code not in taken]
+                batch = kept + generate_codes(len(batch) - len(kept), existing, length, prefix)
+        created += len(batch)
+        if on_batch is not None:
+            on_batch(batch)
+
+    return BulkResult(batch_id, created, time.perf_counter() - started)
+
+
+def iter_batch_codes(batch_id: str, page_size: int = 10_000) -> Iterator[str]:
+    """
+    The codes of one bulk batch in id order, read a page at a time (keyset on
+    id, each page its own short query) so an export never holds the batch.
+    """
+    table = models.PromoCode.__table__
+    last_id = 0
+    while True:
+        with engine.connect() as conn:
+            page = conn.execute(
+                select(table.c.id, table.c.code)
+                .where(table.c.batch_id == batch_id, table.c.id > last_id)
+                .order_by(table.c.id).limit(page_size)
+            ).all()
+        for _, code in page:
+            yield code
+        if len(page) < page_size:
+            return
+        last_id = page[-1].id
+
+
+def deactivate_expired(batch_size: int = 1000, today: Optional[date] = None) -> int:
+    """
+    Set is_active = False on codes whose expiration date has passed, at most
+    `batch_size` rows per transaction so row locks are held only briefly.
+    Returns the number of codes deactivated.
+    """
+    today = today or datetime.utcnow().date()
+    table = models.PromoCode.__table__
+    deactivated = 0
+    while True:
+        with engine.begin() as conn:
+            ids = list(conn.scalars(
+                select(table.c.id)
+                .where(table.c.is_active.is_(True), table.c.expiration_date < today)
+                .limit(batch_size)
+            ))
+            if ids:
+                conn.execute(update(table).where(table.c.id.in_(ids)).values(is_active=False))
+        deactivated += len(ids)
+        EXPIRED.inc(len(ids))
+        if len(ids) < batch_size:
+            return deactivated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate single-use promo codes in bulk.")
+    parser.add_argument("count", type=int)
+    parser.add_argument("--discount", type=float, required=True, help="discount percentage")
+    parser.add_argument("--expires", type=date.fromisoformat, required=True, help="expiration date, YYYY-MM-DD")
+    parser.add_argument("--prefix", default="")
+    parser.add_argument("--length", type=int, default=10, help="random characters after the prefix")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--output", help="write the codes to this file, one per line")
+    args = parser.parse_args(argv)
+
+    output = open(args.output, "w") if args.output else None
+    try:
+        # Written batch by batch as they commit
+        write = (lambda batch: output.write("\n".join(batch) + "\n")) if output else None
+        result = bulk_create_promo_codes(args.count, args.discount, args.expires, args.prefix, args.length,
+                                         args.batch_size, on_batch=write)
+    finally:
+        if output:
+            output.close()
+    print(f"created {result.created} codes in {result.seconds:.2f}s "
+          f"({result.codes_per_second:,.0f} codes/s), batch {result.batch_id}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
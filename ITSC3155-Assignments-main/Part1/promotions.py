@@ -0,0 +1,207 @@
+# promotions.py
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+_MISSING = object()
+
+# 32 symbols without the look-alikes 0/O and 1/I, so one random byte masked to 5 bits picks one uniformly
+CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+_CODE_TABLE = bytes(CODE_ALPHABET.encode("ascii")[byte & 31] for byte in range(256))
+
+
+class TTLCache:
+    """
+    Small thread-safe cache where every entry carries its own lifetime.
+    `stats` is anything with hit()/miss(), e.g. metrics.CacheStats.
+    """
+
+    def __init__(self, stats=None):
+        self._entries: Dict[object, Tuple[object, float]] = {}
+        self._lock = threading.Lock()
+        self._stats = stats
+
+    def get(self, key, default=_MISSING):
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            if self._stats is not None:
+                self._stats.hit()
+            return entry[0]
+        if self._stats is not None:
+            self._stats.miss()
+        return default
+
+    def set(self, key, value, ttl: float):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            # Expired entries are only dropped here, so sweep once the cache has grown
+            if len(self._entries) % 1024 == 0:
+                now = time.monotonic()
+                self._entries = {k: e for k, e in self._entries.items() if e[1] > now}
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+@dataclass(frozen=True)
+class PromoRule:
+    code: str
+    discount_percentage: float
+    expiration_date: date
+
+    def valid_on(self, day: date) -> bool:
+        return self.expiration_date >= day
+
+    def seconds_left(self, now: datetime) -> float:
+        """
+        Seconds until the code stops being valid, i.e. the end of its expiration date.
+        """
+        return (datetime.combine(self.expiration_date + timedelta(days=1), datetime.min.time()) - now).total_seconds()
+
+    def price(self, price: float) -> float:
+        return round(price * (1 - self.discount_percentage / 100), 2)
+
+
+class PromoEngine:
+    """
+    Evaluates promo codes against orders from memory. Active codes are cached
+    until the TTL or their own expiration, whichever comes first; unknown,
+    inactive and expired codes are cached as misses for `negative_ttl` so
+    retried bad codes don't hit the database. Product prices are cached too,
+    and loaded in one query for whatever is missing.
+    """
+
+    def __init__(self, ttl: float = 60.0, negative_ttl: float = 30.0, price_ttl: float = 60.0,
+                 code_stats=None, price_stats=None):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.price_ttl = price_ttl
+        self._codes = TTLCache(code_stats)
+        self._prices = TTLCache(price_stats)
+
+    def rule(self, code: str, load: Callable[[str], Optional[PromoRule]]) -> Optional[PromoRule]:
+        """
+        The active, unexpired rule for a code, or None. `load` reads one code
+        from the database and returns None for unknown or inactive codes.
+        """
+        now = datetime.utcnow()
+        rule = self._codes.get(code)
+        if rule is _MISSING:
+            rule = load(code)
+            if rule is not None and rule.valid_on(now.date()):
+                self._codes.set(code, rule, min(self.ttl, rule.seconds_left(now)))
+            else:
+                rule = None
+                self._codes.set(code, None, self.negative_ttl)
+        if rule is not None and not rule.valid_on(now.date()):
+            return None
+        return rule
+
+    def prices(self, product_ids: Iterable[int],
+               load: Callable[[List[int]], Dict[int, float]]) -> Dict[int, float]:
+        """
+        Current price of each product; `load` fetches the uncached ones in one go.
+        """
+        prices = {}
+        missing = []
+        for product_id in set(product_ids):
+            price = self._prices.get(product_id)
+            if price is _MISSING:
+                missing.append(product_id)
+            else:
+                prices[product_id] = price
+        if missing:
+            for product_id, price in load(missing).items():
+                self._prices.set(product_id, price, self.price_ttl)
+                prices[product_id] = price
+        return prices
+
+    @staticmethod
+    def apply(rule: PromoRule, items: List[dict], prices: Dict[int, float]) -> Tuple[List[dict], float]:
+        """
+        New order line dicts carrying the discounted unit price, and the
+        discounted order total. The input dicts are left untouched so the
+        caller can assign the result and have the JSON column marked dirty.
+        Discounts always start from the catalog price, so reapplying a code
+        does not compound.
+        """
+        discounted = []
+        total = 0.0
+        for item in items or []:
+            item = dict(item)
+            if item["product_id"] in prices:
+                item["price"] = rule.price(prices[item["product_id"]])
+                total += item["price"] * item["quantity"]
+            discounted.append(item)
+        return discounted, round(total, 2)
+
+    def invalidate_code(self, code: str):
+        self._codes.invalidate(code)
+
+    def invalidate_price(self, product_id: int):
+        self._prices.invalidate(product_id)
+
+
+def generate_codes(count: int, existing: set, length: int = 10, prefix: str = "") -> List[str]:
+    """
+    `count` new random codes that are not in `existing`; they are added to it.
+    Randomness comes from os.urandom in one call per round, mapped to the
+    alphabet with bytes.translate instead of a choice() per character.
+    """
+    if len(existing) + count > len(CODE_ALPHABET) ** length // 2:
+        # Past half the code space, random draws would mostly collide
+        raise ValueError(f"{count} codes do not fit in {length} random characters; use longer codes.")
+    codes: List[str] = []
+    while len(codes) < count:
+        needed = count - len(codes)
+        raw = os.urandom(needed * length).translate(_CODE_TABLE).decode("ascii")
+        for start in range(0, len(raw), length):
+            code = prefix + raw[start:start + length]
+            if code not in existing:
+                existing.add(code)
+                codes.append(code)
+    return codes
+
+
+class ExpirySweeper:
+    """
+    Daemon thread calling `sweep()` every `interval` seconds until stopped.
+    Errors are passed to `on_error` and the next round runs as scheduled.
+    """
+
+    def __init__(self, sweep: Callable[[], int], interval: float, on_error: Optional[Callable] = None):
+        self.sweep = sweep
+        self.interval = interval
+        self.on_error = on_error
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="promo-expiry-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                if self.on_error is not None:
+                    self.on_error(e)
+            self._stopped.wait(self.interval)
@@ -0,0 +1,214 @@
+# response_compression.py
+import zlib
+from functools import partial
+
+import anyio.to_thread
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+
+# Responses of these types are already compressed or must reach the client unbuffered
+EXCLUDED_CONTENT_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip", "application/gzip")
+
+
+class _Gzip:
+    name = "gzip"
+
+    def __init__(self, level=6):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data, final):
+        out = self._obj.compress(data)
+        return out + (self._obj.flush() if final else self._obj.flush(zlib.Z_SYNC_FLUSH))
+
+
+class _Brotli:
+    name = "br"
+
+    def __init__(self, level=4):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data, final):
+        out = self._obj.process(data)
+        return out + (self._obj.finish() if final else self._obj.flush())
+
+
+class _Zstd:
+    name = "zstd"
+
+    def __init__(self, level=3):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data, final):
+        out = self._obj.compress(data)
+        if final:
+            return out + self._obj.flush()
+        return out + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+
+def available_codecs():
+    """
+    Codecs in server preference order; brotli and zstd only when installed.
+    """
+    codecs = {}
+    if zstandard is not None:
+        codecs["zstd"] = _Zstd
+    if brotli is not None:
+        codecs["br"] = _Brotli
+    codecs["gzip"] = _Gzip
+    return codecs
+
+
+def negotiate(accept_encoding: str, codecs):
+    """
+    Pick the first server-preferred codec the client accepts with q > 0.
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if token:
+            accepted[token.strip().lower()] = quality
+    for name in codecs:
+        if accepted.get(name, accepted.get("*", 0.0)) > 0:
+            return name
+    return None
+
+
+def no_compression(endpoint):
+    """
+    Decorator opting a single route out of response compression.
+    """
+    endpoint.__compress__ = False
+    return endpoint
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with zstd, brotli or gzip depending on what the client
+    accepts. Small bodies are sent as-is; streamed bodies are compressed chunk
+    by chunk and flushed so clients can decode as data arrives.
+    """
+
+    def __init__(self, app, minimum_size=1024, exclude_paths=(), thread_minimum_size=128 * 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        # Bigger bodies are compressed in a worker thread to keep the event loop responsive
+        self.thread_minimum_size = thread_minimum_size
+        self.exclude_paths = tuple(exclude_paths)
+        self.codecs = available_codecs()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for key, value in scope["headers"]:
+            if key == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        codec_name = negotiate(accept_encoding, self.codecs)
+        if codec_name is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _Responder(self, scope, self.codecs[codec_name])(receive, send)
+
+
+class _Responder:
+
+    def __init__(self, middleware, scope, codec_class):
+        self.middleware = middleware
+        self.scope = scope
+        self.codec_class = codec_class
+        self.codec = None
+        self.start_message = None
+        self.passthrough = False
+
+    async def __call__(self, receive, send):
+        self.send = send
+        await self.middleware.app(self.scope, receive, self.send_wrapper)
+
+    def _should_skip(self, message):
+        endpoint = getattr(self.scope.get("route"), "endpoint", None)
+        if getattr(endpoint, "__compress__", True) is False:
+            return True
+        if message["status"] in (204, 206, 304):
+            return True
+        content_type = ""
+        for key, value in message.get("headers", []):
+            if key == b"content-encoding":
+                return True
+            if key == b"content-type":
+                content_type = value.decode("latin-1").lower()
+        return content_type.startswith(EXCLUDED_CONTENT_TYPES)
+
+    def _headers(self, content_length=None):
+        headers = []
+        vary = []
+        for key, value in self.start_message.get("headers", []):
+            if key == b"vary":
+                vary.extend(item.strip() for item in value.decode("latin-1").split(",") if item.strip())
+            elif key != b"content-length":
+                headers.append((key, value))
+        # Keep upstream Vary values such as CORS's Origin; "*" already covers everything
+        if not any(item.lower() in ("accept-encoding", "*") for item in vary):
+            vary.append("Accept-Encoding")
+        headers.append((b"content-encoding", self.codec_class.name.encode()))
+        headers.append((b"vary", ", ".join(vary).encode("latin-1")))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode()))
+        return {**self.start_message, "headers": headers}
+
+    async def _compress(self, body, final):
+        if len(body) >= self.middleware.thread_minimum_size:
+            return await anyio.to_thread.run_sync(partial(self.codec.compress, body, final))
+        return self.codec.compress(body, final)
+
+    async def send_wrapper(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            self.passthrough = self._should_skip(message)
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.codec is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+            self.codec = self.codec_class()
+            if not more_body:
+                compressed = await self._compress(body, final=True)
+                await self.send(self._headers(content_length=len(compressed)))
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            # Streaming response: length is unknown up front
+            await self.send(self._headers())
+
+        compressed = await self._compress(body, final=not more_body)
+        await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
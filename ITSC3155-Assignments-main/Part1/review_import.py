@@ -0,0 +1,238 @@
+# review_import.py
+"""
+Bulk import of third-party reviews from NDJSON or CSV, streamed row by row.
+
+    python review_import.py reviews.ndjson --rejects rejects.ndjson
+    python review_import.py reviews.csv --batch-size 10000
+
+Each row needs product_id, title and description; created_at (ISO 8601) is
+optional. Rows are checked against the product ids loaded once up front and
+inserted in batches; bad rows go to the reject file with their line number.
+"""
+import argparse
+import codecs
+import csv
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import case, insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import models
+from database import engine
+
+FORMATS = ("ndjson", "csv")
+MAX_TEXT_LENGTH = models.Review.title.type.length
+
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+    errors: List[dict] = field(default_factory=list)  # The first few rejects, for quick feedback
+
+    @property
+    def rows_per_second(self) -> float:
+        rows = self.imported + self.rejected
+        return rows / self.seconds if self.seconds else float(rows)
+
+
+def text_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """
+    Lines (with their line endings) from a stream of byte chunks of any size.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        # Split on "\n" only: str.splitlines would also break on U+2028 inside JSON strings.
+        # The last piece may be an incomplete line; keep it for the next chunk
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def parse_records(lines: Iterable[str], fmt: str) -> Iterator[Tuple[int, Optional[dict], str]]:
+    """
+    `(line number, record or None, raw text)` per row; the record is None when
+    the row cannot be parsed at all.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row, json.dumps(row)
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield line_number, record if isinstance(record, dict) else None, line.rstrip("\r\n")
+
+
+class ReviewImporter:
+    """
+    Validates rows and writes them in batches. Each batch is one transaction:
+    a single executemany INSERT into reviews plus one upsert per batch for the
+    touched products' review summaries.
+    """
+
+    def __init__(self, products: Dict[int, str], batch_size: int = 5000, reject_file=None, keep_errors: int = 20):
+        self.products = products
+        self.batch_size = batch_size
+        self.reject_file = reject_file
+        self.keep_errors = keep_errors
+        self.result = ImportResult()
+        self._batch: List[dict] = []
+
+    def _validate(self, record: Optional[dict]) -> Tuple[Optional[dict], Optional[str]]:
+        if record is None:
+            return None, "unparseable row"
+        try:
+            product_id = int(record.get("product_id"))
+        except (TypeError, ValueError):
+            return None, "product_id must be an integer"
+        name = self.products.get(product_id)
+        if name is None:
+            return None, f"product {product_id} does not exist"
+
+        title = str(record.get("title") or "").strip()
+        description = str(record.get("description") or "").strip()
+        if not title or not description:
+            return None, "title and description are required"
+        # Same title format as POST /reviews/
+        title = f"{title} - product: {product_id}, '{name}'"
+        if len(title) > MAX_TEXT_LENGTH or len(description) > MAX_TEXT_LENGTH:
+            return None, f"title and description must be at most {MAX_TEXT_LENGTH} characters"
+
+        created_at = record.get("created_at")
+        if created_at:
+            try:
+                created_at = datetime.fromisoformat(str(created_at))
+            except ValueError:
+                return None, "created_at must be an ISO 8601 timestamp"
+            if created_at.tzinfo is not None:
+                # Stored like datetime.utcnow(): naive UTC
+                created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+        else:
+            created_at = self._now
+
+        return {"product_id": product_id, "title": title, "description": description,
+                "created_at": created_at}, None
+
+    def _reject(self, line_number: int, error: str, raw: str):
+        self.result.rejected += 1
+        entry = {"line": line_number, "error": error, "row": raw}
+        if len(self.result.errors) < self.keep_errors:
+            self.result.errors.append(entry)
+        if self.reject_file is not None:
+            self.reject_file.write(json.dumps(entry) + "\n")
+
+    def run(self, records: Iterable[Tuple[int, Optional[dict], str]]) -> ImportResult:
+        started = time.perf_counter()
+        self._now = datetime.utcnow()
+        for line_number, record, raw in records:
+            row, error = self._validate(record)
+            if error is not None:
+                self._reject(line_number, error, raw)
+                continue
+            self._batch.append(row)
+            if len(self._batch) >= self.batch_size:
+                self._flush()
+        self._flush()
+        self.result.seconds = time.perf_counter() - started
+        return self.result
+
+    def _flush(self):
+        if not self._batch:
+            return
+        summaries: Dict[int, dict] = {}
+        for row in self._batch:
+            summary = summaries.setdefault(
+                row["product_id"],
+                {"product_id": row["product_id"], "review_count": 0, "latest_review_at": row["created_at"]},
+            )
+            summary["review_count"] += 1
+            summary["latest_review_at"] = max(summary["latest_review_at"], row["created_at"])
+
+        with engine.begin() as conn:
+            conn.execute(insert(models.Review.__table__), self._batch)
+            conn.execute(_summary_upsert(conn.dialect.name), list(summaries.values()))
+        self.result.imported += len(self._batch)
+        self._batch = []
+
+
+def _summary_upsert(dialect: str):
+    """
+    executemany-able upsert adding a batch's counts to product_review_summaries
+    and moving latest_review_at forward, never back.
+    """
+    table = models.ProductReviewSummary.__table__
+    if dialect == "mysql":
+        statement = mysql_insert(table)
+        new = statement.inserted
+        return statement.on_duplicate_key_update(
+            review_count=table.c.review_count + new.review_count,
+            latest_review_at=case((table.c.latest_review_at > new.latest_review_at, table.c.latest_review_at),
+                                  else_=new.latest_review_at),
+        )
+    # SQLite, for tests and local runs
+    statement = sqlite_insert(table)
+    new = statement.excluded
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.product_id],
+        set_={
+            "review_count": table.c.review_count + new.review_count,
+            "latest_review_at": case((table.c.latest_review_at > new.latest_review_at, table.c.latest_review_at),
+                                     else_=new.latest_review_at),
+        },
+    )
+
+
+def load_products() -> Dict[int, str]:
+    """
+    Every product id with its name, read once per import.
+    """
+    with engine.connect() as conn:
+        return dict(conn.execute(select(models.Product.id, models.Product.name)).all())
+
+
+def import_reviews(chunks: Iterable[bytes], fmt: str, reject_file=None, batch_size: int = 5000) -> ImportResult:
+    if fmt not in FORMATS:
+        raise ValueError(f"Format must be one of: {', '.join(FORMATS)}.")
+    importer = ReviewImporter(load_products(), batch_size=batch_size, reject_file=reject_file)
+    return importer.run(parse_records(text_lines(chunks), fmt))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import reviews in bulk from NDJSON or CSV.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--rejects", help="reject file, default: <path>.rejects.ndjson")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    with open(args.path, "rb") as source, open(args.rejects or f"{args.path}.rejects.ndjson", "w") as rejects:
+        try:
+            result = import_reviews(iter(lambda: source.read(1 << 16), b""), fmt, rejects, args.batch_size)
+        except UnicodeDecodeError as e:
+            sys.exit(f"{args.path} is not UTF-8 ({e.reason}); rows before it were imported.")
+    print(f"imported {result.imported} reviews, rejected {result.rejected} rows in {result.seconds:.2f}s "
+          f"({result.rows_per_second:,.0f} rows/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 # schemas.py
 from datetime import datetime, date
 
-from pydantic import BaseModel, constr, validator, field_validator
+from pydantic import BaseModel, constr, validator, field_validator, model_validator
 from typing import List, Optional, Dict
 from pydantic import BaseModel, Field, PositiveFloat, PositiveInt, conint
 from sqlalchemy import Float
@@ -60,6 +60,13 @@ class ProductUpdate(BaseModel):
     dietary_type: Optional[constr(min_length=1)] = None
     ingredients: Optional[List[IngredientUpdate]] = None
 
+# Schema for an autocomplete suggestion
+class Suggestion(BaseModel):
+    type: str  # "product" or "ingredient"
+    id: int
+    name: str
+
+
 class Order(BaseModel):
     id: int
     order_type: str
@@ -90,15 +97,66 @@ class CreateOrder(BaseModel):
     class Config:
         from_attributes = True
 
+class OrderStatusFilter(BaseModel):
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    order_type: Optional[str] = Field(None, pattern="^(takeout|delivery)$")
+    order_status: Optional[str] = Field(None, pattern="^(finished|prepping|paid)$")
+
+class BatchOrderStatusUpdate(BaseModel):
+    order_status: str = Field(pattern="^(finished|prepping|paid)$")  # Status to move the orders to
+    order_ids: Optional[List[int]] = Field(None, min_length=1)
+    filter: Optional[OrderStatusFilter] = None
+
+    @model_validator(mode="after")
+    def validate_selection(self):
+        if self.order_ids is None and self.filter is None:
+            raise ValueError("Provide order_ids, a filter, or both.")
+        # An empty filter would select, lock and update every order
+        if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+            raise ValueError("The filter needs at least one criterion.")
+        return self
+
+class OrderStatusResult(BaseModel):
+    id: int
+    result: str  # "updated", "unchanged" or "not_found"
+
+class BatchOrderStatusResponse(BaseModel):
+    order_status: str
+    updated: int
+    results: List[OrderStatusResult]
+
 class Review(BaseModel):
     id: int
     product_id: int
     title: str
     description: str
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ReviewSummary(BaseModel):
+    review_count: int = 0
+    latest_review_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
+class ProductReviews(BaseModel):
+    product_id: int
+    summary: ReviewSummary
+    reviews: List[Review]
+    next_before_id: Optional[int] = None  # Pass as `before_id` for the next page
+
+class ReviewImportResult(BaseModel):
+    imported: int
+    rejected: int
+    seconds: float
+    rows_per_second: float
+    rejects_file: Optional[str] = None  # Server-side NDJSON file with every rejected row
+    errors: List[dict]  # The first rejected rows with their line number and reason
+
 class ReviewUpdate(BaseModel):
     product_id: conint(ge=1)
     title: Optional[constr(min_length=1)] = None
@@ -132,5 +190,33 @@ class CreatePromoCode(PromoCodeBase):
 class PromoCodeResponse(PromoCodeBase):
     id: int
 
+class BulkPromoCodesCreate(BaseModel):
+    count: conint(ge=1, le=500_000)
+    discount_percentage: float
+    expiration_date: date
+    prefix: str = Field("", max_length=20, pattern="^[A-Z0-9]*$")
+    length: conint(ge=6, le=20) = 10  # Random characters after the prefix
+
+class BulkPromoCodesResponse(BaseModel):
+    batch_id: str
+    created: int
+    seconds: float
+    codes_per_second: float
+    codes_url: str  # Streams the batch's codes as NDJSON or CSV
+
 class OrderWithDiscount(Order):
     discounted_total: float
+
+class BatchPromoApply(BaseModel):
+    promo_code: str
+    order_ids: List[int] = Field(min_length=1)
+
+class PromoResult(BaseModel):
+    id: int
+    result: str  # "applied" or "not_found"
+    discounted_total: Optional[float] = None
+
+class BatchPromoResponse(BaseModel):
+    promo_code: str
+    applied: int
+    results: List[PromoResult]
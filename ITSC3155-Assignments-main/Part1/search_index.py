@@ -0,0 +1,357 @@
+# search_index.py
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# A match in the product name counts more than one in its ingredients
+FIELD_WEIGHTS = {"name": 3.0, "dietary_type": 2.0, "ingredients": 1.0}
+PREFIX_PENALTY = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class CatalogFilter:
+    """
+    One row per product: a bitset with one bit per ingredient plus a dietary
+    type code, held in numpy arrays so include/exclude filters are a
+    vectorized AND/ANDNOT over the whole catalog instead of a JSON walk.
+    Bitsets are stored word-major, (words, rows), so a filter only reads the
+    contiguous 64-bit words its ingredients fall in. Removed rows are marked
+    dead and reused by the next product added.
+    """
+
+    def __init__(self, capacity: int = 1024, ingredient_words: int = 1):
+        self._bit_of: Dict[str, int] = {}
+        self._dietary_code_of: Dict[str, int] = {}
+        self._row_of: Dict[int, int] = {}
+        self._free_rows: List[int] = []
+        self._size = 0
+        self._bits = np.zeros((ingredient_words, capacity), dtype=np.uint64)
+        self._product_ids = np.zeros(capacity, dtype=np.int64)
+        self._dietary_codes = np.full(capacity, -1, dtype=np.int32)
+        self._alive = np.zeros(capacity, dtype=bool)
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        return " ".join(tokenize(name or ""))
+
+    def _bit(self, name: str) -> int:
+        bit = self._bit_of.get(name)
+        if bit is None:
+            bit = self._bit_of[name] = len(self._bit_of)
+            if bit >= len(self._bits) * 64:
+                self._bits = np.vstack([self._bits, np.zeros_like(self._bits)])
+        return bit
+
+    def _row(self, product_id: int) -> int:
+        row = self._row_of.get(product_id)
+        if row is not None:
+            return row
+        if self._free_rows:
+            row = self._free_rows.pop()
+        else:
+            row = self._size
+            self._size += 1
+            if row >= len(self._alive):
+                grow = len(self._alive)
+                self._bits = np.hstack([self._bits, np.zeros_like(self._bits)])
+                self._product_ids = np.concatenate([self._product_ids, np.zeros(grow, dtype=np.int64)])
+                self._dietary_codes = np.concatenate([self._dietary_codes, np.full(grow, -1, dtype=np.int32)])
+                self._alive = np.concatenate([self._alive, np.zeros(grow, dtype=bool)])
+        self._row_of[product_id] = row
+        return row
+
+    def set(self, product_id: int, dietary_type: str, ingredient_names: Iterable[str]):
+        bits = [self._bit(name) for name in {self.normalize(name) for name in ingredient_names} if name]
+        row = self._row(product_id)
+        self._bits[:, row] = 0
+        for bit in bits:
+            self._bits[bit >> 6, row] |= np.uint64(1 << (bit & 63))
+        self._product_ids[row] = product_id
+        self._dietary_codes[row] = self._dietary_code_of.setdefault(dietary_type, len(self._dietary_code_of))
+        self._alive[row] = True
+
+    @classmethod
+    def build(cls, products: List[Tuple[int, str, List[str]]]) -> "CatalogFilter":
+        """
+        A filter over `(id, dietary_type, ingredient_names)` rows, filled with
+        one scatter per array instead of row-by-row assignments.
+        """
+        catalog = cls(capacity=max(len(products), 1))
+        rows, words, bits = [], [], []
+        for row, (product_id, dietary_type, ingredient_names) in enumerate(products):
+            catalog._row_of[product_id] = row
+            catalog._product_ids[row] = product_id
+            catalog._dietary_codes[row] = catalog._dietary_code_of.setdefault(
+                dietary_type, len(catalog._dietary_code_of))
+            for name in {cls.normalize(name) for name in ingredient_names}:
+                if name:
+                    bit = catalog._bit_of.setdefault(name, len(catalog._bit_of))
+                    rows.append(row)
+                    words.append(bit >> 6)
+                    bits.append(1 << (bit & 63))
+        catalog._size = len(products)
+        catalog._alive[:len(products)] = True
+        catalog._bits = np.zeros(((len(catalog._bit_of) + 63) // 64 or 1, len(catalog._alive)), dtype=np.uint64)
+        np.bitwise_or.at(catalog._bits, (np.array(words, dtype=np.int64), np.array(rows, dtype=np.int64)),
+                         np.array(bits, dtype=np.uint64))
+        return catalog
+
+    def remove(self, product_id: int):
+        row = self._row_of.pop(product_id, None)
+        if row is not None:
+            self._alive[row] = False
+            self._free_rows.append(row)
+
+    def _mask(self, names: Iterable[str]) -> Tuple[Dict[int, int], bool]:
+        """
+        Bitset for a set of ingredient names as {word: bits}, and whether every
+        name is known.
+        """
+        mask: Dict[int, int] = {}
+        complete = True
+        for name in names:
+            bit = self._bit_of.get(self.normalize(name))
+            if bit is None:
+                complete = False
+            else:
+                mask[bit >> 6] = mask.get(bit >> 6, 0) | (1 << (bit & 63))
+        return mask, complete
+
+    def _matches(self, rows, include, exclude, dietary_type) -> np.ndarray:
+        """
+        Boolean keep-mask over `rows`, a slice or an index array into the columns.
+        """
+        codes = self._dietary_codes[rows]
+        keep = np.ones(len(codes), dtype=bool)
+        if dietary_type is not None:
+            code = self._dietary_code_of.get(dietary_type)
+            if code is None:
+                return np.zeros(len(codes), dtype=bool)
+            keep &= codes == code
+        if include:
+            mask, complete = self._mask(include)
+            if not complete:
+                # Nothing contains an ingredient no product has
+                return np.zeros(len(codes), dtype=bool)
+            for word, bits in mask.items():
+                bits = np.uint64(bits)
+                keep &= (self._bits[word, rows] & bits) == bits
+        if exclude:
+            mask, _ = self._mask(exclude)
+            for word, bits in mask.items():
+                keep &= (self._bits[word, rows] & np.uint64(bits)) == 0
+        return keep
+
+    def filter(self, include=None, exclude=None, dietary_type: Optional[str] = None) -> np.ndarray:
+        """
+        Sorted ids of all products containing every `include` ingredient, none
+        of the `exclude` ones and, if given, of the exact dietary type.
+        """
+        rows = slice(0, self._size)
+        keep = self._alive[rows] & self._matches(rows, include, exclude, dietary_type)
+        return np.sort(self._product_ids[rows][keep])
+
+    def accepts(self, product_ids: List[int], include=None, exclude=None,
+                dietary_type: Optional[str] = None) -> List[int]:
+        """
+        The subset of `product_ids` passing the same filter, in the given order.
+        """
+        rows = np.fromiter((self._row_of.get(pid, -1) for pid in product_ids), dtype=np.int64,
+                           count=len(product_ids))
+        known = rows >= 0
+        rows = rows[known]
+        keep = self._matches(rows, include, exclude, dietary_type)
+        return np.asarray(product_ids, dtype=np.int64)[known][keep].tolist()
+
+    def __len__(self):
+        return len(self._row_of)
+
+
+class ProductIndex:
+    """
+    In-memory inverted index over product name, dietary type and ingredient
+    names. Each token maps to {product_id: weight}; a sorted vocabulary gives
+    prefix matching with bisect. Writes update only the affected postings.
+    """
+
+    def __init__(self, refresh_seconds: Optional[float] = None):
+        self.refresh_seconds = refresh_seconds
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._vocabulary: List[str] = []
+        self._doc_tokens: Dict[int, Dict[str, float]] = {}
+        self._catalog = CatalogFilter()
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _weigh(name: str, dietary_type: str, ingredient_names: Iterable[str]) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        for field, texts in (("name", [name]), ("dietary_type", [dietary_type]), ("ingredients", ingredient_names)):
+            for text in texts:
+                for token in tokenize(text or ""):
+                    weights[token] = weights.get(token, 0.0) + FIELD_WEIGHTS[field]
+        return weights
+
+    def add(self, product_id: int, name: str, dietary_type: str, ingredient_names: Iterable[str]):
+        """
+        Index a product, replacing what was indexed for it before.
+        """
+        ingredient_names = list(ingredient_names)
+        weights = self._weigh(name, dietary_type, ingredient_names)
+        with self._lock:
+            self._remove(product_id)
+            for token, weight in weights.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    insort(self._vocabulary, token)
+                postings[product_id] = weight
+            self._doc_tokens[product_id] = weights
+            self._catalog.set(product_id, dietary_type, ingredient_names)
+
+    def remove(self, product_id: int):
+        with self._lock:
+            self._remove(product_id)
+
+    def _remove(self, product_id):
+        self._catalog.remove(product_id)
+        for token in self._doc_tokens.pop(product_id, {}):
+            postings = self._postings[token]
+            del postings[product_id]
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def rebuild(self, products: Iterable[Tuple[int, str, str, Iterable[str]]]):
+        """
+        Replace the whole index from `(id, name, dietary_type, ingredient_names)` rows.
+        """
+        postings: Dict[str, Dict[int, float]] = {}
+        doc_tokens = {}
+        catalog_rows = []
+        for product_id, name, dietary_type, ingredient_names in products:
+            ingredient_names = list(ingredient_names)
+            weights = self._weigh(name, dietary_type, ingredient_names)
+            doc_tokens[product_id] = weights
+            catalog_rows.append((product_id, dietary_type, ingredient_names))
+            for token, weight in weights.items():
+                postings.setdefault(token, {})[product_id] = weight
+        catalog = CatalogFilter.build(catalog_rows)
+        with self._lock:
+            self._postings = postings
+            self._vocabulary = sorted(postings)
+            self._doc_tokens = doc_tokens
+            self._catalog = catalog
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self, loader: Callable[[], Iterable[Tuple[int, str, str, Iterable[str]]]]):
+        """
+        Build the index on first use, and again once it is older than
+        `refresh_seconds` so writes made by other worker processes show up.
+        """
+        loaded_at = self._loaded_at
+        if loaded_at is not None and (
+                self.refresh_seconds is None or time.monotonic() - loaded_at < self.refresh_seconds):
+            return
+        with self._lock:
+            if self._loaded_at is loaded_at:
+                self.rebuild(loader())
+
+    def _expand(self, term: str, prefix: bool) -> List[Tuple[Dict[int, float], float]]:
+        """
+        Postings a query term matches, each with its weight factor: the exact
+        token at full weight, longer tokens sharing the prefix at a penalty.
+        """
+        expansions = []
+        exact = self._postings.get(term)
+        if exact:
+            expansions.append((exact, 1.0))
+        if prefix:
+            vocabulary = self._vocabulary
+            for position in range(bisect_right(vocabulary, term), len(vocabulary)):
+                token = vocabulary[position]
+                if not token.startswith(term):
+                    break
+                expansions.append((self._postings[token], PREFIX_PENALTY))
+        return expansions
+
+    @staticmethod
+    def _scores(expansions) -> Dict[int, float]:
+        if len(expansions) == 1 and expansions[0][1] == 1.0:
+            # Read-only from here on, so the postings dict itself can be used
+            return expansions[0][0]
+        scores: Dict[int, float] = {}
+        for postings, factor in expansions:
+            for product_id, weight in postings.items():
+                weight *= factor
+                if weight > scores.get(product_id, 0.0):
+                    scores[product_id] = weight
+        return scores
+
+    def search(self, query: str, mode: str = "and", prefix: bool = True, limit: int = 50,
+               dietary_type: Optional[str] = None, include=None, exclude=None) -> List[Tuple[int, float]]:
+        """
+        Ranked `(product_id, score)` pairs. In "and" mode every query term must
+        match; in "or" mode any term may. The last term also matches as a token
+        prefix, so results keep up while the user is still typing it.
+        `dietary_type`, `include` and `exclude` narrow the matches the same way
+        as `filter`.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            per_term = [self._expand(term, prefix and position == len(terms) - 1)
+                        for position, term in enumerate(terms)]
+
+            if mode == "and":
+                # Score the rarest term's products, then probe the others' postings for just those
+                per_term.sort(key=lambda expansions: sum(len(postings) for postings, _ in expansions))
+                scores = self._scores(per_term[0])
+                for expansions in per_term[1:]:
+                    if not scores:
+                        break
+                    matched = {}
+                    for product_id, score in scores.items():
+                        best = 0.0
+                        for postings, factor in expansions:
+                            weight = postings.get(product_id)
+                            if weight is not None and weight * factor > best:
+                                best = weight * factor
+                        if best:
+                            matched[product_id] = score + best
+                    scores = matched
+            else:
+                scores = {}
+                for expansions in per_term:
+                    for product_id, weight in self._scores(expansions).items():
+                        scores[product_id] = scores.get(product_id, 0.0) + weight
+
+            if scores and (dietary_type is not None or include or exclude):
+                accepted = self._catalog.accepts(list(scores), include, exclude, dietary_type)
+                scores = {pid: scores[pid] for pid in accepted}
+
+            return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+
+    def filter(self, include=None, exclude=None, dietary_type: Optional[str] = None,
+               limit: Optional[int] = None) -> List[int]:
+        """
+        Ids of products with every `include` ingredient and none of the
+        `exclude` ones, optionally of one dietary type, lowest id first.
+        """
+        with self._lock:
+            return self._catalog.filter(include, exclude, dietary_type)[:limit].tolist()
+
+    def __len__(self):
+        return len(self._doc_tokens)
@@ -0,0 +1,204 @@
+# server.py
+"""
+Pre-fork launcher: binds one listening socket, imports the app once in the
+master and forks N uvicorn workers that all accept on the shared socket.
+
+    python server.py --workers 4
+    kill -HUP <master pid>    # rolling restart, one worker at a time
+    kill -TERM <master pid>   # graceful shutdown
+
+Database engines register an after-fork hook (see database.py), so every
+worker opens its own connection pool on first use.
+"""
+import argparse
+import os
+import select
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+from uvicorn.importer import import_from_string
+
+from api.dependencies.config import conf
+
+
+def process_local_state(app):
+    """
+    What the app keeps in process memory (`app.state.process_local`), which
+    separate workers would each hold their own copy of.
+    """
+    state = getattr(app, "state", None)
+    return tuple(getattr(state, "process_local", ()))
+
+
+class _WorkerServer(uvicorn.Server):
+    """
+    uvicorn server that tells the master over a pipe once it accepts traffic.
+    """
+
+    def __init__(self, config, ready_fd):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        if not self.should_exit:
+            os.write(self.ready_fd, b"1")
+        os.close(self.ready_fd)
+
+
+class Launcher:
+
+    def __init__(self, app, host, port, workers, preload=True, graceful_timeout=30, ready_timeout=30):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.preload = preload
+        self.graceful_timeout = graceful_timeout
+        self.ready_timeout = ready_timeout
+        self.children = {}  # pid -> ready pipe read end
+        self.sock = None
+        self.loaded_app = None
+        self._reload = False
+        self._stopping = False
+
+    def bind(self):
+        self.sock = socket.create_server((self.host, self.port), backlog=2048)
+        # Accepted connections inherit this; avoids Nagle/delayed-ACK stalls on keep-alive
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.set_inheritable(True)
+
+    def spawn(self):
+        ready_read, ready_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_read)
+            self._run_worker(ready_write)
+            os._exit(0)
+        os.close(ready_write)
+        self.children[pid] = ready_read
+        return pid
+
+    def _run_worker(self, ready_fd):
+        # uvicorn turns SIGTERM/SIGINT into a graceful shutdown; SIGHUP is for the master only
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(sig, signal.SIG_DFL)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        app = self.loaded_app if self.preload else import_from_string(self.app)
+        config = uvicorn.Config(
+            app,
+            lifespan="on",
+            timeout_graceful_shutdown=self.graceful_timeout,
+        )
+        try:
+            _WorkerServer(config, ready_fd).run(sockets=[self.sock])
+        except Exception as e:
+            print(f"[{os.getpid()}] worker crashed: {e}", file=sys.stderr)
+            os._exit(1)
+
+    def wait_ready(self, pid):
+        fd = self.children.get(pid)
+        if fd is None:
+            return False
+        readable, _, _ = select.select([fd], [], [], self.ready_timeout)
+        return bool(readable) and os.read(fd, 1) == b"1"
+
+    def stop_worker(self, pid):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while time.monotonic() < deadline:
+            done, _ = os.waitpid(pid, os.WNOHANG)
+            if done:
+                break
+            time.sleep(0.05)
+        else:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self._forget(pid)
+
+    def _forget(self, pid):
+        fd = self.children.pop(pid, None)
+        if fd is not None:
+            os.close(fd)
+
+    def rolling_restart(self):
+        """
+        Replace workers one at a time; a new worker must be accepting before
+        the old one is asked to drain, so capacity never drops below N.
+        """
+        for old_pid in list(self.children):
+            new_pid = self.spawn()
+            if not self.wait_ready(new_pid):
+                print(f"worker {new_pid} failed to start, keeping {old_pid}", file=sys.stderr)
+                self.stop_worker(new_pid)
+                continue
+            self.stop_worker(old_pid)
+
+    def reap(self):
+        while self.children:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            self._forget(pid)
+            if not self._stopping:
+                print(f"worker {pid} exited, respawning", file=sys.stderr)
+                self.spawn()
+
+    def run(self):
+        if self.preload:
+            self.loaded_app = import_from_string(self.app)
+        if self.workers > 1:
+            local = process_local_state(self.loaded_app or import_from_string(self.app))
+            if local:
+                # Each worker would stream, schedule and admit on its own until this state is shared
+                raise SystemExit(f"{self.app} keeps its {', '.join(local)} in process memory; "
+                                 f"run it with --workers 1")
+        self.bind()
+
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "_reload", True))
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, "_stopping", True))
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, "_stopping", True))
+
+        for _ in range(self.workers):
+            self.spawn()
+        print(f"serving {self.app} on http://{self.host}:{self.port} with {self.workers} workers "
+              f"(master pid {os.getpid()})", file=sys.stderr)
+
+        while not self._stopping:
+            if self._reload:
+                self._reload = False
+                self.rolling_restart()
+            self.reap()
+            time.sleep(0.2)
+
+        for pid in list(self.children):
+            self.stop_worker(pid)
+        self.sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the API with several worker processes.")
+    parser.add_argument("--app", default="main:app", help="import string of the ASGI app")
+    parser.add_argument("--host", default=conf.app_host)
+    parser.add_argument("--port", type=int, default=conf.app_port)
+    parser.add_argument("--workers", type=int, default=conf.app_workers)
+    parser.add_argument("--no-preload", dest="preload", action="store_false",
+                        help="import the app in each worker so a HUP restart picks up code changes")
+    parser.add_argument("--graceful-timeout", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    Launcher(args.app, args.host, args.port, args.workers,
+             preload=args.preload, graceful_timeout=args.graceful_timeout).run()
+
+
+if __name__ == "__main__":
+    main()